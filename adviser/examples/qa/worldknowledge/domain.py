@@ -18,12 +18,14 @@
 ###############################################################################
 
 import sys, json, os
-import requests
-import urllib.parse
 
 from typing import List, Iterable
+from utils.domain.httpclient import HTTPClient, get_shared_client
 from utils.domain.lookupdomain import LookupDomain
 
+SPARQL_URL = 'https://query.wikidata.org/sparql'
+SPARQL_PARAMS = {'format': 'json', 'content-type': 'application/sparql-query', 'user-agent': 'Python 3.6.8'}
+
 def get_root_dir():
     return os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
@@ -38,11 +40,19 @@ class WorldKnowledgeDomain(LookupDomain):
         - name_lex (Dict[str,str]): lexicon for matching topic's names to their KG entity
     """
 
-    def __init__(self):
-        """Calls super class' constructor and loads name lexicon"""
+    def __init__(self, sparql_url: str = SPARQL_URL, client: HTTPClient = None):
+        """Calls super class' constructor and loads name lexicon
+
+        Args:
+            sparql_url (str): URL of the SPARQL endpoint of the knowledge graph
+            client (HTTPClient): client sending the queries (the client shared by all domains if None)
+        """
 
         LookupDomain.__init__(self, 'CSQA', 'World Knowledge')
 
+        self.sparql_url = sparql_url
+        self.client = client
+
         self.artificial_id_counter = 1 #int: lexicon for matching topic's names to their KG entity
 
         self.name_lex = self._init_name_lexicon()
@@ -56,41 +66,42 @@ class WorldKnowledgeDomain(LookupDomain):
         entities = self.name_lex.get(term, [])
         return [(ent['id'], ent['label']) for ent in entities]
 
-    def _perform_out_query(self, relation, topic):
-        url = 'https://query.wikidata.org/sparql'
-        query = """ SELECT ?item ?itemLabel
+    def _submit_query(self, query: str):
+        """ Sends the SPARQL query in the background, returns the future of the response """
+        client = self.client or get_shared_client()
+        return client.submit('POST', self.sparql_url, params=SPARQL_PARAMS, data={'query': query})
+
+    def _perform_query(self, query: str):
+        client = self.client or get_shared_client()
+        return self._get_labels(client.post(self.sparql_url, params=SPARQL_PARAMS, data={'query': query}))
+
+    @staticmethod
+    def _get_labels(data):
+        return [res['itemLabel']['value'] for res in data['results'] ['bindings']]
+
+    def _get_out_query(self, relation, topic):
+        return """ SELECT ?item ?itemLabel
                     WHERE
                     {
                     wd:%s wdt:%s ?item.
                     ?item rdfs:label ?itemLabel.
                     FILTER(LANG(?itemLabel) = 'en').
                     }""" % (topic, relation)
-        body = 'query=(%s)' % urllib.parse.quote(query)
-        body = {'query': query}
-        # print(body, data_points)
-        r = requests.post(url, params = {'format': 'json', 'content-type': 'application/sparql-query', 'user-agent': 'Python 3.6.8'}, data=body)
-        # print('Status', r.status_code)
-        data = r.json()
-        return [res['itemLabel']['value'] for res in data['results'] ['bindings']]
 
-    def _perform_in_query(self, relation, topic):
-        url = 'https://query.wikidata.org/sparql'
-        query = """ SELECT ?item ?itemLabel
+    def _get_in_query(self, relation, topic):
+        return """ SELECT ?item ?itemLabel
                     WHERE
                     {
                     ?item wdt:%s wd:%s.
                     ?item rdfs:label ?itemLabel.
                     FILTER(LANG(?itemLabel) = 'en').
                     }""" % (relation, topic)
-        body = 'query=(%s)' % urllib.parse.quote(query)
-        body = {'query': query}
-        r = requests.post(url, params = {
-                'format': 'json',
-                'content-type': 'application/sparql-query',
-                'user-agent': 'Python 3.6.8'
-            }, data=body)
-        data = r.json()
-        return [res['itemLabel']['value'] for res in data['results'] ['bindings']]
+
+    def _perform_out_query(self, relation, topic):
+        return self._perform_query(self._get_out_query(relation, topic))
+
+    def _perform_in_query(self, relation, topic):
+        return self._perform_query(self._get_in_query(relation, topic))
 
     def find_entities(self, constraints: dict):
         """ Returns all entities from the data backend that meet the constraints.
@@ -106,11 +117,18 @@ class WorldKnowledgeDomain(LookupDomain):
         if not topics:
             return []
 
+        # query all topic entities at the same time
+        if constraints['direction'] == 'out':
+            queries = [self._submit_query(self._get_out_query(constraints['relation'], topic_id))
+                       for topic_id, _ in topics]
+        else:
+            queries = [self._submit_query(self._get_in_query(constraints['relation'], topic_id))
+                       for topic_id, _ in topics]
+
         answers = []
-        for topic_id, topic_label in topics:
-            answer_ids = []
+        for (topic_id, topic_label), query in zip(topics, queries):
+            answer_ids = self._get_labels(query.result())
             if constraints['direction'] == 'out':
-                answer_ids = self._perform_out_query(constraints['relation'], topic_id)
                 for answer_id in answer_ids:
                     answers.append({
                         'subject': topic_label,
@@ -119,7 +137,6 @@ class WorldKnowledgeDomain(LookupDomain):
                     })
                     self.artificial_id_counter += 1
             else:
-                answer_ids = self._perform_in_query(constraints['relation'], topic_id)
                 for answer_id in answer_ids:
                     answers.append({
                         'subject': answer_id,
@@ -17,6 +17,7 @@
 #
 ###############################################################################
 
+from functools import partial
 from typing import List
 
 from utils.logger import DiasysLogger
@@ -43,6 +44,10 @@ class MensaNLU(HandcraftedNLU):
         # only calls super class' constructor
         HandcraftedNLU.__init__(self, domain, logger)
 
+    def _batch_worker_factory(self):
+        """Returns a function creating a copy of this NLU (see `HandcraftedNLU._batch_worker_factory`)"""
+        return partial(type(self), self.domain, self.logger)
+
     @PublishSubscribe(sub_topics=["user_utterance"], pub_topics=["user_acts"])
     def extract_user_acts(self, user_utterance: str = None, sys_act: SysAct = None, beliefstate: BeliefState = None) \
             -> dict(user_acts=List[UserAct]):
@@ -18,23 +18,18 @@
 ###############################################################################
 
 from typing import List, Iterable
-import tmdbsimple as tmdb
 from datetime import datetime
 from random import choice
 
+from utils.domain.httpclient import HTTPClient, get_shared_client
 from utils.domain.lookupdomain import LookupDomain
 
 #API_KEY = 'EnterYourPersonalAPIKeyFromTMDB'
-tmdb.API_KEY = open("examples/webapi/movie/api_key.txt", "r").read()
-
-genres = tmdb.Genres().movie_list()['genres']
-genre2id = dict()
-id2genre = dict()
-for elem in genres:
-    i = elem['id']
-    name = elem['name']
-    genre2id[name.lower()] = i
-    id2genre[i] = name.lower()
+API_KEY = open("examples/webapi/movie/api_key.txt", "r").read()
+API_URL = 'https://api.themoviedb.org/3'
+# seconds responses are reused (the genres hardly ever change)
+QUERY_TTL = 3600
+GENRES_TTL = 24 * 3600
 
 
 class MovieDomain(LookupDomain):
@@ -44,9 +39,16 @@ class MovieDomain(LookupDomain):
         last_results (List[dict]): Current results which the user might request info about
     """
 
-    def __init__(self):
+    def __init__(self, api_url: str = API_URL, client: HTTPClient = None):
+        """
+        Args:
+            api_url (str): base URL of the TMDB API
+            client (HTTPClient): client sending the requests (the client shared by all domains if None)
+        """
         LookupDomain.__init__(self, 'MovieAPI', 'Movie')
 
+        self.api_url = api_url
+        self.client = client
         self.last_results = []
 
     def get_requestable_slots(self) -> List[str]:
@@ -90,25 +92,33 @@ class MovieDomain(LookupDomain):
         """ Returns the slot name that will be used as the 'name' of an entry """
         return 'artificial_id'
 
+    def _submit(self, path: str, ttl: float = QUERY_TTL, **params):
+        """ Sends a request to the TMDB API in the background, returns the future of the response """
+        client = self.client or get_shared_client()
+        return client.submit('GET', self.api_url + path, params={'api_key': API_KEY, **params}, ttl=ttl)
+
+    def _get_genres(self):
+        """ Returns the mappings genre name -> id and id -> genre name """
+        genres = self._submit('/genre/movie/list', ttl=GENRES_TTL).result()['genres']
+        genre2id = {elem['name'].lower(): elem['id'] for elem in genres}
+        id2genre = {elem['id']: elem['name'].lower() for elem in genres}
+        return genre2id, id2genre
+
     def query(self, constraints):
         constraints = { slot:slot_values for (slot,slot_values) in constraints.items() if 'dontcare' not in slot_values.keys() }
         person = None
         if 'cast' in constraints:
-            for actor in constraints['cast'].keys():
-                try:
-                    person_ = tmdb.Search().person(query = actor)['results'][0]
-                    if person == None:
-                        person = [person_]
-                    else:
-                        person.append(person_)
-                except Exception as e:
-                    print("EXCEPTION while querying for person: ", e)
-                    person = None
+            # search all actors at the same time
+            searches = [self._submit('/search/person', query=actor) for actor in constraints['cast'].keys()]
+            try:
+                person = [search.result()['results'][0] for search in searches]
+            except Exception as e:
+                print("EXCEPTION while querying for person: ", e)
+                person = None
         else:
             person = None
 
         genres = list(constraints['genres'].keys()) if 'genres' in constraints else None
-        genre_ids = [genre2id[genre] for genre in genres] if genres else None
         years = list(constraints['release_year'].keys()) if 'release_year' in constraints else None
         year_gte, year_lte = self._extract_range_constraints(years)
         year = years if year_gte is None and year_lte is None else None
@@ -118,27 +128,32 @@ class MovieDomain(LookupDomain):
             return [], 0
         else:
             try:
+                genre2id, id2genre = self._get_genres()
+                genre_ids = [genre2id[genre] for genre in genres] if genres else None
                 person_id = [person_['id'] for person_ in person] if person else None
                 if id is None:
-                    api_result = tmdb.Discover().movie(with_genres=genre_ids, 
-                                                        primary_release_year=year, 
-                                                        primary_release_date_gte=year_gte, 
-                                                        primary_release_date_lte=year_lte, 
-                                                        with_cast=person_id,
-                                                        sort_by='popularity.desc')
+                    api_result = self._submit('/discover/movie', **{'with_genres': genre_ids,
+                                                                    'primary_release_year': year,
+                                                                    'primary_release_date.gte': year_gte,
+                                                                    'primary_release_date.lte': year_lte,
+                                                                    'with_cast': person_id,
+                                                                    'sort_by': 'popularity.desc'}).result()
                 else:
-                    api_result = tmdb.Movies(id=int(id)).info()
+                    # request the details and the cast of the movie at the same time
+                    info = self._submit(f'/movie/{int(id)}')
+                    credits = self._submit(f'/movie/{int(id)}/credits')
+                    api_result = info.result()
                     actors = []
-                    full_cast = tmdb.Movies(id=int(id)).credits()['cast']
+                    full_cast = credits.result()['cast']
                     for i in range(3):
                         actors.append(full_cast[i]['name'])
                     person = ", ".join(actors)
-                return self._canonicalize_api_result(api_result, person)
+                return self._canonicalize_api_result(api_result, person, id2genre)
             except Exception as e:
                 print("EXCEPTION while querying API: ", e)
                 return [], 0
 
-    def _canonicalize_api_result(self, api_response, person):
+    def _canonicalize_api_result(self, api_response, person, id2genre):
         """ 
         Takes the fieds from the api result that we care about and renames them
         to make them consistent across the code. 
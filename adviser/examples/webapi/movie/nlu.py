@@ -18,10 +18,13 @@
 ############################################################################################
 
 import re, json, os
+from functools import partial
 from typing import List
 from utils.sysact import SysAct, SysActionType
 
 from utils import UserAct, UserActionType, DiasysLogger
+from services.nlu.batch import parse_in_processes
+from services.nlu.regexmatcher import RegexMatcher
 from services.service import Service, PublishSubscribe
 from .actor_name_extractor import ActorNameExtractor
 from . import genre_synonyms
@@ -109,6 +112,7 @@ class MovieNLU(Service):
         #path = os.path.join('adviser', 'resources', 'nlu_regexes', 'GeneralRules.json')
         path = os.path.join('resources', 'nlu_regexes', 'GeneralRules.json')
         self.general_regex = json.load(open(path))
+        self.general_matcher = RegexMatcher(self.general_regex, require_group=False)
         self.last_sys_act = None
 
     @PublishSubscribe(sub_topics=["sys_act"])
@@ -125,26 +129,55 @@ class MovieNLU(Service):
         Returns:
             dict with key 'user_acts' and list of user acts as value
         """
+        user_acts = self._parse_utterance(user_utterance, self.last_sys_act)
+        if user_acts is not None:
+            self.debug_logger.dialog_turn("User Actions: %s" % str(user_acts))
+        return {'user_acts': user_acts}
+
+    def parse_batch(self, utterances: List[str], sys_act_contexts: List[SysAct] = None,
+                    num_workers: int = 1) -> List[List[UserAct]]:
+        """Detects the user acts of many utterances without a dialog system (see `HandcraftedNLU.parse_batch`).
+
+        Args:
+            utterances: user utterances
+            sys_act_contexts: the system act preceding each utterance (None: the utterance starts the dialog)
+            num_workers: number of processes (each loading its own NLU) parsing parts of the utterances
+
+        Returns:
+            the user acts of each utterance (None for empty utterances)
+        """
+        if sys_act_contexts is None:
+            sys_act_contexts = [None] * len(utterances)
+        if len(sys_act_contexts) != len(utterances):
+            raise ValueError(f"got {len(sys_act_contexts)} system acts for {len(utterances)} utterances")
+        if num_workers > 1:
+            return parse_in_processes(self._batch_worker_factory(), utterances, sys_act_contexts, num_workers)
+        return [self._parse_utterance(utterance, sys_act) for utterance, sys_act in zip(utterances, sys_act_contexts)]
+
+    def _batch_worker_factory(self):
+        """Returns a function creating a copy of this NLU in each worker process of `parse_batch`"""
+        return partial(type(self), self.domain, self.debug_logger)
+
+    def _parse_utterance(self, user_utterance: str, last_sys_act: SysAct) -> List[UserAct]:
+        """Detects the user acts of the utterance following the given system act (None if the utterance is empty)"""
         user_acts = []
         if not user_utterance:
-            return {'user_acts': None}
+            return None
 
         user_utterance, actors = self.actor_name_extractor(user_utterance)
 
         user_utterance = ' '.join(user_utterance.lower().split())
 
-        if self.last_sys_act is not None and self.last_sys_act.type == SysActionType.InformByAlternatives:
-            movie_id = self._extract_selection(user_utterance, self.last_sys_act)
+        if last_sys_act is not None and last_sys_act.type == SysActionType.InformByAlternatives:
+            movie_id = self._extract_selection(user_utterance, last_sys_act)
             if movie_id is not None:
                 user_acts.append(UserAct(user_utterance, UserActionType.Inform, 'id', movie_id))
 
-        for act in self.general_regex:
+        for act in self.general_matcher.match(user_utterance):
             if act == 'req_everything':
                 continue
-            
-            if re.search(self.general_regex[act], user_utterance, re.I):
-                user_act_type = UserActionType(act)
-                user_acts.append(UserAct(user_utterance, user_act_type))
+            user_act_type = UserActionType(act)
+            user_acts.append(UserAct(user_utterance, user_act_type))
         
         for regex in ACTOR_NAME_REGEXES:
             matches = re.finditer(regex, user_utterance)
@@ -193,9 +226,7 @@ class MovieNLU(Service):
         if len(user_acts) == 0:
             user_acts.append(UserAct(user_utterance, UserActionType.Bad)) 
 
-        self.debug_logger.dialog_turn("User Actions: %s" % str(user_acts))
-
-        return {'user_acts': user_acts}
+        return user_acts
 
     def _match_years(self, user_utterance):
         user_acts = []
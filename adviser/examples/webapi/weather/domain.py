@@ -18,13 +18,15 @@
 ###############################################################################
 
 from typing import List, Iterable
-import json
-from urllib.request import urlopen
 from datetime import datetime
 
+from utils.domain.httpclient import HTTPClient, get_shared_client
 from utils.domain.lookupdomain import LookupDomain
 
 API_KEY = 'EnterYourPersonalAPIKeyFromOpenWeatherMapOrg'
+API_URL = 'http://api.openweathermap.org/data/2.5'
+# seconds forecasts are reused for the same location (they are updated every few hours)
+FORECAST_TTL = 600
 
 
 class WeatherDomain(LookupDomain):
@@ -34,9 +36,16 @@ class WeatherDomain(LookupDomain):
         last_results (List[dict]): Current results which the user might request info about
     """
 
-    def __init__(self):
+    def __init__(self, api_url: str = API_URL, client: HTTPClient = None):
+        """
+        Args:
+            api_url (str): base URL of the OpenWeatherMap API
+            client (HTTPClient): client sending the requests (the client shared by all domains if None)
+        """
         LookupDomain.__init__(self, 'WeatherAPI', 'Weather')
 
+        self.api_url = api_url
+        self.client = client
         self.last_results = []
 
     def find_entities(self, constraints: dict, requested_slots: Iterable = iter(())):
@@ -126,10 +135,10 @@ class WeatherDomain(LookupDomain):
         if date is None:
             date = datetime.now()"""
 
-        url = f'http://api.openweathermap.org/data/2.5/forecast?q={location}&APPID={API_KEY}'
+        client = self.client or get_shared_client()
         try:
-            f = urlopen(url)
-            forecasts = json.loads(f.read())['list']
+            forecasts = client.get(f'{self.api_url}/forecast', params={'q': location, 'APPID': API_KEY},
+                                   ttl=FORECAST_TTL)['list']
             return self._find_closest(forecasts, date)
         except BaseException as e:
             raise(e)
@@ -27,6 +27,7 @@ import os
 from services.bst import HandcraftedBST
 from services.domain_tracker.domain_tracker import DomainTracker
 from services.service import DialogSystem
+from services.tracing import Tracer
 from utils.logger import DiasysLogger, LogLevel
 
 
@@ -151,6 +152,8 @@ if __name__ == "__main__":
     parser.add_argument('--cuda', action='store_true', help="enable cuda (currently only for asr/tts)")
     parser.add_argument('--privacy', action='store_true',
                         help="enable random mutations of the recorded voice to mask speaker identity", default=False)
+    parser.add_argument('--trace', default=None,
+                        help="record the latency of all services and write it as Chrome trace JSON to this file")
     # TODO option for remote services
     # TODO option for video
     # TODO option for multiple consecutive dialogs 
@@ -222,7 +225,8 @@ if __name__ == "__main__":
     # setup dialog system
     services.append(DomainTracker(domains=domains))
     debug_logger = logger if args.debug else None
-    ds = DialogSystem(services=services, debug_logger=debug_logger)
+    tracer = Tracer() if args.trace else None
+    ds = DialogSystem(services=services, debug_logger=debug_logger, tracer=tracer)
     error_free = ds.is_error_free_messaging_pipeline()
     if not error_free:
         ds.print_inconsistencies()
@@ -268,4 +272,7 @@ if __name__ == "__main__":
             import traceback
 
             print("##### EXCEPTION #####")
-            traceback.print_exc()
\ No newline at end of file
+            traceback.print_exc()
+        if tracer is not None:
+            tracer.export_chrome_trace(args.trace)
+            print(tracer.format_summary())
\ No newline at end of file
@@ -22,14 +22,19 @@ def load_movie_policy_tests():
 
 def run_nlu_tests(nlu, tests):
     successful_test_count = 0
+    # parse all inputs at once, an input without a system act follows the system act of the previous test
+    utterances, sys_acts = [], []
+    last_sys_act = nlu.last_sys_act
     for test in tests:
         input = test['input']
-        
         if type(input) is tuple:
-            nlu.save_last_sys_act(sys_act=input[1])
-            output = nlu.extract_user_acts(user_utterance=input[0])['user_acts']
-        else:
-            output = nlu.extract_user_acts(input)['user_acts']
+            input, last_sys_act = input[0], input[1]
+        utterances.append(input)
+        sys_acts.append(last_sys_act)
+    outputs = nlu.parse_batch(utterances, sys_acts)
+
+    for test, output in zip(tests, outputs):
+        input = test['input']
 
         try:
             expected_output = test['expected_output']
@@ -0,0 +1,432 @@
+############################################################################################
+#
+# Copyright 2020, University of Stuttgart: Institute for Natural Language Processing (IMS)
+#
+# This file is part of Adviser.
+# Adviser is free software: you can redistribute it and/or modify'
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3.
+#
+# Adviser is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Adviser.  If not, see <https://www.gnu.org/licenses/>.
+#
+############################################################################################
+
+""" This module provides the codecs used by serializing transports to encode messages.
+
+    A codec converts a message (a `(timestamp, session_id, content)` tuple) into bytes and back.
+    Codecs are chosen per topic (see `services.transport.ZMQTransport`), the name of the codec is sent along with
+    every message so that receivers know how to decode it.
+    Receivers only decode messages of codecs they are configured with: remove the `PickleCodec` from all transports
+    facing untrusted nodes, unpickling data can execute arbitrary code.
+"""
+
+import numbers
+import pickle
+import struct
+import threading
+from enum import Enum
+from typing import Any, Dict, Iterable
+
+from utils.beliefstate import BeliefState, BeliefStateDelta
+from utils.domain.domain import Domain
+from utils.sysact import SysAct, SysActionType
+from utils.useract import UserAct, UserActionType
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class Codec:
+    """ Abstract base class for message codecs. """
+
+    name = None  # unique name, sent along with each message
+
+    def __init__(self, domains: Iterable[Domain] = ()):
+        """
+        Args:
+            domains (Iterable[Domain]): domains of decoded belief states. Belief states of other domains can't be
+                                        decoded (domain names received from other nodes are never loaded).
+        """
+        self.name_bytes = bytes(self.name, encoding="ascii")
+        self._domains = {domain.get_domain_name(): domain for domain in domains}
+
+    def encode(self, message: Any) -> bytes:
+        """ Converts a message into bytes """
+        raise NotImplementedError
+
+    def decode(self, data: bytes) -> Any:
+        """ Converts bytes created by `encode` back into a message """
+        raise NotImplementedError
+
+    def _get_domain(self, name: str) -> Domain:
+        """ Returns the domain object for the given domain name of a received belief state
+
+        Raises:
+            ValueError: if the domain wasn't passed to the codec
+        """
+        if name not in self._domains:
+            raise ValueError(f"belief state of unknown domain {name!r}, pass the domain to the codec")
+        return self._domains[name]
+
+
+class PickleCodec(Codec):
+    """ Encodes arbitrary python objects with `pickle` (default).
+
+        Note: only accept pickled messages from trusted nodes.
+    """
+
+    name = 'pickle'
+
+    def encode(self, message: Any) -> bytes:
+        return pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def decode(self, data: bytes) -> Any:
+        return pickle.loads(data)
+
+
+# enums which can be part of messages encoded by the `MsgpackCodec` and `CompactCodec`
+_ENUMS = (UserActionType, SysActionType)
+
+
+class MsgpackCodec(Codec):
+    """ Encodes messages with `msgpack` (requires the `msgpack` package).
+
+        Supports `None`, `bool`, `int`, `float`, `str`, `bytes`, lists, tuples, sets, dictionaries,
+        `UserAct`, `SysAct`, `BeliefState`, `BeliefStateDelta`, `UserActionType` and `SysActionType`.
+    """
+
+    name = 'msgpack'
+
+    # extension type codes
+    _TUPLE, _SET, _ENUM, _USERACT, _SYSACT, _BELIEFSTATE, _BELIEFSTATE_DELTA = range(1, 8)
+    # maximum number of nested extension types (each one is unpacked recursively)
+    MAX_EXT_DEPTH = 64
+
+    def __init__(self, domains: Iterable[Domain] = ()):
+        if msgpack is None:
+            raise ImportError("MsgpackCodec requires the msgpack package (pip install msgpack)")
+        super().__init__(domains)
+        self._enum_ids = {enum: idx for idx, enum in enumerate(_ENUMS)}
+        # nesting depth of the extension types decoded by the current thread
+        self._ext_depth = threading.local()
+
+    def encode(self, message: Any) -> bytes:
+        return msgpack.packb(message, default=self._default, strict_types=True, use_bin_type=True)
+
+    def decode(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, ext_hook=self._ext_hook, raw=False, strict_map_key=False)
+
+    def _pack(self, obj: Any) -> bytes:
+        return msgpack.packb(obj, default=self._default, strict_types=True, use_bin_type=True)
+
+    def _default(self, obj: Any):
+        """ Converts objects not natively supported by msgpack into extension types """
+        if isinstance(obj, tuple):
+            return msgpack.ExtType(self._TUPLE, self._pack(list(obj)))
+        if isinstance(obj, (set, frozenset)):
+            return msgpack.ExtType(self._SET, self._pack(list(obj)))
+        if isinstance(obj, Enum) and type(obj) in self._enum_ids:
+            return msgpack.ExtType(self._ENUM, self._pack([self._enum_ids[type(obj)], obj.value]))
+        if isinstance(obj, UserAct):
+            return msgpack.ExtType(self._USERACT, self._pack([obj.text, obj.type, obj.slot, obj.value, obj.score]))
+        if isinstance(obj, SysAct):
+            return msgpack.ExtType(self._SYSACT, self._pack([obj.type, obj.slot_values]))
+        if isinstance(obj, BeliefState):
+            return msgpack.ExtType(self._BELIEFSTATE, self._pack([obj.domain.get_domain_name(), obj._history]))
+        if isinstance(obj, BeliefStateDelta):
+            return msgpack.ExtType(self._BELIEFSTATE_DELTA,
+                                   self._pack([obj.domain.get_domain_name(), obj.base, obj.turns]))
+        # subclasses of supported types (e.g. numpy scalars) are sent as the base type
+        for base_type in (bool, str, bytes, dict, list):
+            if isinstance(obj, base_type):
+                return base_type(obj)
+        if isinstance(obj, numbers.Integral):
+            return int(obj)
+        if isinstance(obj, numbers.Real):
+            return float(obj)
+        raise TypeError(f"MsgpackCodec can't encode objects of type {type(obj).__name__}")
+
+    def _ext_hook(self, code: int, data: bytes):
+        """ Restores objects from extension types """
+        depth = getattr(self._ext_depth, 'value', 0)
+        if depth >= self.MAX_EXT_DEPTH:
+            raise ValueError("msgpack message nested too deeply")
+        self._ext_depth.value = depth + 1
+        try:
+            obj = self.decode(data)
+        finally:
+            self._ext_depth.value = depth
+        if code == self._TUPLE:
+            return tuple(obj)
+        if code == self._SET:
+            return set(obj)
+        if code == self._ENUM:
+            return _ENUMS[obj[0]](obj[1])
+        if code == self._USERACT:
+            return UserAct(text=obj[0], act_type=obj[1], slot=obj[2], value=obj[3], score=obj[4])
+        if code == self._SYSACT:
+            return SysAct(act_type=obj[0], slot_values=obj[1])
+        if code == self._BELIEFSTATE:
+            return _restore_beliefstate(self._get_domain(obj[0]), obj[1])
+        if code == self._BELIEFSTATE_DELTA:
+            return BeliefStateDelta(self._get_domain(obj[0]), obj[1], obj[2])
+        raise ValueError(f"unknown msgpack extension type {code}")
+
+
+def _restore_beliefstate(domain: Domain, history: list) -> BeliefState:
+    """ Creates a belief state for the given domain and turn history without initializing it """
+    beliefstate = BeliefState.__new__(BeliefState)
+    beliefstate.domain = domain
+    beliefstate._history = history
+    return beliefstate
+
+
+class CompactCodec(Codec):
+    """ Schema-based binary encoding for dialog acts and belief states.
+
+        Every value is written as a one byte type tag followed by its fields, lengths and integers are varints.
+        Dialog act types are encoded as their index in the corresponding enum, so a `UserAct` without text needs
+        only a few bytes more than its slot and value.
+        Supports `None`, `bool`, `int`, `float`, `str`, `bytes`, lists, tuples, sets, dictionaries,
+        `UserAct`, `SysAct`, `BeliefState`, `BeliefStateDelta`, `UserActionType` and `SysActionType`.
+        Decoding never creates objects of other types, belief states are only decoded for the domains passed
+        to the codec.
+    """
+
+    name = 'compact'
+
+    (_NONE, _TRUE, _FALSE, _INT, _FLOAT, _STR, _BYTES, _LIST, _TUPLE, _SET, _DICT, _ENUM,
+     _USERACT, _SYSACT, _BELIEFSTATE, _BELIEFSTATE_DELTA) = range(16)
+
+    def __init__(self, domains: Iterable[Domain] = ()):
+        super().__init__(domains)
+        self._enum_members = [list(enum) for enum in _ENUMS]
+        self._enum_codes = {member: (enum_idx, member_idx)
+                            for enum_idx, members in enumerate(self._enum_members)
+                            for member_idx, member in enumerate(members)}
+        self._encoders = {
+            type(None): self._encode_none, bool: self._encode_bool, int: self._encode_int,
+            float: self._encode_float, str: self._encode_str, bytes: self._encode_bytes,
+            list: self._encode_list, tuple: self._encode_tuple, set: self._encode_set, frozenset: self._encode_set,
+            dict: self._encode_dict, UserAct: self._encode_useract, SysAct: self._encode_sysact,
+            BeliefState: self._encode_beliefstate, BeliefStateDelta: self._encode_beliefstate_delta
+        }
+        for enum in _ENUMS:
+            self._encoders[enum] = self._encode_enum
+
+    def encode(self, message: Any) -> bytes:
+        buffer = bytearray()
+        self._encode(message, buffer)
+        return bytes(buffer)
+
+    def decode(self, data: bytes) -> Any:
+        try:
+            value, _ = self._decode(data, 0)
+        except RecursionError:
+            raise ValueError("compact message nested too deeply") from None
+        return value
+
+    # encoding
+
+    def _encode(self, obj: Any, buffer: bytearray):
+        encoder = self._encoders.get(type(obj))
+        if encoder is None:
+            encoder = self._find_encoder(type(obj))
+        encoder(obj, buffer)
+
+    def _find_encoder(self, obj_type: type):
+        """ Finds (and caches) the encoder for subclasses of supported types, e.g. numpy scalars """
+        for base_type in obj_type.__mro__:
+            if base_type in self._encoders:
+                encoder = self._encoders[base_type]
+                break
+        else:
+            if issubclass(obj_type, numbers.Integral):
+                encoder = lambda obj, buffer: self._encode_int(int(obj), buffer)
+            elif issubclass(obj_type, numbers.Real):
+                encoder = lambda obj, buffer: self._encode_float(float(obj), buffer)
+            else:
+                raise TypeError(f"CompactCodec can't encode objects of type {obj_type.__name__}")
+        self._encoders[obj_type] = encoder
+        return encoder
+
+    @staticmethod
+    def _write_varint(number: int, buffer: bytearray):
+        while number > 0x7f:
+            buffer.append((number & 0x7f) | 0x80)
+            number >>= 7
+        buffer.append(number)
+
+    def _encode_none(self, obj, buffer: bytearray):
+        buffer.append(self._NONE)
+
+    def _encode_bool(self, obj: bool, buffer: bytearray):
+        buffer.append(self._TRUE if obj else self._FALSE)
+
+    def _encode_int(self, obj: int, buffer: bytearray):
+        buffer.append(self._INT)
+        # zigzag encoding: small negative numbers get small varints as well
+        self._write_varint(obj << 1 if obj >= 0 else ((-obj) << 1) - 1, buffer)
+
+    def _encode_float(self, obj: float, buffer: bytearray):
+        buffer.append(self._FLOAT)
+        buffer += struct.pack('<d', obj)
+
+    def _encode_str(self, obj: str, buffer: bytearray):
+        data = obj.encode('utf-8')
+        buffer.append(self._STR)
+        self._write_varint(len(data), buffer)
+        buffer += data
+
+    def _encode_bytes(self, obj: bytes, buffer: bytearray):
+        buffer.append(self._BYTES)
+        self._write_varint(len(obj), buffer)
+        buffer += obj
+
+    def _encode_items(self, tag: int, items, buffer: bytearray):
+        buffer.append(tag)
+        self._write_varint(len(items), buffer)
+        for item in items:
+            self._encode(item, buffer)
+
+    def _encode_list(self, obj: list, buffer: bytearray):
+        self._encode_items(self._LIST, obj, buffer)
+
+    def _encode_tuple(self, obj: tuple, buffer: bytearray):
+        self._encode_items(self._TUPLE, obj, buffer)
+
+    def _encode_set(self, obj: set, buffer: bytearray):
+        self._encode_items(self._SET, obj, buffer)
+
+    def _encode_dict(self, obj: dict, buffer: bytearray):
+        buffer.append(self._DICT)
+        self._write_varint(len(obj), buffer)
+        for key, value in obj.items():
+            self._encode(key, buffer)
+            self._encode(value, buffer)
+
+    def _encode_enum(self, obj: Enum, buffer: bytearray):
+        enum_idx, member_idx = self._enum_codes[obj]
+        buffer.append(self._ENUM)
+        buffer.append(enum_idx)
+        self._write_varint(member_idx, buffer)
+
+    def _encode_useract(self, obj: UserAct, buffer: bytearray):
+        buffer.append(self._USERACT)
+        self._encode(obj.text, buffer)
+        self._encode(obj.type, buffer)
+        self._encode(obj.slot, buffer)
+        self._encode(obj.value, buffer)
+        self._encode(obj.score, buffer)
+
+    def _encode_sysact(self, obj: SysAct, buffer: bytearray):
+        buffer.append(self._SYSACT)
+        self._encode(obj.type, buffer)
+        self._encode(obj.slot_values, buffer)
+
+    def _encode_beliefstate(self, obj: BeliefState, buffer: bytearray):
+        buffer.append(self._BELIEFSTATE)
+        self._encode(obj.domain.get_domain_name(), buffer)
+        self._encode(obj._history, buffer)
+
+    def _encode_beliefstate_delta(self, obj: BeliefStateDelta, buffer: bytearray):
+        buffer.append(self._BELIEFSTATE_DELTA)
+        self._encode(obj.domain.get_domain_name(), buffer)
+        self._encode(obj.base, buffer)
+        self._encode(obj.turns, buffer)
+
+    # decoding
+
+    @staticmethod
+    def _read_varint(data: bytes, pos: int):
+        number = 0
+        shift = 0
+        while True:
+            byte = data[pos]
+            pos += 1
+            number |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                return number, pos
+            shift += 7
+
+    def _decode(self, data: bytes, pos: int):
+        """ Decodes the value starting at `pos`, returns the value and the position after it """
+        tag = data[pos]
+        pos += 1
+        if tag == self._STR:
+            length, pos = self._read_varint(data, pos)
+            return data[pos:pos + length].decode('utf-8'), pos + length
+        if tag == self._NONE:
+            return None, pos
+        if tag == self._TRUE:
+            return True, pos
+        if tag == self._FALSE:
+            return False, pos
+        if tag == self._INT:
+            number, pos = self._read_varint(data, pos)
+            return (number >> 1) if not number & 1 else -((number + 1) >> 1), pos
+        if tag == self._FLOAT:
+            return struct.unpack_from('<d', data, pos)[0], pos + 8
+        if tag == self._ENUM:
+            member_idx, new_pos = self._read_varint(data, pos + 1)
+            return self._enum_members[data[pos]][member_idx], new_pos
+        if tag in (self._LIST, self._TUPLE, self._SET):
+            length, pos = self._read_varint(data, pos)
+            items = []
+            for _ in range(length):
+                item, pos = self._decode(data, pos)
+                items.append(item)
+            if tag == self._TUPLE:
+                return tuple(items), pos
+            if tag == self._SET:
+                return set(items), pos
+            return items, pos
+        if tag == self._DICT:
+            length, pos = self._read_varint(data, pos)
+            result = {}
+            for _ in range(length):
+                key, pos = self._decode(data, pos)
+                result[key], pos = self._decode(data, pos)
+            return result, pos
+        if tag == self._USERACT:
+            text, pos = self._decode(data, pos)
+            act_type, pos = self._decode(data, pos)
+            slot, pos = self._decode(data, pos)
+            value, pos = self._decode(data, pos)
+            score, pos = self._decode(data, pos)
+            return UserAct(text=text, act_type=act_type, slot=slot, value=value, score=score), pos
+        if tag == self._SYSACT:
+            act_type, pos = self._decode(data, pos)
+            slot_values, pos = self._decode(data, pos)
+            return SysAct(act_type=act_type, slot_values=slot_values), pos
+        if tag == self._BELIEFSTATE:
+            domain_name, pos = self._decode(data, pos)
+            history, pos = self._decode(data, pos)
+            return _restore_beliefstate(self._get_domain(domain_name), history), pos
+        if tag == self._BELIEFSTATE_DELTA:
+            domain_name, pos = self._decode(data, pos)
+            base, pos = self._decode(data, pos)
+            turns, pos = self._decode(data, pos)
+            return BeliefStateDelta(self._get_domain(domain_name), base, turns), pos
+        if tag == self._BYTES:
+            length, pos = self._read_varint(data, pos)
+            return bytes(data[pos:pos + length]), pos + length
+        raise ValueError(f"unknown type tag {tag} in compact message")
+
+
+def get_codec(codec, domains: Iterable[Domain] = ()) -> Codec:
+    """ Returns the given codec instance, or creates a codec by name ('pickle', 'msgpack' or 'compact') """
+    if isinstance(codec, Codec):
+        return codec
+    codecs = {PickleCodec.name: PickleCodec, MsgpackCodec.name: MsgpackCodec, CompactCodec.name: CompactCodec}
+    if codec not in codecs:
+        raise ValueError(f"unknown codec {codec}, choose one of {list(codecs)}")
+    return codecs[codec](domains)
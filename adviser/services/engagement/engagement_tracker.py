@@ -33,6 +33,7 @@ from zmq import Context
 import json
 
 from utils.userstate import EngagementType
+from services.qos import QoS
 from services.service import Service, PublishSubscribe
 
 
@@ -80,7 +81,8 @@ class EngagementTracker(Service):
                 self.extractor_thread.start()
     
 
-    @PublishSubscribe(pub_topics=["engagement", "gaze_direction"])
+    @PublishSubscribe(pub_topics=["engagement", "gaze_direction"],
+                      qos={"engagement": QoS(max_queue=100), "gaze_direction": QoS(max_queue=100)})
     def yield_gaze_direction(self, engagement: EngagementType, gaze_direction: Tuple[float, float]):
         """
         This is a helper function for the continuous publishing of engagement features.
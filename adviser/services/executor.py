@@ -0,0 +1,294 @@
+############################################################################################
+#
+# Copyright 2020, University of Stuttgart: Institute for Natural Language Processing (IMS)
+#
+# This file is part of Adviser.
+# Adviser is free software: you can redistribute it and/or modify'
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3.
+#
+# Adviser is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Adviser.  If not, see <https://www.gnu.org/licenses/>.
+#
+############################################################################################
+
+""" This module provides the execution models for the message listeners of services.
+
+    A listener is a subscriber channel (see `services.transport`) together with a handler
+    `handler(topic, message) -> bool` processing its messages in order. The handler returns False once the listener
+    should stop, its channel is closed afterwards.
+"""
+
+import threading
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread
+from typing import Any, Callable, Tuple
+
+import zmq
+
+
+class Executor:
+    """ Abstract base class for executors running the message listeners of services. """
+
+    def register(self, subscriber, handler: Callable[[str, Tuple[float, str, Any]], bool], group: Any = None):
+        """ Starts passing the messages received by `subscriber` to `handler`.
+
+        Args:
+            subscriber: subscriber channel of a `services.transport.Transport`
+            handler (Callable[[str, Tuple[float, str, Any]], bool]): called with topic and message of each received
+                                                                     message, returns False to stop listening
+            group (Any): listeners with the same group (e.g. the same service) share a concurrency limit
+        """
+        raise NotImplementedError
+
+    def shutdown(self):
+        """ Stops the executor after all listeners stopped """
+        pass
+
+
+class ThreadExecutor(Executor):
+    """ Runs each listener in its own thread, blocking on its subscriber channel (default). """
+
+    def register(self, subscriber, handler: Callable[[str, Tuple[float, str, Any]], bool], group: Any = None):
+        Thread(target=self._listen, args=(subscriber, handler)).start()
+
+    @staticmethod
+    def _listen(subscriber, handler: Callable[[str, Tuple[float, str, Any]], bool]):
+        listen = True
+        while listen:
+            try:
+                listen = handler(*subscriber.recv())
+            except KeyboardInterrupt:
+                break
+        subscriber.close()
+
+
+class _Strand:
+    """ Messages of a single listener, processed one after the other """
+
+    def __init__(self, subscriber, handler: Callable, decode: Callable, group: '_Group'):
+        self.subscriber = subscriber
+        self.handler = handler
+        self.decode = decode
+        self.group = group
+        self.messages = deque()
+        self.scheduled = False  # True while the strand is waiting for or running on a worker
+        self.closed = False
+
+
+class _Group:
+    """ Listeners sharing a concurrency limit """
+
+    def __init__(self, limit: int = None):
+        self.limit = limit
+        self.running = 0
+        self.waiting = deque()  # strands with messages, waiting for the limit
+
+
+class PooledExecutor(Executor):
+    """ Multiplexes the subscriber channels of all listeners and processes their messages on a bounded worker pool.
+
+        zmq subscriber sockets are watched by a single poller thread, in-process subscriber channels
+        (`services.transport.LocalTransport`) pass their messages to the executor directly.
+
+        Guarantees:
+            * the messages of a listener are processed one after the other, in the order they were received
+            * at most `max_concurrency` handlers of the same group (service) run at the same time
+
+        Note: handlers blocking for a long time (e.g. waiting for console input) occupy a worker.
+              Use the `ThreadExecutor` for such services.
+    """
+
+    def __init__(self, num_workers: int = 4, max_concurrency: int = None, batch_size: int = 16,
+                 poll_timeout: int = 100):
+        """
+        Args:
+            num_workers (int): number of worker threads (at least 2: the control message handler of a service
+                               waits for its listeners to acknowledge control messages)
+            max_concurrency (int): maximum number of concurrently running handlers per group (None: no limit)
+            batch_size (int): maximum number of messages of a listener processed before other listeners get the worker
+            poll_timeout (int): interval (ms) in which the poller thread checks whether it should stop
+        """
+        assert num_workers >= 2, "the pooled executor requires at least 2 workers"
+        self.max_concurrency = max_concurrency
+        self.batch_size = batch_size
+        self.poll_timeout = poll_timeout
+        self._pool = ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix="PooledExecutor")
+        self._lock = threading.Lock()
+        self._groups = {}
+        # handlers without group (control message handlers) wait for other handlers:
+        # leave at least one worker for the handlers they are waiting for
+        self._ungrouped = _Group(num_workers - 1)
+
+        # poller thread (started with the first zmq subscriber)
+        self._poller_thread = None
+        self._sockets = {}  # zmq socket -> strand (None: remove socket)
+        self._sockets_changed = False
+        self._poller_stopped = False
+        self._poller_lock = threading.Lock()
+        self._wake_address = f"inproc://PooledExecutor-{id(self)}"
+        self._wake_sender = None
+        self._stop = threading.Event()
+
+    def register(self, subscriber, handler: Callable[[str, Tuple[float, str, Any]], bool], group: Any = None):
+        with self._lock:
+            if group is None:
+                strand_group = self._ungrouped
+            else:
+                if group not in self._groups:
+                    self._groups[group] = _Group(self.max_concurrency)
+                strand_group = self._groups[group]
+        if hasattr(subscriber, 'set_callback'):
+            # in-process channel: messages are passed to the executor by the publishing thread
+            strand = _Strand(subscriber, handler, None, strand_group)
+            subscriber.set_callback(lambda topic, message: self._submit(strand, (topic, message)))
+        else:
+            strand = _Strand(subscriber, handler, subscriber.decode, strand_group)
+            self._add_socket(subscriber.socket, strand)
+
+    def shutdown(self):
+        self._stop.set()
+        if self._poller_thread is not None:
+            self._wake()
+            self._poller_thread.join()
+        self._pool.shutdown(wait=True)
+
+    # scheduling
+
+    def _submit(self, strand: _Strand, message):
+        """ Queues a message of a listener and schedules the listener, if it isn't already """
+        with self._lock:
+            if strand.closed:
+                return
+            strand.messages.append(message)
+            if not strand.scheduled:
+                strand.scheduled = True
+                self._schedule(strand)
+
+    def _schedule(self, strand: _Strand):
+        """ Runs the strand on a worker or lets it wait for its group's limit (call with `_lock` held) """
+        group = strand.group
+        if group.limit is not None and group.running >= group.limit:
+            group.waiting.append(strand)
+        else:
+            group.running += 1
+            self._pool.submit(self._run, strand)
+
+    def _run(self, strand: _Strand):
+        """ Processes the queued messages of a listener (on a worker thread) """
+        listen = True
+        for _ in range(self.batch_size):
+            with self._lock:
+                if not strand.messages:
+                    break
+                message = strand.messages.popleft()
+            try:
+                topic, message = strand.decode(message) if strand.decode is not None else message
+                listen = strand.handler(topic, message)
+            except:
+                print("THREAD ERROR")
+                traceback.print_exc()
+            if not listen:
+                break
+        with self._lock:
+            group = strand.group
+            group.running -= 1
+            if not listen:
+                strand.closed = True
+                strand.messages.clear()
+            if strand.messages:
+                self._schedule(strand)
+            else:
+                strand.scheduled = False
+            while group.waiting and (group.limit is None or group.running < group.limit):
+                self._schedule(group.waiting.popleft())
+        if not listen:
+            self._close(strand)
+
+    def _close(self, strand: _Strand):
+        if strand.decode is not None:
+            self._remove_socket(strand.subscriber.socket)
+        else:
+            strand.subscriber.close()
+
+    # poller
+
+    def _add_socket(self, socket: zmq.Socket, strand: _Strand):
+        with self._poller_lock:
+            if self._poller_thread is None:
+                wake_receiver = zmq.Context.instance().socket(zmq.PAIR)
+                wake_receiver.bind(self._wake_address)
+                self._wake_sender = zmq.Context.instance().socket(zmq.PAIR)
+                self._wake_sender.connect(self._wake_address)
+                self._poller_thread = Thread(target=self._poll, args=(wake_receiver,), daemon=True)
+                self._poller_thread.start()
+            self._sockets[socket] = strand
+            self._sockets_changed = True
+        self._wake()
+
+    def _remove_socket(self, socket: zmq.Socket):
+        with self._poller_lock:
+            if self._poller_stopped:
+                socket.close()
+                return
+            self._sockets[socket] = None  # closed by the poller thread
+            self._sockets_changed = True
+        self._wake()
+
+    def _wake(self):
+        """ Interrupts the poller thread to update the polled sockets """
+        with self._poller_lock:
+            if self._poller_stopped:
+                return
+            try:
+                self._wake_sender.send(b"", zmq.NOBLOCK)
+            except zmq.Again:
+                pass  # poller thread will wake up anyway (there are unprocessed wake up messages)
+
+    def _poll(self, wake_receiver: zmq.Socket):
+        """ Waits for messages on all registered zmq sockets and passes them on to the listeners' strands """
+        poller = zmq.Poller()
+        poller.register(wake_receiver, zmq.POLLIN)
+        polled = {}
+        while not self._stop.is_set():
+            # synchronize polled sockets with registered ones
+            if self._sockets_changed:
+                self._sync_sockets(poller, polled)
+            for socket, _ in poller.poll(self.poll_timeout):
+                if socket is wake_receiver:
+                    wake_receiver.recv()
+                    continue
+                strand = polled[socket]
+                # receive all queued messages, they are decoded by the worker processing them
+                while socket.poll(0):
+                    self._submit(strand, socket.recv_multipart(copy=True))
+        # stopped: close all sockets (sockets of listeners stopping later are closed by `_remove_socket`)
+        with self._poller_lock:
+            self._poller_stopped = True
+            for socket in self._sockets:
+                socket.close()
+            self._sockets.clear()
+            wake_receiver.close()
+            self._wake_sender.close()
+
+    def _sync_sockets(self, poller: zmq.Poller, polled: dict):
+        """ Registers new and closes removed sockets (in the poller thread) """
+        with self._poller_lock:
+            self._sockets_changed = False
+            for socket, strand in list(self._sockets.items()):
+                if strand is None:
+                    del self._sockets[socket]
+                    if socket in polled:
+                        poller.unregister(socket)
+                        del polled[socket]
+                    socket.close()
+                elif socket not in polled:
+                    poller.register(socket, zmq.POLLIN)
+                    polled[socket] = strand
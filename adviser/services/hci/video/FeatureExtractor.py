@@ -28,6 +28,7 @@ from imutils import face_utils
 
 from utils.domain.domain import Domain
 from utils.domain.jsonlookupdomain import JSONLookupDomain
+from services.qos import QoS
 from services.service import PublishSubscribe
 from services.service import Service
 
@@ -47,7 +48,7 @@ class VideoFeatureExtractor(Service):
         self.PREDICTOR = dlib.shape_predictor(predictor_file)
 
     @PublishSubscribe(queued_sub_topics=["video_input"], sub_topics=["user_acts"],
-                      pub_topics=["fl_features"])
+                      pub_topics=["fl_features"], qos={"video_input": QoS(max_queue=32)})
     def extract_fl_features(self, video_input, user_acts):
         """TODO
 
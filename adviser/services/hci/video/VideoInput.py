@@ -23,6 +23,7 @@ from typing import List
 
 import cv2
 
+from services.qos import QoS
 from services.service import Service, PublishSubscribe
 
 
@@ -81,7 +82,7 @@ class VideoInput(Service):
             print("Starting video capture...")
             self.capture_thread.start()
 
-    @PublishSubscribe(pub_topics=['video_input'])
+    @PublishSubscribe(pub_topics=['video_input'], qos={'video_input': QoS(max_queue=32)})
     def publish_img(self, rgb_img) -> dict(video_input=List[object]):
         """
         Helper function to publish images from a loop.
@@ -0,0 +1,139 @@
+############################################################################################
+#
+# Copyright 2020, University of Stuttgart: Institute for Natural Language Processing (IMS)
+#
+# This file is part of Adviser.
+# Adviser is free software: you can redistribute it and/or modify'
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3.
+#
+# Adviser is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Adviser.  If not, see <https://www.gnu.org/licenses/>.
+#
+############################################################################################
+
+
+""" This module provides the compiled rules of the handcrafted NLU and their artifact: a pickle file written by
+    `tools/regextemplates/gen_regexes.py` next to the JSON rule files, which `HandcraftedNLU` loads instead of
+    reading and compiling the JSON rule files.
+
+    The artifact records the files it was created from (the .nlu template, the ontology and the JSON rule files)
+    and a hash of their contents. It is stale (and ignored) if one of these files changed, or if it was written by
+    a different version of this module.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from services.nlu.regexmatcher import RegexMatcher
+from utils.common import Language
+
+# increase when the content of the artifact (including the state of `RegexMatcher`) changes
+ARTIFACT_VERSION = 1
+
+
+def get_rule_files(domain_name: str, language: Language) -> Tuple[str, str, str]:
+    """ Returns the names of the JSON files of the general, request and inform rules """
+    if language == Language.GERMAN:
+        return 'GeneralRulesGerman.json', f'{domain_name}GermanRequestRules.json', \
+               f'{domain_name}GermanInformRules.json'
+    return 'GeneralRules.json', f'{domain_name}RequestRules.json', f'{domain_name}InformRules.json'
+
+
+def get_artifact_file(domain_name: str, language: Language) -> str:
+    """ Returns the name of the artifact file of the compiled rules """
+    if language == Language.GERMAN:
+        return f'{domain_name}GermanCompiledRules.pickle'
+    return f'{domain_name}CompiledRules.pickle'
+
+
+def hash_files(root_dir: str, files: Iterable[str]) -> str:
+    """ Returns a hash of the names (relative to `root_dir`) and contents of the files """
+    digest = hashlib.sha256(str(ARTIFACT_VERSION).encode())
+    for file in files:
+        digest.update(file.encode())
+        with open(os.path.join(root_dir, file), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class CompiledRules(object):
+    """ The rules of the handcrafted NLU of a domain and their matchers """
+
+    def __init__(self, general_regex: Dict[str, str], request_regex: Dict[str, str],
+                 inform_regex: Dict[str, Dict[str, str]], requestable_slots: Iterable[str],
+                 informable_slots: Iterable[str]):
+        """
+        Args:
+            general_regex (Dict[str, str]): act -> regular expression
+            request_regex (Dict[str, str]): slot -> regular expression
+            inform_regex (Dict[str, Dict[str, str]]): slot -> value -> regular expression
+            requestable_slots (Iterable[str]): slots the user can request
+            informable_slots (Iterable[str]): slots the user can inform
+        """
+        self.general_regex = general_regex
+        self.request_regex = request_regex
+        self.inform_regex = inform_regex
+        self.general_matcher = RegexMatcher(general_regex, require_group=False)
+        self.request_matcher = RegexMatcher({slot: request_regex[slot] for slot in requestable_slots})
+        self.inform_matcher = RegexMatcher({(slot, value): regex for slot in informable_slots
+                                            for value, regex in inform_regex[slot].items()})
+
+    @classmethod
+    def from_json(cls, folder: str, domain_name: str, language: Language, requestable_slots: Iterable[str],
+                  informable_slots: Iterable[str]) -> 'CompiledRules':
+        """ Reads the JSON rule files of the domain from the folder and compiles them """
+        general_file, request_file, inform_file = get_rule_files(domain_name, language)
+        # as dictionaries {act:regex, ...} or {slot:{value:regex, ...}, ...}
+        with open(os.path.join(folder, general_file)) as f:
+            general_regex = json.load(f)
+        with open(os.path.join(folder, request_file)) as f:
+            request_regex = json.load(f)
+        with open(os.path.join(folder, inform_file)) as f:
+            inform_regex = json.load(f)
+        return cls(general_regex, request_regex, inform_regex, requestable_slots, informable_slots)
+
+    def matches_slots(self, requestable_slots: Iterable[str], informable_slots: Iterable[str]) -> bool:
+        """ Returns whether the rules were compiled for the given slots """
+        return self.request_matcher.keys == list(requestable_slots) and self.inform_matcher.keys == [
+            (slot, value) for slot in informable_slots for value in self.inform_regex.get(slot, ())]
+
+    def save(self, file_path: str, root_dir: str, sources: List[str]):
+        """ Writes the artifact of the rules
+
+        Args:
+            file_path (str): path of the artifact file
+            root_dir (str): folder the paths of the sources are relative to (the adviser folder)
+            sources (List[str]): files the rules were created from
+        """
+        artifact = {'version': ARTIFACT_VERSION, 'sources': sources, 'hash': hash_files(root_dir, sources),
+                    'rules': self}
+        with open(file_path, 'wb') as f:
+            pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(file_path: str, root_dir: str) -> Optional['CompiledRules']:
+        """ Returns the rules of the artifact, None if the artifact doesn't exist or is stale
+
+        Args:
+            file_path (str): path of the artifact file
+            root_dir (str): folder the paths of the sources are relative to (the adviser folder)
+        """
+        try:
+            with open(file_path, 'rb') as f:
+                artifact = pickle.load(f)
+            if artifact['version'] != ARTIFACT_VERSION \
+                    or artifact['hash'] != hash_files(root_dir, artifact['sources']):
+                return None
+        except (OSError, ImportError, pickle.UnpicklingError, AttributeError, KeyError, TypeError, EOFError):
+            # missing artifact or source file, or written by an incompatible version
+            return None
+        return artifact['rules']
@@ -0,0 +1,72 @@
+############################################################################################
+#
+# Copyright 2020, University of Stuttgart: Institute for Natural Language Processing (IMS)
+#
+# This file is part of Adviser.
+# Adviser is free software: you can redistribute it and/or modify'
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3.
+#
+# Adviser is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Adviser.  If not, see <https://www.gnu.org/licenses/>.
+#
+############################################################################################
+
+
+""" This module provides the process pool parsing a batch of utterances with copies of an NLU (see
+    `HandcraftedNLU.parse_batch`).
+"""
+
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List
+
+from utils.sysact import SysAct
+from utils.useract import UserAct
+
+# NLU of a worker process, see `_init_worker`
+_worker_nlu = None
+
+
+def _init_worker(nlu_factory: Callable):
+    global _worker_nlu
+    _worker_nlu = nlu_factory()
+
+
+def _parse_in_worker(utterances: List[str], sys_act_contexts: List[SysAct]) -> List[List[UserAct]]:
+    return _worker_nlu.parse_batch(utterances, sys_act_contexts)
+
+
+def parse_in_processes(nlu_factory: Callable, utterances: List[str], sys_act_contexts: List[SysAct],
+                       num_workers: int, chunks_per_worker: int = 4,
+                       start_method: str = 'spawn') -> List[List[UserAct]]:
+    """ Parses the utterances in `num_workers` processes, each creating its own NLU
+
+    Args:
+        nlu_factory (Callable): picklable function returning an NLU with a `parse_batch` method, e.g.
+                                `functools.partial(HandcraftedNLU, domain)`
+        utterances (List[str]): utterances to parse
+        sys_act_contexts (List[SysAct]): system act preceding each utterance (None: first turn)
+        num_workers (int): number of processes
+        chunks_per_worker (int): number of consecutive utterance chunks per process (balancing the load)
+        start_method (str): multiprocessing start method of the processes; 'fork' starts them faster, but
+                            only suits single-threaded callers (e.g. not a running dialog system):
+                            locks held by other threads at the fork stay locked in the processes
+
+    Returns:
+        The user acts of each utterance (in the order of the utterances)
+    """
+    chunk_size = max(1, math.ceil(len(utterances) / (num_workers * chunks_per_worker)))
+    starts = range(0, len(utterances), chunk_size)
+    context = multiprocessing.get_context(start_method)
+    with ProcessPoolExecutor(max_workers=num_workers, mp_context=context, initializer=_init_worker,
+                             initargs=(nlu_factory,)) as executor:
+        chunks = executor.map(_parse_in_worker, [utterances[start:start + chunk_size] for start in starts],
+                              [sys_act_contexts[start:start + chunk_size] for start in starts])
+        return [user_acts for chunk in chunks for user_acts in chunk]
@@ -17,11 +17,13 @@
 #
 ###############################################################################
 
-import json
+import copy
 import os
-import re
-from typing import List
+from functools import partial
+from typing import Callable, List
 
+from services.nlu.artifact import CompiledRules, get_artifact_file
+from services.nlu.batch import parse_in_processes
 from services.service import PublishSubscribe
 from services.service import Service
 from utils import UserAct, UserActionType
@@ -65,6 +67,8 @@ class HandcraftedNLU(Service):
 
     """
 
+    session_attributes = ('sys_act_info', 'user_acts', 'slots_informed', 'slots_requested', 'req_everything')
+
     def __init__(self, domain: JSONLookupDomain, logger: DiasysLogger = DiasysLogger(),
                  language: Language = None):
         """
@@ -135,8 +139,63 @@ class HandcraftedNLU(Service):
             dict of str: UserAct - a dictionary with the key "user_acts" and the value
                                             containing a list of user actions
         """
-        result = {}
+        user_acts = self._parse_utterance(user_utterance)
+        self.logger.dialog_turn("User Actions: %s" % str(user_acts))
+        return {'user_acts': user_acts}
+
+    def parse_batch(self, utterances: List[str], sys_act_contexts: List[SysAct] = None,
+                    num_workers: int = 1) -> List[List[UserAct]]:
+        """
+        Detects the user acts of many utterances (e.g. to label or evaluate a corpus), without a dialog system.
+
+        Every utterance is parsed like the first utterance after its system act, independently of the
+        other utterances. The dialog state of this NLU isn't changed, also not while it handles dialogs in
+        other threads.
+
+        Args:
+            utterances (List[str]): user utterances
+            sys_act_contexts (List[SysAct]): the system act preceding each utterance (None: the utterance
+                                             starts the dialog), by default no utterance has a system act
+            num_workers (int): number of processes (each loading its own NLU) parsing parts of the utterances
+
+        Returns:
+            List[List[UserAct]]: the user acts of each utterance
+        """
+        if sys_act_contexts is None:
+            sys_act_contexts = [None] * len(utterances)
+        if len(sys_act_contexts) != len(utterances):
+            raise ValueError(f"got {len(sys_act_contexts)} system acts for {len(utterances)} utterances")
+        if num_workers > 1:
+            return parse_in_processes(self._batch_worker_factory(), utterances, sys_act_contexts, num_workers)
+        # the utterances are parsed by a shallow copy sharing the compiled rules of this NLU, its dialog
+        # attributes are its own, so dialogs handled meanwhile (in any mode or thread) aren't affected
+        batch_nlu = copy.copy(self)
+        batch_user_acts = []
+        for utterance, sys_act in zip(utterances, sys_act_contexts):
+            batch_nlu.sys_act_info = {'last_act': sys_act, 'lastInformedPrimKeyVal': None, 'lastRequestSlot': None}
+            batch_user_acts.append(batch_nlu._parse_utterance(utterance))
+        return batch_user_acts
+
+    def _batch_worker_factory(self) -> Callable[[], 'HandcraftedNLU']:
+        """
+        Returns a function creating a copy of this NLU in each worker process of `parse_batch`. Subclasses
+        with other constructor arguments override it.
+
+        Returns:
+            Callable: function without arguments constructing the NLU with the arguments of this one
+        """
+        return partial(type(self), self.domain, logger=self.logger, language=self.language)
+
+    def _parse_utterance(self, user_utterance: str) -> List[UserAct]:
+        """
+        Detects the user acts of the utterance given the last system act (in `sys_act_info`)
+
+        Args:
+            user_utterance (str): text input from user
 
+        Returns:
+            List[UserAct]: the user acts
+        """
         # Setting request everything to False at every turn
         self.req_everything = False
 
@@ -164,10 +223,7 @@ class HandcraftedNLU(Service):
                 self.user_acts.append(UserAct(text=user_utterance if user_utterance else "",
                                               act_type=UserActionType.Bad))
         self._assign_scores()
-        self.logger.dialog_turn("User Actions: %s" % str(self.user_acts))
-        result['user_acts'] = self.user_acts
-
-        return result
+        return self.user_acts
 
     @PublishSubscribe(sub_topics=["sys_state"])
     def _update_sys_act_info(self, sys_state):
@@ -189,72 +245,72 @@ class HandcraftedNLU(Service):
 
         """
 
-        # Iteration over all general acts
-        for act in self.general_regex:
-            # Check if the regular expression and the user utterance match
-            if re.search(self.general_regex[act], user_utterance, re.I):
-                # Mapping the act to User Act
-                if act != 'dontcare' and act != 'req_everything':
-                    user_act_type = UserActionType(act)
-                else:
-                    user_act_type = act
-                # Check if the found user act is affirm or deny
-                if self.sys_act_info['last_act'] and (user_act_type == UserActionType.Affirm or
-                                                      user_act_type == UserActionType.Deny):
-                    # Conditions to check the history in order to assign affirm or deny
-                    # slots mentioned in the previous system act
-
-                    # Check if the preceeding system act was confirm
-                    if self.sys_act_info['last_act'].type == SysActionType.Confirm:
-                        # Iterate over all slots in the system confimation
-                        # and make a list of Affirm/Deny(slot=value)
-                        # where value is taken from the previous sys act
-                        for slot in self.sys_act_info['last_act'].slot_values:
-                            # New user act -- Affirm/Deny(slot=value)
-                            user_act = UserAct(act_type=UserActionType(act),
-                                               text=user_utterance,
-                                               slot=slot,
-                                               value=self.sys_act_info['last_act'].slot_values[slot])
-                            self.user_acts.append(user_act)
-
-                    # Check if the preceeding system act was request
-                    # This covers the binary requests, e.g. 'Is the course related to Math?'
-                    elif self.sys_act_info['last_act'].type == SysActionType.Request:
-                        # Iterate over all slots in the system request
-                        # and make a list of Inform(slot={True|False})
-                        for slot in self.sys_act_info['last_act'].slot_values:
-                            # Assign value for the slot mapping from Affirm or Request to Logical,
-                            # True if user affirms, False if user denies
-                            value = 'true' if user_act_type == UserActionType.Affirm else 'false'
-                            # Adding user inform act
-                            self._add_inform(user_utterance, slot, value)
-
-                    # Check if Deny happens after System Request more, then trigger bye
-                    elif self.sys_act_info['last_act'].type == SysActionType.RequestMore \
-                            and user_act_type == UserActionType.Deny:
-                        user_act = UserAct(text=user_utterance, act_type=UserActionType.Bye)
+        # Iteration over all general acts whose regular expression matches the user utterance
+        for act in self.general_matcher.match(user_utterance):
+            # Mapping the act to User Act
+            if act != 'dontcare' and act != 'req_everything':
+                user_act_type = UserActionType(act)
+            else:
+                user_act_type = act
+            # Check if the found user act is affirm or deny
+            if self.sys_act_info['last_act'] and (user_act_type == UserActionType.Affirm or
+                                                  user_act_type == UserActionType.Deny):
+                # Conditions to check the history in order to assign affirm or deny
+                # slots mentioned in the previous system act
+
+                # Check if the preceeding system act was confirm
+                if self.sys_act_info['last_act'].type == SysActionType.Confirm:
+                    # Iterate over all slots in the system confimation
+                    # and make a list of Affirm/Deny(slot=value)
+                    # where value is taken from the previous sys act
+                    for slot in self.sys_act_info['last_act'].slot_values:
+                        # New user act -- Affirm/Deny(slot=value)
+                        user_act = UserAct(act_type=UserActionType(act),
+                                           text=user_utterance,
+                                           slot=slot,
+                                           value=self.sys_act_info['last_act'].slot_values[slot])
                         self.user_acts.append(user_act)
 
-                # Check if Request or Select is the previous system act
-                elif user_act_type == 'dontcare':
-                    if self.sys_act_info['last_act'].type == SysActionType.Request or \
-                            self.sys_act_info['last_act'].type == SysActionType.Select:
-                        # Iteration over all slots mentioned in the last system act
-                        for slot in self.sys_act_info['last_act'].slot_values:
-                            # Adding user inform act
-                            self._add_inform(user_utterance, slot, value=user_act_type)
-
-                # Check if the user wants to get all information about a particular entity
-                elif user_act_type == 'req_everything':
-                    self.req_everything = True
-
-                else:
-                    # This section covers all general user acts that do not depend on
-                    # the dialog history
-                    # New user act -- UserAct()
-                    user_act = UserAct(act_type=user_act_type, text=user_utterance)
+                # Check if the preceeding system act was request
+                # This covers the binary requests, e.g. 'Is the course related to Math?'
+                elif self.sys_act_info['last_act'].type == SysActionType.Request:
+                    # Iterate over all slots in the system request
+                    # and make a list of Inform(slot={True|False})
+                    for slot in self.sys_act_info['last_act'].slot_values:
+                        # Assign value for the slot mapping from Affirm or Request to Logical,
+                        # True if user affirms, False if user denies
+                        value = 'true' if user_act_type == UserActionType.Affirm else 'false'
+                        # Adding user inform act
+                        self._add_inform(user_utterance, slot, value)
+
+                # Check if Deny happens after System Request more, then trigger bye
+                elif self.sys_act_info['last_act'].type == SysActionType.RequestMore \
+                        and user_act_type == UserActionType.Deny:
+                    user_act = UserAct(text=user_utterance, act_type=UserActionType.Bye)
                     self.user_acts.append(user_act)
 
+            # Check if Request or Select is the previous system act
+            elif user_act_type == 'dontcare':
+                # without a preceding system act (e.g. the first utterance), there is no slot to assign
+                if self.sys_act_info['last_act'] is not None and (
+                        self.sys_act_info['last_act'].type == SysActionType.Request or
+                        self.sys_act_info['last_act'].type == SysActionType.Select):
+                    # Iteration over all slots mentioned in the last system act
+                    for slot in self.sys_act_info['last_act'].slot_values:
+                        # Adding user inform act
+                        self._add_inform(user_utterance, slot, value=user_act_type)
+
+            # Check if the user wants to get all information about a particular entity
+            elif user_act_type == 'req_everything':
+                self.req_everything = True
+
+            else:
+                # This section covers all general user acts that do not depend on
+                # the dialog history
+                # New user act -- UserAct()
+                user_act = UserAct(act_type=user_act_type, text=user_utterance)
+                self.user_acts.append(user_act)
+
     def _match_domain_specific_act(self, user_utterance: str):
         """
         Matches in-domain user acts
@@ -281,10 +337,9 @@ class HandcraftedNLU(Service):
         Returns:
 
         """
-        # Iteration over all user requestable slots
-        for slot in self.USER_REQUESTABLE:
-            if self._check(re.search(self.request_regex[slot], user_utterance, re.I)):
-                self._add_request(user_utterance, slot)
+        # Iteration over all user requestable slots whose regular expression matches
+        for slot in self.request_matcher.match(user_utterance):
+            self._add_request(user_utterance, slot)
 
     def _add_request(self, user_utterance: str, slot: str):
         """
@@ -313,19 +368,17 @@ class HandcraftedNLU(Service):
 
         """
 
-        # Iteration over all user informable slots and their slots
-        for slot in self.USER_INFORMABLE:
-            for value in self.inform_regex[slot]:
-                if self._check(re.search(self.inform_regex[slot][value], user_utterance, re.I)):
-                    if slot == self.domain_key and self.req_everything:
-                        # Adding all requestable slots because of the req_everything
-                        for req_slot in self.USER_REQUESTABLE:
-                            # skipping the domain key slot
-                            if req_slot != self.domain_key:
-                                # Adding user request act
-                                self._add_request(user_utterance, req_slot)
-                    # Adding user inform act
-                    self._add_inform(user_utterance, slot, value)
+        # Iteration over all user informable slot-value pairs whose regular expression matches
+        for slot, value in self.inform_matcher.match(user_utterance):
+            if slot == self.domain_key and self.req_everything:
+                # Adding all requestable slots because of the req_everything
+                for req_slot in self.USER_REQUESTABLE:
+                    # skipping the domain key slot
+                    if req_slot != self.domain_key:
+                        # Adding user request act
+                        self._add_request(user_utterance, req_slot)
+            # Adding user inform act
+            self._add_inform(user_utterance, slot, value)
         
     def _add_inform(self, user_utterance: str, slot: str, value: str):
         """
@@ -450,25 +503,27 @@ class HandcraftedNLU(Service):
             Loads the correct regex files based on which language has been selected
             this should only be called on the first turn of the dialog
 
+            The compiled rules are loaded from their artifact (see `services.nlu.artifact`), the JSON files are
+            only read and compiled if the artifact doesn't exist or is stale.
+
             Args:
                 language (Language): Enum representing the language the user has selected
         """
-        if self.language == Language.ENGLISH:
-            # Loading regular expression from JSON files
-            # as dictionaries {act:regex, ...} or {slot:{value:regex, ...}, ...}
-            self.general_regex = json.load(open(self.base_folder + '/GeneralRules.json'))
-            self.request_regex = json.load(open(self.base_folder + '/' + self.domain_name
-                                                + 'RequestRules.json'))
-            self.inform_regex = json.load(open(self.base_folder + '/' + self.domain_name
-                                               + 'InformRules.json'))
-        elif self.language == Language.GERMAN:
-            # TODO: Change this once
-            # Loading regular expression from JSON files
-            # as dictionaries {act:regex, ...} or {slot:{value:regex, ...}, ...}
-            self.general_regex = json.load(open(self.base_folder + '/GeneralRulesGerman.json'))
-            self.request_regex = json.load(open(self.base_folder + '/' + self.domain_name
-                                                + 'GermanRequestRules.json'))
-            self.inform_regex = json.load(open(self.base_folder + '/' + self.domain_name
-                                               + 'GermanInformRules.json'))
-        else:
+        if self.language not in (Language.ENGLISH, Language.GERMAN):
             print('No language')
+            return
+        artifact_file = os.path.join(self.base_folder, get_artifact_file(self.domain_name, self.language))
+        rules = CompiledRules.load(artifact_file, get_root_dir())
+        if rules is None or not rules.matches_slots(self.USER_REQUESTABLE, self.USER_INFORMABLE):
+            # Loading regular expression from JSON files
+            rules = CompiledRules.from_json(self.base_folder, self.domain_name, self.language,
+                                            self.USER_REQUESTABLE, self.USER_INFORMABLE)
+        # as dictionaries {act:regex, ...} or {slot:{value:regex, ...}, ...}
+        self.general_regex = rules.general_regex
+        self.request_regex = rules.request_regex
+        self.inform_regex = rules.inform_regex
+        # the rules are compiled once instead of passing the rule strings to `re.search` for every utterance
+        # (which looks them up in the small cache of compiled patterns of the `re` module)
+        self.general_matcher = rules.general_matcher
+        self.request_matcher = rules.request_matcher
+        self.inform_matcher = rules.inform_matcher
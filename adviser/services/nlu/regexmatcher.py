@@ -0,0 +1,203 @@
+############################################################################################
+#
+# Copyright 2020, University of Stuttgart: Institute for Natural Language Processing (IMS)
+#
+# This file is part of Adviser.
+# Adviser is free software: you can redistribute it and/or modify'
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3.
+#
+# Adviser is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Adviser.  If not, see <https://www.gnu.org/licenses/>.
+#
+############################################################################################
+
+
+""" This module provides the matcher finding all rules (regular expressions) of the handcrafted NLU that match
+    an utterance.
+"""
+
+import re
+from collections import defaultdict
+from typing import Dict, FrozenSet, Hashable, List, Optional
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+
+# non-ASCII characters matching ASCII characters with re.IGNORECASE besides their lowercase forms
+_ASCII_FOLDS = str.maketrans({'\u0130': 'i', '\u0131': 'i', '\u017f': 's'})
+# length of the substrings of the required literals indexing the rules
+_ANCHOR_LENGTH = 3
+_REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT, getattr(sre_constants, 'POSSESSIVE_REPEAT', None)}
+_ZERO_WIDTH = {sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT}
+
+
+def fold_case(text: str) -> str:
+    """ Returns the text in lower case, where every character matching an ASCII character with
+        re.IGNORECASE is that ASCII character """
+    return text.translate(_ASCII_FOLDS).lower()
+
+
+def required_literals(pattern: str, flags: int = 0) -> Optional[FrozenSet[str]]:
+    """ Returns literals (ASCII, in lower case) of which at least one is part of every text (in lower case, see
+        `fold_case`) the pattern matches somewhere, or None if there are none.
+
+        Of several possible sets, the set whose shortest literal is the longest is returned.
+    """
+    return _required_literals(sre_parse.parse(pattern, flags))
+
+
+def _best(candidates: List[FrozenSet[str]]) -> Optional[FrozenSet[str]]:
+    candidates = [literals for literals in candidates if literals]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda literals: (min(len(literal) for literal in literals), -len(literals)))
+
+
+def _leading_literal(subpattern) -> str:
+    """ Returns the literal characters every match of a sequence of parsed regular expression items starts with """
+    literal = ''
+    for op, av in subpattern:
+        if op == sre_constants.LITERAL and av < 128:
+            literal += chr(av).lower()
+        elif op != sre_constants.AT:
+            break
+    return literal
+
+
+def _required_literals(subpattern) -> Optional[FrozenSet[str]]:
+    """ Returns the best set of required literals of a sequence of parsed regular expression items """
+    candidates = []
+    run = ''  # consecutive literal characters
+    for op, av in subpattern:
+        if op == sre_constants.LITERAL and av < 128:
+            run += chr(av).lower()
+            continue
+        if op in _ZERO_WIDTH:
+            # doesn't consume characters, the literal characters before and after are consecutive
+            if op == sre_constants.ASSERT:
+                candidates.append(_required_literals(av[1]))
+            continue
+        prefix = run
+        if run:
+            candidates.append(frozenset([run]))
+            run = ''
+        if op == sre_constants.SUBPATTERN:
+            candidates.append(_required_literals(av[-1]))
+        elif op == getattr(sre_constants, 'ATOMIC_GROUP', None):
+            candidates.append(_required_literals(av))
+        elif op == sre_constants.BRANCH:
+            alternatives = [_required_literals(alternative) for alternative in av[1]]
+            if all(alternatives):
+                candidates.append(frozenset().union(*alternatives))
+            if prefix:
+                # the parser moves the common prefix of the alternatives in front of the branch
+                candidates.append(frozenset(prefix + _leading_literal(alternative) for alternative in av[1]))
+        elif op in _REPEATS and av[0] >= 1:
+            candidates.append(_required_literals(av[2]))
+    if run:
+        candidates.append(frozenset([run]))
+    return _best(candidates)
+
+
+class RegexMatcher(object):
+    """ Finds the rules matching an utterance, each rule is compiled once (when it is searched the first time).
+
+        By default, a rule matches like `HandcraftedNLU._check(re.search(rule, utterance, flags))`: the leftmost
+        match of the rule must set at least one of its groups (rules without groups never match). Without
+        `require_group`, a rule matches like `re.search(rule, utterance, flags)`.
+
+        With `prefilter`, only the rules which can match the utterance are searched: most rules can only match if
+        the utterance contains one of a few literals (e.g. the value or its synonyms). The rules are indexed by the
+        first characters of these literals, rules without such literals are always searched.
+
+        A matcher can be pickled without its compiled patterns, see `services.nlu.artifact`.
+    """
+
+    def __init__(self, rules: Dict[Hashable, str], flags: int = re.I, require_group: bool = True,
+                 prefilter: bool = True):
+        """
+        Args:
+            rules (Dict[Hashable, str]): key (e.g. act, slot or (slot, value)) -> regular expression
+            flags (int): flags of the regular expressions
+            require_group (bool): if True, a match of a rule only counts if it sets one of the groups of the rule
+            prefilter (bool): if True, only rules whose required literals occur in the utterance are searched
+        """
+        self.keys = list(rules)
+        self.flags = flags
+        self.require_group = require_group
+        self.prefilter = prefilter
+        # (key, regular expression) of the rules which can match
+        self._rules = []
+        # required literals of the rules (None: always searched)
+        self._literals = []
+        # first characters of a required literal -> indices of the rules
+        self._index = defaultdict(set)
+        # indices of the rules searched for every utterance
+        self._unindexed = set()
+        for key, rule in rules.items():
+            # parsing raises errors of invalid rules right away, compiling is deferred
+            parsed = sre_parse.parse(rule, flags)
+            if require_group and parsed.state.groups <= 1:  # counts the whole match as a group
+                continue
+            idx = len(self._rules)
+            self._rules.append((key, rule))
+            # the literals are compared in lower case
+            literals = _required_literals(parsed) if prefilter and flags & re.I else None
+            if literals is None or min(len(literal) for literal in literals) < _ANCHOR_LENGTH:
+                literals = None
+                self._unindexed.add(idx)
+            else:
+                for literal in literals:
+                    self._index[literal[:_ANCHOR_LENGTH]].add(idx)
+            self._literals.append(literals)
+        self._patterns = [None] * len(self._rules)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_patterns'] = [None] * len(self._rules)
+        return state
+
+    def _get_pattern(self, idx: int) -> re.Pattern:
+        pattern = self._patterns[idx]
+        if pattern is None:
+            pattern = self._patterns[idx] = re.compile(self._rules[idx][1], self.flags)
+        return pattern
+
+    def match(self, utterance: str) -> List[Hashable]:
+        """ Returns the keys of all rules matching the utterance (in the order of the rules) """
+        if not self.prefilter:
+            candidates = range(len(self._rules))
+        else:
+            candidates = set(self._unindexed)
+            text = fold_case(utterance)
+            for start in range(len(text) - _ANCHOR_LENGTH + 1):
+                indices = self._index.get(text[start:start + _ANCHOR_LENGTH])
+                if indices:
+                    candidates.update(idx for idx in indices
+                                      if any(literal in text for literal in self._literals[idx]))
+            candidates = sorted(candidates)
+        keys = []
+        for idx in candidates:
+            match = self._get_pattern(idx).search(utterance)
+            if match is not None and (not self.require_group or any(group is not None for group in match.groups())):
+                keys.append(self._rules[idx][0])
+        return keys
+
+    def get_num_candidates(self, utterance: str) -> int:
+        """ Returns the number of rules searched for the utterance """
+        if not self.prefilter:
+            return len(self._rules)
+        text = fold_case(utterance)
+        return len(self._unindexed) + sum(
+            1 for idx, literals in enumerate(self._literals)
+            if literals is not None and any(literal in text for literal in literals))
@@ -0,0 +1,53 @@
+############################################################################################
+#
+# Copyright 2020, University of Stuttgart: Institute for Natural Language Processing (IMS)
+#
+# This file is part of Adviser.
+# Adviser is free software: you can redistribute it and/or modify'
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3.
+#
+# Adviser is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Adviser.  If not, see <https://www.gnu.org/licenses/>.
+#
+############################################################################################
+
+
+"""Choosing the slot to request next by the information gain of its values."""
+
+from itertools import chain
+from typing import Dict, List
+
+import numpy as np
+
+
+def highest_info_gain(slots: List[str], value_counts: Dict[str, Dict[str, int]]) -> str:
+    """ Returns the slot whose value splits the results best, i.e. the slot with the highest entropy
+        of its values in the result set (which also minimizes the expected number of remaining
+        results after the user answered). The entropies of all slots are computed at once.
+
+        Results without a value for a slot (None) are not counted, the user can't name that value.
+
+        Args:
+            slots (List[str]): system requestable slots which have not yet been specified
+            value_counts (Dict[str, Dict[str, int]]): a dictionary with the number of results in the
+                                                      result set for each key and value
+
+        Returns: (str) representing the slot to ask for next (or empty if all slots have the same
+                 value for all results)
+    """
+    counts = [[count for value, count in value_counts.get(slot, {}).items() if value is not None]
+              for slot in slots]
+    slot_indices = np.repeat(np.arange(len(slots)), [len(slot_counts) for slot_counts in counts])
+    counts = np.fromiter(chain.from_iterable(counts), dtype=float, count=len(slot_indices))
+    counts = counts / np.bincount(slot_indices, weights=counts, minlength=len(slots))[slot_indices]
+    entropies = np.bincount(slot_indices, weights=-counts * np.log2(counts), minlength=len(slots))
+    # If all slots have the same value, we don't need to request anything, return none
+    if not slots or entropies.max() <= 0:
+        return ""
+    return slots[int(np.argmax(entropies))]
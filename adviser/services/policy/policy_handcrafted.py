@@ -20,6 +20,7 @@
 from collections import defaultdict
 from typing import List, Dict
 
+from services.policy.info_gain import highest_info_gain
 from services.service import PublishSubscribe
 from services.service import Service
 from utils import SysAct, SysActionType
@@ -48,13 +49,23 @@ class HandcraftedPolicy(Service):
 
     """
 
+    session_attributes = ('turns', 'first_turn', 'current_suggestions', 's_index', 'candidates')
+    # maximum number of candidates of the previous turn which are filtered instead of querying the domain
+    MAX_REFINED_CANDIDATES = 1000
+
     def __init__(self, domain: JSONLookupDomain, logger: DiasysLogger = DiasysLogger(),
-                 max_turns: int = 25):
+                 max_turns: int = 25, incremental_candidates: bool = True, prefer_non_binary: bool = True):
         """
         Initializes the policy
 
         Arguments:
             domain {domain.jsonlookupdomain.JSONLookupDomain} -- Domain
+            incremental_candidates {bool} -- if True, the entities meeting the constraints of a turn
+                                             are found among the candidates of the previous turn
+                                             as long as the user only adds constraints
+            prefer_non_binary {bool} -- if True, the system asks about non-binary slots before binary
+                                        slots, otherwise it asks about the slot with the highest
+                                        information gain
 
         """
         self.first_turn = True
@@ -64,6 +75,15 @@ class HandcraftedPolicy(Service):
         self.domain_key = domain.get_primary_key()
         self.logger = logger
         self.max_turns = max_turns
+        self.incremental_candidates = incremental_candidates
+        self.prefer_non_binary = prefer_non_binary
+        # slots whose values are counted to choose the next request, slots asked about last
+        self._counted_slots = [slot for slot in domain.get_system_requestable_slots() if slot != self.domain_key]
+        self._binary_slots = frozenset(domain.get_binary_slots())
+        # slots of the query results (what `find_entities` returns by default)
+        self._result_slots = frozenset(domain.get_system_requestable_slots()) | {self.domain_key}
+        # constraints and entities meeting them of the last database query of the dialog
+        self.candidates = None
 
     def dialog_start(self):
         """
@@ -73,6 +93,7 @@ class HandcraftedPolicy(Service):
         self.first_turn = True
         self.current_suggestions = []  # list of current suggestions
         self.s_index = 0  # the index in current suggestions for the current system reccomendation
+        self.candidates = None
 
     @PublishSubscribe(sub_topics=["beliefstate"], pub_topics=["sys_act", "sys_state"])
     def choose_sys_act(self, beliefstate: BeliefState) \
@@ -203,7 +224,56 @@ class HandcraftedPolicy(Service):
         # has given so far
         else:
             constraints, _ = self._get_constraints(beliefstate)
-            return self.domain.find_entities(constraints)
+            return self._find_candidates(constraints, beliefstate)
+
+    def _find_candidates(self, constraints: dict, beliefstate: BeliefState):
+        """Returns all entities which satisfy the constraints.
+
+           If the constraints of the previous query of the dialog are a subset of the
+           constraints, the entities are filtered from the previous candidates (keeping
+           their order). Otherwise, if there were too many candidates
+           (`MAX_REFINED_CANDIDATES`) or if the user asks for alternatives, the domain is
+           queried again. The cached candidates contain the values of all informable slots, the
+           returned entities only those of the primary key and the system requestable slots.
+
+        Args:
+            constraints (dict): slot-value mapping of all constraints the user has given so far
+            beliefstate (BeliefState): BeliefState object; contains the UserActionTypes for the
+                                       current turn
+
+        Returns:
+            (list): entities meeting the constraints
+        """
+        if self.incremental_candidates and self.candidates is not None \
+                and UserActionType.RequestAlternatives not in beliefstate['user_acts']:
+            previous_constraints, candidates = self.candidates
+            # filtering many candidates takes longer than querying an index
+            if previous_constraints.items() <= constraints.items() \
+                    and len(candidates) <= self.MAX_REFINED_CANDIDATES:
+                added_constraints = {slot: value for slot, value in constraints.items()
+                                     if slot not in previous_constraints}
+                candidates = self.domain.filter_entities(candidates, added_constraints)
+                self.candidates = (constraints, candidates)
+                return self._project_results(candidates)
+        # fetch the values of all informable slots so that added constraints can be checked
+        candidates = self.domain.find_entities(constraints,
+                                               requested_slots=self.domain.get_informable_slots())
+        self.candidates = (constraints, candidates)
+        return self._project_results(candidates)
+
+    def _project_results(self, entities: List[dict]) -> List[dict]:
+        """Returns copies of the entities which only contain the primary key and the system
+           requestable slots (as returned by `find_entities` without requested slots), so the
+           informs do not depend on the slots cached for refining the candidates.
+
+        Args:
+            entities (List[dict]): slot-value mappings of entities
+
+        Returns:
+            (list): the projected entities, in the same order
+        """
+        return [{slot: value for slot, value in entity.items() if slot in self._result_slots}
+                for entity in entities]
 
     def _get_name(self, beliefstate: BeliefState):
         """Finds if an entity has been suggested by the system (in the form of an offer candidate)
@@ -351,14 +421,9 @@ class HandcraftedPolicy(Service):
         # if there is more than one result
         if len(q_res) > 1 and not beliefstate['requests']:
             constraints, dontcare = self._get_constraints(beliefstate)
-            # Gather all the results for each column
-            temp = {key: [] for key in q_res[0].keys()}
-            # If any column has multiple values, ask for clarification
-            for result in q_res:
-                for key in result.keys():
-                    if key != self.domain_key:
-                        temp[key].append(result[key])
-            next_req = self._gen_next_request(temp, beliefstate)
+            # Count the values of each column (except the primary key) in the results
+            value_counts = self.domain.distinct_value_counts(constraints, self._counted_slots)
+            next_req = self._gen_next_request(value_counts, beliefstate)
             if next_req:
                 sys_act.type = SysActionType.Request
                 sys_act.add_value(next_req)
@@ -368,61 +433,45 @@ class HandcraftedPolicy(Service):
         sys_act.type = SysActionType.InformByName
         return sys_act
 
-    def _gen_next_request(self, temp: Dict[str, List[str]], belief_state: BeliefState):
+    def _gen_next_request(self, value_counts: Dict[str, Dict[str, int]], belief_state: BeliefState):
         """
-            Calculates which slot to request next based asking for non-binary slotes first and then
-            based on which binary slots provide the biggest reduction in the size of db results
-
-            NOTE: If the dataset is large, this is probably not a great idea to calculate each turn
-                  it's relatively simple, but could add up over time
+            Calculates which slot to request next: the open system requestable slot with the highest
+            information gain (see `_highest_info_gain`). If `prefer_non_binary` is set, non-binary
+            slots are asked about first.
 
             Args:
-                temp (Dict[str, List[str]]: a dictionary with the keys and values for each result
-                                            in the result set
+                value_counts (Dict[str, Dict[str, int]]): a dictionary with the number of results in the
+                                                          result set for each key and value
 
             Returns: (str) representing the slot to ask for next (or empty if none)
         """
         req_slots = self.domain.get_system_requestable_slots()
         # don't other to cacluate statistics for things which have been specified
         constraints, dontcare = self._get_constraints(belief_state)
-        # split out binary slots so we can ask about them second
         req_slots = [s for s in req_slots if s not in dontcare and s not in constraints]
-        bin_slots = [slot for slot in req_slots if len(self.domain.get_possible_values(slot)) == 2]
-        non_bin_slots = [slot for slot in req_slots if slot not in bin_slots]
-        # check if there are any differences in values for non-binary slots,
-        # if a slot has multiple values, ask about that slot
-        for slot in non_bin_slots:
-            if len(set(temp[slot])) > 1:
-                return slot
-        # Otherwise look to see if there are differnces in binary slots
-        return self._highest_info_gain(bin_slots, temp)
+        if not self.prefer_non_binary:
+            return self._highest_info_gain(req_slots, value_counts)
+        # split out binary slots so we can ask about them second
+        bin_slots = [slot for slot in req_slots if slot in self._binary_slots]
+        non_bin_slots = [slot for slot in req_slots if slot not in self._binary_slots]
+        # if a non-binary slot has multiple values, ask about that slot,
+        # otherwise look to see if there are differnces in binary slots
+        return self._highest_info_gain(non_bin_slots, value_counts) or \
+            self._highest_info_gain(bin_slots, value_counts)
 
-    def _highest_info_gain(self, bin_slots: List[str], temp: Dict[str, List[str]]):
-        """ Since we don't have lables, we can't properlly calculate entropy, so instead we'll go
-            for trying to ask after a feature that splits the results in half as evenly as possible
-            (that way we gain most info regardless of which way the user chooses)
+    def _highest_info_gain(self, slots: List[str], value_counts: Dict[str, Dict[str, int]]):
+        """ Returns the slot with the highest information gain (see `info_gain.highest_info_gain`)
 
             Args:
-                bin_slots: a list of strings representing system requestable binary slots which
-                           have not yet been specified
-                temp (Dict[str, List[str]]: a dictionary with the keys and values for each result
-                                            in the result set
+                slots: a list of strings representing system requestable slots which
+                       have not yet been specified
+                value_counts (Dict[str, Dict[str, int]]): a dictionary with the number of results in the
+                                                          result set for each key and value
 
-            Returns: (str) representing the slot to ask for next (or empty if none)
+            Returns: (str) representing the slot to ask for next (or empty if all slots have the same
+                     value for all results)
         """
-        diffs = {}
-        for slot in bin_slots:
-            val1, val2 = self.domain.get_possible_values(slot)
-            values_dic = defaultdict(int)
-            for val in temp[slot]:
-                values_dic[val] += 1
-            if val1 in values_dic and val2 in values_dic:
-                diffs[slot] = abs(values_dic[val1] - values_dic[val2])
-            # If all slots have the same value, we don't need to request anything, return none
-        if not diffs:
-            return ""
-        sorted_diffs = sorted(diffs.items(), key=lambda kv: kv[1])
-        return sorted_diffs[0][0]
+        return highest_info_gain(slots, value_counts)
 
     def _convert_inform(self, q_results: iter,
                         sys_act: SysAct, beliefstate: BeliefState):
@@ -98,6 +98,7 @@ class RLPolicy(object):
         self.writer = None
 
         # get state size
+        self._compile_state_layout()
         self.state_dim = self.beliefstate_dict_to_vector(
             BeliefState(domain)._init_beliefstate()).size(1)
         self.logger.info("state space dim: " + str(self.state_dim))
@@ -141,6 +142,26 @@ class RLPolicy(object):
         """ Returns the action index for the specified action name """
         return self.actions.index(action_name)
 
+    def _compile_state_layout(self):
+        """ Computes the positions of the informable slot values and the requestable slots in the belief
+            vector once from the ontology indices of the domain """
+        # user acts and the none action first
+        position = len(UserActionType) + 1
+        # informable slot -> (position of the **NONE** value, positions of each value including dontcare);
+        # a value listed twice in the ontology has two positions
+        self._inform_positions = {}
+        for slot in sorted(self.domain.get_informable_slots()):
+            num_values = len(self.domain.get_possible_values(slot))
+            value_positions = {value: tuple(position + 1 + idx for idx in indices)
+                               for value, indices in self.domain.get_value_indices(slot).items()}
+            value_positions['dontcare'] = value_positions.get('dontcare', ()) + (position + 1 + num_values,)
+            self._inform_positions[slot] = (position, value_positions)
+            position += num_values + 2
+        self._request_positions = {slot: position + idx
+                                   for idx, slot in enumerate(sorted(self.domain.get_requestable_slots()))}
+        # system features after the requests
+        self._system_position = position + len(self._request_positions)
+
     def beliefstate_dict_to_vector(self, beliefstate: BeliefState):
         """ Converts the beliefstate dict to a torch tensor
 
@@ -151,44 +172,39 @@ class RLPolicy(object):
             belief tensor with dimension 1 x state_dim
         """
 
-        belief_vec = []
+        belief_vec = [0.0] * (self._system_position + 7)
 
         # add user acts
-        belief_vec += [1 if act in beliefstate['user_acts'] else 0 for act in UserActionType]
+        user_acts = beliefstate['user_acts']
+        for idx, act in enumerate(UserActionType):
+            if act in user_acts:
+                belief_vec[idx] = 1.0
         # handle none actions
-        belief_vec.append(1 if sum(belief_vec) == 0 else 1)
+        belief_vec[len(UserActionType)] = 1.0
 
         # add informs (including special flag if slot not mentioned)
-        for slot in sorted(self.domain.get_informable_slots()):
-            values = self.domain.get_possible_values(slot) + ["dontcare"]
-            if slot not in beliefstate['informs']:
-                # add **NONE** value first, then 0.0 for all others
-                belief_vec.append(1.0)
-                # also add value for don't care
-                belief_vec += [0 for i in range(len(values))]
+        informs = beliefstate['informs']
+        for slot, (none_position, value_positions) in self._inform_positions.items():
+            if slot not in informs:
+                # add **NONE** value first, then 0.0 for all others (including don't care)
+                belief_vec[none_position] = 1.0
             else:
-                # add **NONE** value first
-                belief_vec.append(0.0)
-                bs_slot = beliefstate['informs'][slot]
-                belief_vec += [bs_slot[value] if value in bs_slot else 0.0 for value in values]
+                for value, prob in informs[slot].items():
+                    for position in value_positions.get(value, ()):
+                        belief_vec[position] = prob
 
         # add requests
-        for slot in sorted(self.domain.get_requestable_slots()):
-            if slot in beliefstate['requests']:
-                belief_vec.append(1.0)
-            else:
-                belief_vec.append(0.0)
+        for slot in beliefstate['requests']:
+            if slot in self._request_positions:
+                belief_vec[self._request_positions[slot]] = 1.0
 
         # append system features
-        belief_vec.append(float(self.sys_state['lastActionInformNone']))
-        belief_vec.append(float(self.sys_state['offerHappened']))
         candidate_count = beliefstate['num_matches']
         # buckets for match count: 0, 1, 2-4, >4
-        belief_vec.append(float(candidate_count == 0))
-        belief_vec.append(float(candidate_count == 1))
-        belief_vec.append(float(2 <= candidate_count <= 4))
-        belief_vec.append(float(candidate_count > 4))
-        belief_vec.append(float(beliefstate["discriminable"]))
+        belief_vec[self._system_position:] = [
+            float(self.sys_state['lastActionInformNone']), float(self.sys_state['offerHappened']),
+            float(candidate_count == 0), float(candidate_count == 1), float(2 <= candidate_count <= 4),
+            float(candidate_count > 4), float(beliefstate["discriminable"])]
 
         # convert to torch tensor
         return torch.tensor([belief_vec], dtype=torch.float, device=self.device)
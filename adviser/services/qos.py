@@ -0,0 +1,92 @@
+############################################################################################
+#
+# Copyright 2020, University of Stuttgart: Institute for Natural Language Processing (IMS)
+#
+# This file is part of Adviser.
+# Adviser is free software: you can redistribute it and/or modify'
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3.
+#
+# Adviser is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Adviser.  If not, see <https://www.gnu.org/licenses/>.
+#
+############################################################################################
+
+
+""" This module provides the quality of service settings for (high-rate) topics of `services.service.PublishSubscribe`.
+
+    Subscribers keep received values until their function is called: only the latest value of a `sub_topic`,
+    all values of a `queued_sub_topic`. For topics published faster than they are consumed (e.g. video frames),
+    a `QoS` bounds the number of kept values, decides which values are dropped and limits the accepted message rate.
+    Publishers bound the number of messages buffered for slow subscribers by the `max_queue` of their topics.
+"""
+
+from enum import Enum
+from typing import Any, Callable, List
+
+
+class DropPolicy(Enum):
+    """ Decides which value is dropped if a subscriber's queue for a topic is full """
+    DROP_OLDEST = 'drop_oldest'  # remove the oldest queued value, queue the received one
+    DROP_NEWEST = 'drop_newest'  # keep the queued values, drop the received one
+    COALESCE = 'coalesce'  # merge the received value into the newest queued value
+
+
+class QoS:
+    """ Quality of service settings of a topic (see `services.service.PublishSubscribe`). """
+
+    def __init__(self, max_queue: int = None, policy: DropPolicy = DropPolicy.DROP_OLDEST, sample_rate: float = None,
+                 merge: Callable[[Any, Any], Any] = None):
+        """
+        Args:
+            max_queue (int): subscribers: maximum number of values kept for a `queued_sub_topic` (`sub_topics` always
+                             keep a single value), publishers: maximum number of messages buffered for each
+                             subscriber (None: unbounded)
+            policy (DropPolicy): which value to drop if the queue is full
+            sample_rate (float): maximum number of accepted messages per second (by message timestamp),
+                                 messages following the previously accepted one too early are dropped (None: accept all)
+            merge (Callable[[Any, Any], Any]): called with the newest queued and the received value by the `COALESCE`
+                                               policy, returns the merged value (default: the received value)
+        """
+        assert max_queue is None or max_queue >= 1, "max_queue has to be at least 1"
+        self.max_queue = max_queue
+        self.policy = policy
+        self.min_interval = 1.0 / sample_rate if sample_rate else 0.0
+        self.merge = merge if merge is not None else lambda queued, received: received
+
+    def sample(self, timestamp: float, last_timestamp: float) -> bool:
+        """ Returns True, if a message received at `timestamp` is accepted after one accepted at `last_timestamp` """
+        return last_timestamp is None or timestamp - last_timestamp >= self.min_interval
+
+    def put(self, values: List[Any], timestamps: List[float], value: Any, timestamp: float, max_queue: int = None) -> int:
+        """ Queues the received value (and its timestamp), dropping values according to the policy if the queue is full.
+
+        Args:
+            values (List[Any]): queued values (modified)
+            timestamps (List[float]): timestamps of the queued values (modified)
+            value (Any): received value
+            timestamp (float): timestamp of the received value
+            max_queue (int): overrides the maximum queue length (e.g. 1 for `sub_topics`)
+
+        Returns:
+            number of dropped values (0 or 1)
+        """
+        max_queue = max_queue if max_queue is not None else self.max_queue
+        if max_queue is None or len(values) < max_queue:
+            values.append(value)
+            timestamps.append(timestamp)
+            return 0
+        if self.policy == DropPolicy.DROP_OLDEST:
+            del values[0]
+            del timestamps[0]
+            values.append(value)
+            timestamps.append(timestamp)
+        elif self.policy == DropPolicy.COALESCE:
+            values[-1] = self.merge(values[-1], value)
+            timestamps[-1] = timestamp
+        return 1
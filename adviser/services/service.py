@@ -19,66 +19,150 @@
 
 import copy
 import datetime
+import functools
 import inspect
 import pickle
 import threading
 import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
 from threading import Thread
-from typing import List, Dict, Union, Iterable, Any
-import platform
+from typing import List, Dict, Union, Iterable, Any, Callable, Set, Tuple
 
 import zmq
-from zmq import Context, Socket
-from zmq.devices import ThreadProxy, ProcessProxy
-
+from zmq import Context
+
+from services.codecs import Codec
+from services.executor import Executor, ThreadExecutor
+from services.qos import QoS
+from services.tracing import CallTrace, PublishTrace, Tracer
+from services.transport import Transport, ZMQTransport, LocalTransport
+from utils.beliefstate import BeliefState, BeliefStateDelta
 from utils.domain.domain import Domain
 from utils.logger import DiasysLogger
-from utils.topics import Topic
+from utils.topics import Topic, TopicRouter
+
 
+# content of start / end control messages keeping the listeners of a service listening between two dialogs
+_WARM_RESTART = "WARM_RESTART"
 
-def _send_msg(pub_channel: Socket, topic: str, content: Any):
-    """ Serializes message, appends current timespamp and sends it over the specified channel to the specified topic.
+
+def _send_msg(pub_channel, topic: str, content: Any, session_id: str = None):
+    """ Appends current timespamp and sends the message over the specified channel to the specified topic.
         Use this function for all internal message passing.
 
     Args:
-        pub_channel (Socket): publisher socket
+        pub_channel: publisher channel of a `services.transport.Transport`
         topic (str): topic to publish to
         content (Any): message content
+        session_id (str): the dialog session this message belongs to (`None` for single-dialog mode)
+
+    Returns:
+        The timestamp of the message and its encoded size in bytes (None if the transport doesn't serialize messages)
      """
     timestamp = datetime.datetime.now().timestamp()  # current timestamp as POSIX float
-    data = pickle.dumps((timestamp, content))
-    pub_channel.send_multipart((bytes(topic, encoding="ascii"), data))
+    return timestamp, pub_channel.send(topic, (timestamp, session_id, content))
 
 
-def _send_ack(pub_channel: Socket, topic: str, content: bool = True):
+def _send_ack(pub_channel, topic: str, content: bool = True, session_id: str = None):
     """ Sends an acknowledge-message to the specified channel (ACK).
         Is used together with `_recv_ack` to synchronize services (waiting for ACK messages).
     
     Args:
-        pub_channel (Socket): publisher socket
+        pub_channel: publisher channel of a `services.transport.Transport`
         topic (str): topic to send ACK to
         content (bool): for ACK's, content is either `True` (ACK) or `False` (NACK)
+        session_id (str): the dialog session that is acknowledged (`None` for single-dialog mode)
     """
-    _send_msg(pub_channel, f"ACK/{topic}", content)
+    _send_msg(pub_channel, f"ACK/{topic}", content, session_id)
 
 
-def _recv_ack(sub_channel: Socket, topic: str, expected_content: bool = True):
+def _recv_ack(sub_channel, topic: str, expected_content: bool = True, session_id: str = None):
     """ Blocks until an acknowledge-message for the specified topic with the expected content is received via the
         specified subscriber channel. 
     
     Args:
-        sub_channel (Socket): subscriber socket
+        sub_channel: subscriber channel of a `services.transport.Transport`
         topic (str): topic to listen for ACK's
         expected_content (bool): are we expecting `True` (ACK) or `False` (NACK)
+        session_id (str): the dialog session we are expecting an ACK for (`None` for single-dialog mode)
     """
-    ack_topic = topic if topic.startswith("ACK/") else f"ACK/{topic}"
-    while True:
-        msg = sub_channel.recv_multipart(copy=True)
-        recv_topic = msg[0].decode("ascii")
-        content = pickle.loads(msg[1])[1]  # pickle.loads(msg) -> tuple(timestamp, content) -> return content
-        if recv_topic == ack_topic:
-            if content == expected_content:
-                return
+    _recv_acks(sub_channel, [topic], expected_content, session_id)
+
+
+def _recv_acks(sub_channel, topics: Iterable[str], expected_content: bool = True, session_id: str = None,
+               timeout: float = None) -> Set[str]:
+    """ Blocks until acknowledge-messages for all specified topics with the expected content are received via the
+        specified subscriber channel (in any order) or the timeout expired.
+
+    Args:
+        sub_channel: subscriber channel of a `services.transport.Transport`
+        topics (Iterable[str]): topics to listen for ACK's
+        expected_content (bool): are we expecting `True` (ACK) or `False` (NACK)
+        session_id (str): the dialog session we are expecting ACK's for (`None` for single-dialog mode)
+        timeout (float): maximum time to wait in seconds (`None`: wait forever)
+
+    Returns:
+        The topics no ACK was received for (stragglers), empty if all topics were acknowledged
+    """
+    pending = {topic if topic.startswith("ACK/") else f"ACK/{topic}": topic for topic in topics}
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while pending:
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if not sub_channel.poll(timeout=max(1, int(remaining * 1000))):
+                continue
+        received = sub_channel.recv_if(pending)  # other topics are dropped without decoding them
+        if received is None:
+            continue
+        recv_topic, (_, recv_session_id, content) = received
+        if recv_session_id == session_id and content == expected_content:
+            del pending[recv_topic]
+    return set(pending.values())
+
+
+def _broadcast(pub_channel, sub_channel, topics: Iterable[str], content: Any = True, session_id: str = None,
+               timeout: float = None) -> Set[str]:
+    """ Sends a control message to all specified topics at once, then gathers their ACK's (see `_recv_acks`).
+
+    Returns:
+        The topics no ACK was received for before the timeout expired
+    """
+    topics = list(topics)
+    for topic in topics:
+        _send_msg(pub_channel, topic, content, session_id)
+    return _recv_acks(sub_channel, topics, session_id=session_id, timeout=timeout)
+
+
+def _probe(sub_channel, probes: Dict[str, Callable[[], None]], timeout: float = None) -> Set[str]:
+    """ Repeatedly sends probes until an ACK for each of them was received via the specified subscriber channel.
+        Messages published before a subscription reached the publisher are lost (zmq's slow joiner problem),
+        so the probes are resent with exponential backoff until they get through.
+
+    Args:
+        sub_channel: subscriber channel of a `services.transport.Transport`
+        probes (Dict[str, Callable[[], None]]): mapping of topics to listen for ACK's -> function sending the probe
+        timeout (float): maximum time to wait in seconds (`None`: wait forever)
+
+    Returns:
+        The topics no ACK was received for before the timeout expired
+    """
+    pending = set(probes)
+    interval = 0.001
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while pending:
+        for topic in pending:
+            probes[topic]()
+        if deadline is not None:
+            interval = min(interval, deadline - time.monotonic())
+            if interval <= 0:
+                break
+        pending = _recv_acks(sub_channel, pending, timeout=interval)
+        interval = min(interval * 2, 0.1)
+    return pending
 
 
 class RemoteService:
@@ -109,8 +193,16 @@ class Service:
 
     Note: A `Service` will only start listening to messages once it is added to a `DialogSystem` 
           (or calling `run_standalone()` in the remote case and adding a corresponding `RemoteService` to the `DialogSystem`).
+
+    Multi-session mode: If a `DialogSystem` runs several dialogs at once (see `DialogSystem.start_session`),
+    every dialog gets its own copy of the instance attributes listed in `session_attributes`.
+    List all attributes your `dialog_start` method (re-)initializes there, so that interleaved dialogs
+    don't overwrite each other's state.
     """
 
+    # names of instance attributes holding dialog-level state (one copy per session in multi-session mode)
+    session_attributes: Tuple[str, ...] = ()
+
     def __init__(self, domain: Union[str, Domain] = "", sub_topic_domains: Dict[str, str] = {}, pub_topic_domains: Dict[str, str] = {},
                  ds_host_addr: str = "127.0.0.1", sub_port: int = 65533, pub_port: int = 65534, protocol: str = "tcp",
                  debug_logger: DiasysLogger = None, identifier: str = None):
@@ -153,6 +245,10 @@ class Service:
         self._pub_port = pub_port
         self._protocol = protocol
         self._identifier = identifier
+        # replaced by the transport and executor of the `DialogSystem` once this service is added to it
+        self._transport = ZMQTransport(ds_host_addr, sub_port, pub_port, protocol)
+        self._executor = ThreadExecutor()
+        self._tracer = None  # set by the `DialogSystem` if tracing is enabled
 
         self.debug_logger = debug_logger
 
@@ -163,6 +259,9 @@ class Service:
         self._internal_start_topics = dict()
         self._internal_end_topics = dict()
         self._internal_terminate_topics = dict()
+        self._internal_ready_topics = dict()
+        self._listener_resets = dict()  # internal start topic -> function clearing the listener's received values
+        self._drop_counts = dict()  # subscriber function name -> subscribed topic -> number of dropped values
 
         # NOTE: class name + memory pointer make topic unique (required, e.g. for running mutliple instances of same module!)
         self._start_topic = f"{type(self).__name__}/{id(self)}/START"
@@ -170,6 +269,29 @@ class Service:
         self._terminate_topic = f"{type(self).__name__}/{id(self)}/TERMINATE"
         self._train_topic = f"{type(self).__name__}/{id(self)}/TRAIN"
         self._eval_topic = f"{type(self).__name__}/{id(self)}/EVAL"
+        self._ready_topic = f"{type(self).__name__}/{id(self)}/READY"
+
+        # multi-session state: session id -> {attribute name -> value}
+        self._sessions = dict()
+        self._session_lock = threading.RLock()
+        self._session_local = threading.local()
+        # published belief states: (session id, topic) -> (belief state, number of turns sent)
+        self._published_beliefstates = dict()
+
+    def set_codecs(self, codecs: Dict[str, Union[str, Codec]] = None, default_codec: Union[str, Codec] = 'pickle'):
+        """ Choose the codecs encoding the messages of this service per topic (see `services.codecs`).
+
+        Only has an effect for services running standalone (see `RemoteService`),
+        local services use the codecs of their `DialogSystem`. Call this before `run_standalone`.
+
+        Args:
+            codecs (Dict[str, Union[str, Codec]]): mapping of topic (prefixes) to the codec (name) used for
+                                                   publishing messages of these topics, e.g. `{'beliefstate': 'compact'}`
+            default_codec (Union[str, Codec]): codec (name) used for all other topics
+        """
+        self._transport = ZMQTransport(self._host_addr, self._sub_port, self._pub_port, self._protocol,
+                                       codecs=codecs, default_codec=default_codec,
+                                       domains=[self.domain] if isinstance(self.domain, Domain) else [])
 
     def _init_pubsub(self): 
         """ Search for all functions decorated with the `PublishSubscribe` decorator and call the setup methods for them """
@@ -178,22 +300,24 @@ class Service:
             if hasattr(func_inst, "pubsub"):
                 # found decorated publisher / subscriber function -> setup sockets and listeners
                 self._setup_listener(func_inst, getattr(func_inst, "sub_topics"),
-                                     getattr(func_inst, 'queued_sub_topics'))
-                self._setup_publishers(func_inst, getattr(func_inst, "pub_topics"))
+                                     getattr(func_inst, 'queued_sub_topics'), getattr(func_inst, 'qos'))
+                self._setup_publishers(func_inst, getattr(func_inst, "pub_topics"), getattr(func_inst, 'qos'))
 
     def _register_with_dialogsystem(self):
         """ Start listening to dialog system control channel messages """
         self._setup_dialog_ctrl_msg_listener()
-        Thread(target=self._control_channel_listener).start()
+        # NOTE: not part of the service's group - it waits for the service's listeners to acknowledge control messages
+        self._executor.register(self._control_channel_sub, self._handle_control_message)
 
-    def _setup_listener(self, func_instance, topics: List[str], queued_topics: List[str]):
+    def _setup_listener(self, func_instance, topics: List[str], queued_topics: List[str], qos: Dict[str, QoS] = {}):
         """
-        Starts a new subscription thread for a function decorated with `services.service.PublishSubscribe`.
+        Starts a new listener for a function decorated with `services.service.PublishSubscribe`.
         
         Args:
             func_instance (function): instance of the function that was decorated with `services.service.PublishSubscribe`.
             topics (List[str]): list of subscribed topics (drops all but most recent messages before function call)
             queued_topics (List[str]): list for subscribed topics (drops no messages, forward a list of received messages to function call)
+            qos (Dict[str, QoS]): quality of service settings of (some of) the subscribed topics
         """
         if len(topics + queued_topics) == 0:
             # no subscribed to topics - no need to setup anything (e.g. only publisher)
@@ -201,130 +325,221 @@ class Service:
             # ensure that sub_topics and queued_sub_topics don't intersect (otherwise, both would set same function argument value)
         assert set(topics).isdisjoint(queued_topics), "sub_topics and queued_sub_topics have to be disjoint!"
 
-        # setup socket
-        ctx = Context.instance()
-        subscriber = ctx.socket(zmq.SUB)
-        # subscribe to all listed topics
+        # setup subscriber channel
+        sub_topic_domain_strs = []
+        # maps received topics (including domain) to the function argument they are passed as
+        router = TopicRouter()
         for topic in topics + queued_topics:
             topic_domain_str = f"{topic}/{self._domain_name}" if self._domain_name else topic
             if topic in self._sub_topic_domains:
                 # overwrite domain for this specific topic and service instance
                 topic_domain_str = f"{topic}/{self._sub_topic_domains[topic]}" if self._sub_topic_domains[topic] else topic
-            subscriber.setsockopt(zmq.SUBSCRIBE, bytes(topic_domain_str, encoding="ascii"))
-        # subscribe to control channels
-        subscriber.setsockopt(zmq.SUBSCRIBE, bytes(f"{func_instance}/START", encoding="ascii"))
-        subscriber.setsockopt(zmq.SUBSCRIBE, bytes(f"{func_instance}/END", encoding="ascii"))
-        subscriber.setsockopt(zmq.SUBSCRIBE, bytes(f"{func_instance}/TERMINATE", encoding="ascii"))
-        subscriber.connect(f"{self._protocol}://{self._host_addr}:{self._sub_port}")
+            sub_topic_domain_strs.append(topic_domain_str)
+            router.add(topic_domain_str, topic)
+        # subscribe to all listed topics and control channels
+        subscriber = self._transport.subscriber(sub_topic_domain_strs + [f"{func_instance}/START",
+                                                                         f"{func_instance}/END",
+                                                                         f"{func_instance}/TERMINATE",
+                                                                         f"{func_instance}/READY"])
         self._internal_start_topics[f"{str(func_instance)}/START"] = str(func_instance)
         self._internal_end_topics[f"{str(func_instance)}/END"] = str(func_instance)
         self._internal_terminate_topics[f"{str(func_instance)}/TERMINATE"] = str(func_instance)
+        self._internal_ready_topics[f"{str(func_instance)}/READY"] = str(func_instance)
 
-        # register and run listener thread
-        listener_thread = Thread(target=self._receiver_thread, args=(subscriber, func_instance,
-                                                                     topics, queued_topics,
-                                                                     f"{str(func_instance)}/START",
-                                                                     f"{str(func_instance)}/END",
-                                                                     f"{str(func_instance)}/TERMINATE"))
-        listener_thread.start()
+        # register listener with the executor
+        handler = self._create_message_handler(func_instance, topics, queued_topics, qos, router,
+                                               f"{str(func_instance)}/START",
+                                               f"{str(func_instance)}/END",
+                                               f"{str(func_instance)}/TERMINATE",
+                                               f"{str(func_instance)}/READY")
+        self._executor.register(subscriber, handler, group=self)
 
         # add to list of local topics
         # TODO maybe add topic_domain_str instead for more clarity?
         self._sub_topics.update(topics + queued_topics)
 
-    def _setup_publishers(self, func_instance, topics):
-        """ Creates a publish socket for a function decorated with `services.service.PublishSubscribe`. """
+    def _setup_publishers(self, func_instance, topics, qos: Dict[str, QoS] = {}):
+        """ Creates a publish socket for a function decorated with `services.service.PublishSubscribe`.
+            The socket buffers at most as many messages per subscriber as the smallest `max_queue` of its topics. """
         if len(topics) == 0:
             return # no topics - no need for a socket
 
-        # setup publish socket
-        ctx = Context.instance()
-        publisher = ctx.socket(zmq.PUB)
-        publisher.sndhwm = 1100000
-        publisher.connect(f"{self._protocol}://{self._host_addr}:{self._pub_port}")
-        self._publish_sockets[func_instance] = publisher
+        # setup publisher channel
+        max_queues = [qos[topic].max_queue for topic in topics if topic in qos and qos[topic].max_queue is not None]
+        self._publish_sockets[func_instance] = self._transport.publisher(hwm=min(max_queues) if max_queues else None)
 
         # add to list of local topics
         self._pub_topics.update(topics)
 
     def _setup_dialog_ctrl_msg_listener(self):
-        """ Setup a subscriber socket to receive `DialogSystem` control message """ 
-         
-        ctx = Context.instance()
+        """ Setup a subscriber channel to receive `DialogSystem` control message """ 
 
         # setup receiver for dialog system control messages
-        self._control_channel_sub = ctx.socket(zmq.SUB)
-        self._control_channel_sub.setsockopt(zmq.SUBSCRIBE, bytes(self._start_topic, encoding="ascii"))
-        self._control_channel_sub.setsockopt(zmq.SUBSCRIBE, bytes(self._end_topic, encoding="ascii"))
-        self._control_channel_sub.setsockopt(zmq.SUBSCRIBE, bytes(self._terminate_topic, encoding="ascii"))
-        self._control_channel_sub.setsockopt(zmq.SUBSCRIBE, bytes(self._train_topic, encoding="ascii"))
-        self._control_channel_sub.setsockopt(zmq.SUBSCRIBE, bytes(self._eval_topic, encoding="ascii"))
-        self._control_channel_sub.connect(f"{self._protocol}://{self._host_addr}:{self._sub_port}")
+        self._control_channel_sub = self._transport.subscriber([self._start_topic, self._end_topic,
+                                                                self._terminate_topic, self._train_topic,
+                                                                self._eval_topic, self._ready_topic])
 
         # setup sender for dialog system control message acknowledgements 
-        self._control_channel_pub = ctx.socket(zmq.PUB)
-        self._control_channel_pub.sndhwm = 1100000
-        self._control_channel_pub.connect(f"{self._protocol}://{self._host_addr}:{self._pub_port}")
-
-        # setup receiver for internal ACK messages
-        self._internal_control_channel_sub = ctx.socket(zmq.SUB)
-        for internal_ctrl_topic in list(self._internal_end_topics.keys()) + list(
-                self._internal_start_topics.keys()) + list(self._internal_terminate_topics.keys()):
-            self._internal_control_channel_sub.setsockopt(zmq.SUBSCRIBE,
-                                                          bytes(f"ACK/{internal_ctrl_topic}", encoding="ascii"))
-        self._internal_control_channel_sub.connect(f"{self._protocol}://{self._host_addr}:{self._sub_port}")
-
-    def _control_channel_listener(self):
-        """ Using the control message subscription socket, listen to control messages from the `DialogSystem` in a loop.
-            Meant to be called in a thread.
+        self._control_channel_pub = self._transport.publisher()
+
+        # setup receiver for internal ACK messages (and readiness probes sent by the publishers of this service)
+        self._internal_control_channel_sub = self._transport.subscriber(
+            [f"ACK/{internal_ctrl_topic}" for internal_ctrl_topic in list(self._internal_end_topics.keys()) +
+             list(self._internal_start_topics.keys()) + list(self._internal_terminate_topics.keys()) +
+             list(self._internal_ready_topics.keys())] + [f"ACK/{self._ready_topic}/"])
+
+    def _wait_until_ready(self):
+        """ Blocks until all listeners of this service receive control messages and all publishers of this service
+            are connected (their messages are received). """
+        probes = {}
+        for internal_ready_topic in self._internal_ready_topics:
+            probes[internal_ready_topic] = lambda topic=internal_ready_topic: _send_msg(self._control_channel_pub,
+                                                                                       topic, True)
+        for idx, publisher in enumerate(self._publish_sockets.values()):
+            probes[f"{self._ready_topic}/PUB{idx}"] = lambda topic=f"{self._ready_topic}/PUB{idx}", \
+                publisher=publisher: _send_ack(publisher, topic)
+        _probe(self._internal_control_channel_sub, probes)
+
+    def _handle_control_message(self, topic: str, message: Tuple[float, str, Any]) -> bool:
+        """ Handles a control message from the `DialogSystem` received by the control message subscription channel.
+            Meant to be registered with an executor (see `services.executor`).
+
+        Returns:
+            False, if the service was terminated (stop listening to control messages)
         """
         listen = True
-        while listen:
-            try:
-                # receive message for subscribed control topic
-                msg = self._control_channel_sub.recv_multipart(copy=True)
-                topic = msg[0].decode("ascii")
-                timestamp, content = pickle.loads(msg[1])
+        try:
+            timestamp, session_id, content = message
 
-                if topic == self._start_topic:
-                    # initialize dialog state
+            if topic == self._start_topic:
+                # initialize dialog state
+                if session_id is None:
                     self.dialog_start()
-                    # set all listeners of this service to listening mode (block until they are listening)
-                    for internal_start_topic in self._internal_start_topics:
-                        _send_msg(self._control_channel_pub, internal_start_topic, True)
-                        _recv_ack(self._internal_control_channel_sub, internal_start_topic)
-                    _send_ack(self._control_channel_pub, self._start_topic)
-                elif topic == self._end_topic:
-                    # stop all listeners of this service (block until they stopped)
-                    for internal_end_topic in self._internal_end_topics:
-                        _send_msg(self._control_channel_pub, internal_end_topic, True)
-                        _recv_ack(self._internal_control_channel_sub, internal_end_topic, True)
+                else:
+                    self._start_session(session_id)
+                # set all listeners of this service to listening mode (block until they are listening)
+                start_topics = self._internal_start_topics
+                if content == _WARM_RESTART and session_id is None:
+                    # listeners still listening from the last dialog only drop the values they received
+                    start_topics = [start_topic for start_topic in start_topics
+                                    if not self._listener_resets[start_topic](session_id)]
+                _broadcast(self._control_channel_pub, self._internal_control_channel_sub, start_topics,
+                           session_id=session_id)
+                _send_ack(self._control_channel_pub, self._start_topic, session_id=session_id)
+            elif topic == self._end_topic:
+                # stop all listeners of this service (block until they stopped), on warm restarts they keep listening
+                if not (content == _WARM_RESTART and session_id is None):
+                    _broadcast(self._control_channel_pub, self._internal_control_channel_sub, self._internal_end_topics,
+                               session_id=session_id)
+                if session_id is None:
                     self.dialog_end()
-                    _send_ack(self._control_channel_pub, self._end_topic)
-                elif topic == self._terminate_topic:
-                    # terminate all listeners of this service (block until they stopped)
-                    for internal_terminate_topic in self._internal_terminate_topics:
-                        _send_msg(self._control_channel_pub, internal_terminate_topic, True)
-                        _recv_ack(self._internal_control_channel_sub, internal_terminate_topic, True)
-                    self.dialog_exit()
-                    _send_ack(self._control_channel_pub, self._terminate_topic)
-                    listen = False
-                elif topic == self._train_topic:
-                    self.train()
-                    _send_ack(self._control_channel_pub, self._train_topic)
-                elif topic == self._eval_topic:
-                    self.eval()
-                    _send_ack(self._control_channel_pub, self._eval_topic)
                 else:
-                    if self.debug_logger:
-                        self.debug_logger.info("- (Service): received unknown control message from topic", topic,
-                                               " with content", content)
-            except KeyboardInterrupt:
-                break
-            except:
-                import traceback
-                print("ERROR in Service: _control_channel_listener")
-                traceback.print_exc()
+                    self._end_session(session_id)
+                _send_ack(self._control_channel_pub, self._end_topic, session_id=session_id)
+            elif topic == self._terminate_topic:
+                # terminate all listeners of this service (block until they stopped)
+                _broadcast(self._control_channel_pub, self._internal_control_channel_sub, self._internal_terminate_topics)
+                self.dialog_exit()
+                _send_ack(self._control_channel_pub, self._terminate_topic)
+                listen = False
+            elif topic == self._train_topic:
+                self.train()
+                _send_ack(self._control_channel_pub, self._train_topic)
+            elif topic == self._eval_topic:
+                self.eval()
+                _send_ack(self._control_channel_pub, self._eval_topic)
+            elif topic == self._ready_topic:
+                self._wait_until_ready()
+                _send_ack(self._control_channel_pub, self._ready_topic)
+            else:
+                if self.debug_logger:
+                    self.debug_logger.info("- (Service): received unknown control message from topic", topic,
+                                           " with content", content)
+        except KeyboardInterrupt:
+            raise
+        except:
+            import traceback
+            print("ERROR in Service: _handle_control_message")
+            traceback.print_exc()
+        return listen
+
+    def _start_session(self, session_id: str):
+        """ Creates the state for a new dialog session and calls `dialog_start` on it.
+
+        Args:
+            session_id (str): unique identifier of the new session
+        """
+        with self._session_lock:
+            # copy the attributes of the service instance as a template, dialog_start re-initializes them
+            self._sessions[session_id] = {name: copy.copy(getattr(self, name)) for name in self.session_attributes
+                                          if hasattr(self, name)}
+            with self.session_scope(session_id):
+                self.dialog_start()
+
+    def _end_session(self, session_id: str):
+        """ Calls `dialog_end` for the given session and discards its state.
+
+        Args:
+            session_id (str): identifier of the session to end
+        """
+        with self._session_lock:
+            if session_id not in self._sessions:
+                return
+            with self.session_scope(session_id):
+                self.dialog_end()
+            del self._sessions[session_id]
+            for key in [key for key in self._published_beliefstates if key[0] == session_id]:
+                del self._published_beliefstates[key]
+
+    def _to_delta(self, topic: str, beliefstate: BeliefState) -> BeliefStateDelta:
+        """ Returns the changes of a belief state since it was last published to the given topic
+            (in the current session). A new belief state object is sent completely.
+
+        Args:
+            topic (str): topic the belief state is published to
+            beliefstate (BeliefState): the belief state to publish
+        """
+        key = (self.get_current_session(), topic)
+        with self._session_lock:
+            last_beliefstate, num_sent = self._published_beliefstates.get(key, (None, 0))
+            delta = beliefstate.get_delta(num_sent if last_beliefstate is beliefstate else 0)
+            self._published_beliefstates[key] = (beliefstate, len(beliefstate))
+        return delta
+
+    def get_current_session(self) -> Union[str, None]:
+        """
+        Returns:
+            The identifier of the dialog session processed by the calling thread (`None` in single-dialog mode)
+        """
+        return getattr(self._session_local, 'session_id', None)
+
+    @contextmanager
+    def session_scope(self, session_id: str):
+        """ Context manager swapping the state of the given session into the attributes listed
+            in `session_attributes`. Changes to these attributes are written back to the session's state on exit.
+            Scopes of one service instance are serialized, so only one session is active at a time.
+
+        Args:
+            session_id (str): identifier of the session (`None`: single-dialog mode, nothing is swapped)
+        """
+        if session_id is None or not self.session_attributes:
+            yield
+            return
+        with self._session_lock:
+            outer_state = {name: getattr(self, name) for name in self.session_attributes if hasattr(self, name)}
+            for name, value in self._sessions.get(session_id, {}).items():
+                setattr(self, name, value)
+            try:
+                yield
+            finally:
+                if session_id in self._sessions:
+                    self._sessions[session_id] = {name: getattr(self, name) for name in self.session_attributes
+                                                  if hasattr(self, name)}
+                for name in self.session_attributes:
+                    if name in outer_state:
+                        setattr(self, name, outer_state[name])
+                    elif hasattr(self, name):
+                        delattr(self, name)
 
     def dialog_start(self):
         """ This function is called before the first message to a new dialog is published.
@@ -367,7 +582,7 @@ class Service:
         sync_endpoint = ctx.socket(zmq.REQ)
         sync_endpoint.connect(f"tcp://{self._host_addr}:{host_reg_port}")
         data = pickle.dumps((self._domain_name, self._sub_topics, self._pub_topics, self._start_topic, self._end_topic,
-                             self._terminate_topic))
+                             self._terminate_topic, self._ready_topic))
         sync_endpoint.send_multipart((bytes(f"REGISTER_{self._identifier}", encoding="ascii"), data))
 
         # wait for registration confirmation
@@ -398,66 +613,100 @@ class Service:
         """
         return copy.deepcopy(self._pub_topics)
 
-    def _receiver_thread(self, subscriber: Socket, func_instance,
-                         topics: Iterable[str], queued_topics: Iterable[str],
-                         start_topic: str, end_topic: str, terminate_topic: str):
+    def get_drop_counts(self) -> Dict[str, Dict[str, int]]:
+        """
+        Returns:
+            Number of received values dropped by the quality of service settings (see `services.qos.QoS`)
+            as mapping of subscriber function name -> subscribed topic -> number of dropped values
+        """
+        return {func_name: dict(drop_counts) for func_name, drop_counts in self._drop_counts.items()}
+
+    def _create_message_handler(self, func_instance, topics: Iterable[str], queued_topics: Iterable[str],
+                                qos: Dict[str, QoS], router: TopicRouter, start_topic: str, end_topic: str, terminate_topic: str,
+                                ready_topic: str):
         """
-        Loop for receiving messages.
-        Will continue until a message for `terminate_topic` is received.
+        Creates the handler for the messages received by the listener of a decorated function.
+        The handler returns False once a message for `terminate_topic` is received.
 
-        Handles waiting for messages, decoding, unpickling and subscription topic to  
-        service function keyword mapping.
+        Handles control messages and subscription topic to service function keyword mapping.
 
-        Meant to be run in a Thread!
+        Meant to be registered with an executor (see `services.executor`)!
 
         Args:
-            subscriber (Socket): subscriber socket
             func_instance (function instance): the decorated subscriber function instance to be called with the received messages
             topics (Iterable[str]): all last-message-only topics the decorated `func_instance` subscribes to
             queued_topics (Iterable[str]): all collect-all-messages-since-last-call topics the decorated `func_instance` subscribes to
+            qos (Dict[str, QoS]): quality of service settings of (some of) the subscribed topics
+            router (TopicRouter): maps the subscribed topics (including domain) to the subscribed topics (function arguments)
             start_topic (str): Control message topic to set this specific `function_instance` into listening mode (receive all non-control messages)
             end_topic (str): Control message topic to set this specific `function_instance` into non-listening mode (ignore all non-control messages)
-            terminate_topic (str): Control message topic to end the listener loop for this specific `function_instance`. 
-                                   Also closes the socket before returning.
+            terminate_topic (str): Control message topic to stop the listener for this specific `function_instance`.
+                                   The executor closes the subscriber channel afterwards.
+            ready_topic (str): Control message topic to check whether this listener receives messages (readiness probe)
         """
 
-        ctx = Context.instance()
-        control_channel_pub = ctx.socket(zmq.PUB)
-        control_channel_pub.sndhwm = 1100000
-        control_channel_pub.connect(f"{self._protocol}://{self._host_addr}:{self._pub_port}")
-
-        values = {}
-        timestamps = {}
-        all_sub_topics = topics + queued_topics
-        num_topics = len(all_sub_topics)
-        active = False
-        terminating = False
-
-        while not terminating:
+        control_channel_pub = self._transport.publisher()
+
+        values = {}  # session id -> {topic -> value}
+        timestamps = {}  # session id -> {topic -> timestamp}
+        replicas = {}  # session id -> {topic -> replica of the published belief state}
+        sampled = {}  # session id -> {topic -> timestamp of the last accepted value} (for topics with a sample rate)
+        received = {}  # session id -> {topic -> receive time of the (newest) value} (if tracing is enabled)
+        turns = {}  # session id -> number of function calls (if tracing is enabled)
+        service_name = type(self).__name__ if self._identifier is None else self._identifier
+        num_topics = len(topics + queued_topics)
+        active_sessions = set()  # sessions this listener is receiving messages for (`None`: single-dialog mode)
+        drop_counts = Counter()  # topic -> number of values dropped by the quality of service settings
+        self._drop_counts[func_instance.__name__] = drop_counts
+
+        def reset(session_id: str) -> bool:
+            """ Drops all values received for the given session, returns False if the listener isn't listening to it """
+            if session_id not in active_sessions:
+                return False
+            values[session_id] = {}
+            timestamps[session_id] = {}
+            replicas[session_id] = {}
+            sampled[session_id] = {}
+            received[session_id] = {}
+            turns[session_id] = 0
+            return True
+        self._listener_resets[start_topic] = reset
+
+        def handle_message(topic: str, message: Tuple[float, str, Any]) -> bool:
             try:
-                msg = subscriber.recv_multipart(copy=True)
-                topic = msg[0].decode("ascii")
+                timestamp, session_id, content = message
                 # based on topic, decide what to do
                 if topic == start_topic:
                     # reset values and start listening to non-control messages
-                    values = {}
-                    timestamps = {}
-                    active = True
-                    _send_ack(control_channel_pub, start_topic)
+                    values[session_id] = {}
+                    timestamps[session_id] = {}
+                    replicas[session_id] = {}
+                    sampled[session_id] = {}
+                    received[session_id] = {}
+                    turns[session_id] = 0
+                    active_sessions.add(session_id)
+                    _send_ack(control_channel_pub, start_topic, session_id=session_id)
                 elif topic == end_topic:
                     # ignore all non-control messages
-                    active = False
-                    _send_ack(control_channel_pub, end_topic)
+                    active_sessions.discard(session_id)
+                    values.pop(session_id, None)
+                    timestamps.pop(session_id, None)
+                    replicas.pop(session_id, None)
+                    sampled.pop(session_id, None)
+                    received.pop(session_id, None)
+                    turns.pop(session_id, None)
+                    _send_ack(control_channel_pub, end_topic, session_id=session_id)
                 elif topic == terminate_topic:
-                    # shutdown listener thread by exiting loop
-                    active = False
+                    # stop listener
+                    active_sessions.clear()
                     _send_ack(control_channel_pub, terminate_topic)
-                    terminating = True
+                    return False
+                elif topic == ready_topic:
+                    _send_ack(control_channel_pub, ready_topic)
                 else:
                     # non-control message
-                    if active:
+                    if session_id in active_sessions:
                         # process message
-                        timestamp, content = pickle.loads(msg[1])
                         if self.debug_logger:
                             self.debug_logger.info(
                                 f"- (DS): listener thread for function {func_instance}:\n   received for topic {topic}:\n   {content}")
@@ -466,53 +715,101 @@ class Service:
                         # store them until there was at least 1 new value received per topic.
                         # Then call callback function with complete set of values.
                         # Reset values afterwards and start collecting again.
+                        session_values = values[session_id]
+                        session_timestamps = timestamps[session_id]
+
+                        if isinstance(content, BeliefStateDelta):
+                            # update local replica, the subscriber receives its own copy of the current turn
+                            session_replicas = replicas[session_id]
+                            if content.base == 0:
+                                session_replicas[topic] = BeliefState.__new__(BeliefState)
+                                session_replicas[topic]._history = []
+                            session_replicas[topic].apply_delta(content)
+                            content = session_replicas[topic].fork()
 
                         # problem: routing based on prefixes -> function argument names may differ
-                        # solution: find longest common prefix of argument name and received topic
-                        common_prefix = ""
-                        for key in all_sub_topics:
-                            if topic.startswith(key) and len(topic) > len(common_prefix):
-                                common_prefix = key
+                        # solution: find longest subscribed prefix of the received topic
+                        _, common_prefix = router.longest_match(topic)
+                        topic_qos = qos.get(common_prefix)
+                        if topic_qos is not None:
+                            # drop values received faster than the sample rate
+                            session_sampled = sampled[session_id]
+                            if not topic_qos.sample(timestamp, session_sampled.get(common_prefix)):
+                                drop_counts[common_prefix] += 1
+                                return True
+                            session_sampled[common_prefix] = timestamp
+                        tracer = self._tracer
+                        if tracer is not None:
+                            received[session_id][common_prefix] = time.time()
                         if common_prefix in topics:
-                            # store only latest value
-                            values[common_prefix] = content  # set value for received topic
-                            timestamps[common_prefix] = timestamp  # set timestamp for received value
+                            if topic_qos is not None and common_prefix in session_values:
+                                # keep a single value according to the drop policy
+                                queued_values = [session_values[common_prefix]]
+                                queued_timestamps = [session_timestamps[common_prefix]]
+                                drop_counts[common_prefix] += topic_qos.put(queued_values, queued_timestamps, content,
+                                                                            timestamp, max_queue=1)
+                                session_values[common_prefix] = queued_values[0]
+                                session_timestamps[common_prefix] = queued_timestamps[0]
+                            else:
+                                # store only latest value
+                                session_values[common_prefix] = content  # set value for received topic
+                                session_timestamps[common_prefix] = timestamp  # set timestamp for received value
                         else:
                             # topic is a queued_topic - queue all values and their timestamps
-                            if not common_prefix in values:
-                                values[common_prefix] = []
-                                timestamps[common_prefix] = []
-                            values[common_prefix].append(content)
-                            timestamps[common_prefix].append(timestamp)
+                            if not common_prefix in session_values:
+                                session_values[common_prefix] = []
+                                session_timestamps[common_prefix] = []
+                            if topic_qos is not None:
+                                # bounded queue
+                                drop_counts[common_prefix] += topic_qos.put(session_values[common_prefix],
+                                                                            session_timestamps[common_prefix],
+                                                                            content, timestamp)
+                            else:
+                                session_values[common_prefix].append(content)
+                                session_timestamps[common_prefix].append(timestamp)
 
-                        if len(values) == num_topics:
+                        if len(session_values) == num_topics:
                             # received a new value for each topic -> call callback function
                             if func_instance.timestamp_enabled:
                                 # append timestamps, if required
-                                values['timestamps'] = timestamps
+                                session_values['timestamps'] = session_timestamps
                             if self.debug_logger:
                                 self.debug_logger.info(
                                     f"- (DS): received all messages for function {func_instance}\n   -> CALLING function")
-                            if self.__class__ == Service:
-                                # NOTE workaround for publisher / subscriber without being an instance method
-                                func_instance(**values)
-                            else:
-                                func_instance(self, **values)
+                            # messages published by the callback are tagged with the current session
+                            self._session_local.session_id = session_id
+                            start = time.time()
+                            with self.session_scope(session_id):
+                                if self.__class__ == Service:
+                                    # NOTE workaround for publisher / subscriber without being an instance method
+                                    func_instance(**session_values)
+                                else:
+                                    func_instance(self, **session_values)
+                            if tracer is not None:
+                                session_received = received[session_id]
+                                inputs = {name: (published[-1] if isinstance(published, list) else published,
+                                                 session_received.get(name, start))
+                                          for name, published in session_timestamps.items()}
+                                tracer.record_call(CallTrace(service_name, func_instance.__name__, session_id,
+                                                             turns[session_id], inputs, start, time.time()))
+                                turns[session_id] += 1
                             # reset values
-                            values = {}
-                            timestamps = {}
+                            values[session_id] = {}
+                            timestamps[session_id] = {}
             except KeyboardInterrupt:
-                break
+                raise
             except:
                 print("THREAD ERROR")
                 import traceback
                 traceback.print_exc()
-        # shutdown
-        subscriber.close()
+            return True
+
+        return handle_message
 
 
 # Each decorated function should return a dictonary with the keys matching the pub_topics names
-def PublishSubscribe(sub_topics: List[str] = [], pub_topics: List[str] = [], queued_sub_topics: List[str] = []):
+def PublishSubscribe(sub_topics: List[str] = [], pub_topics: List[str] = [], queued_sub_topics: List[str] = [],
+                     qos: Dict[str, QoS] = {}):
     """
     Decorator function for services.
     To be able to publish / subscribe to / from topics,
@@ -532,6 +829,11 @@ def PublishSubscribe(sub_topics: List[str] = [], pub_topics: List[str] = [], que
         queued_sub_topics(List[str or utils.topics.Topic]): The topics you want to get all messages from.
                                                             If multiple messages are received until your function is called,
                                                             you will receive all values since the previous function call as a list.
+        qos(Dict[str, services.qos.QoS]): Quality of service settings for (high-rate) topics, e.g.
+                                          `{'video_input': QoS(max_queue=32)}`. For subscribed topics, they bound the
+                                          number of kept values, decide which values are dropped and limit the accepted
+                                          message rate (see `Service.get_drop_counts`). For published topics,
+                                          they bound the number of messages buffered for slow subscribers.
 
     Notes:
         * Subscription topic names have to match your function keywords
@@ -542,15 +844,21 @@ def PublishSubscribe(sub_topics: List[str] = [], pub_topics: List[str] = [], que
           It will be filled by a dictionary providing timestamps for each received value, indexed by name.
     
     Technical notes:
-        * Data will be automatically pickled / unpickled during send / receive to reduce meassage size.
+        * Data will be automatically pickled / unpickled during send / receive to reduce meassage size
+          (unless the `DialogSystem` uses a `services.transport.LocalTransport`).
           However, some python objects are not serializable (e.g. database connections) for good reasons
           and will throw an error if you try to publish them.
+        * `BeliefState` objects are published as `BeliefStateDelta`s containing only the changes since the
+          last time the same object was published. Subscribers keep a replica of the belief state and receive
+          a `BeliefState` (with a private copy of the current turn) as before.
         * The domain name of your service class will be appended to your publish topics.
           Subscription topics are prefix-matched, so you will receive all messages from 'topic/suffix'
           if you subscibe to 'topic'.
     """
 
     def wrapper(func):
+        # NOTE: keeps the function name, listener control topics are derived from the bound method's name
+        @functools.wraps(func)
         def delegate(self, *args, **kwargs):
             func_inst = getattr(self, func.__name__)
 
@@ -578,7 +886,16 @@ def PublishSubscribe(sub_topics: List[str] = [], pub_topics: List[str] = [], que
                         topic_domain_str = f"{topic}/{domain}" if domain else topic
                         if topic in self._pub_topic_domains:
                             topic_domain_str = f"{topic}/{self._pub_topic_domains[topic]}" if self._pub_topic_domains[topic] else topic
-                        _send_msg(socket, topic_domain_str, result[topic])
+                        content = result[topic]
+                        if isinstance(content, BeliefState):
+                            # only publish changes, subscribers keep a replica (see `_create_message_handler`)
+                            content = self._to_delta(topic_domain_str, content)
+                        session_id = self.get_current_session()
+                        timestamp, size = _send_msg(socket, topic_domain_str, content, session_id)
+                        if self._tracer is not None:
+                            service_name = type(self).__name__ if self._identifier is None else self._identifier
+                            self._tracer.record_publish(PublishTrace(service_name, topic_domain_str, session_id,
+                                                                     timestamp, size))
                         if self.debug_logger:
                             self.debug_logger.info(
                                 f"- (DS): sent message from {func} to topic {topic_domain_str}:\n   {result[topic]}")
@@ -589,6 +906,7 @@ def PublishSubscribe(sub_topics: List[str] = [], pub_topics: List[str] = [], que
         delegate.sub_topics = sub_topics
         delegate.queued_sub_topics = queued_sub_topics
         delegate.pub_topics = pub_topics
+        delegate.qos = qos
         # check arguments: is subsriber interested in timestamps?
         delegate.timestamp_enabled = 'timestamps' in inspect.getfullargspec(func)[0]
 
@@ -603,10 +921,19 @@ class DialogSystem:
     It will also handle synchronization for initalization of services before dialog start / after dialog end / on system shutdown
     and lets you discover potential conflicts in you messaging pipeline.
     This class is also used to communicate / synchronize with services running on different nodes.
+
+    Besides running one dialog at a time (`run_dialog`), a `DialogSystem` can serve many interleaved dialogs
+    with the same service instances: each dialog is a session started via `start_session`. All messages are tagged
+    with their session's id and services keep one copy of their `session_attributes` per session.
+    A session ends as soon as a `Topic.DIALOG_END` message with value `True` is published in it (or `end_session`
+    is called).
     """
 
     def __init__(self, services: List[Union[Service, RemoteService]], sub_port: int = 65533, pub_port: int = 65534,
-                 reg_port: int = 65535, protocol: str = 'tcp', debug_logger: DiasysLogger = None):
+                 reg_port: int = 65535, protocol: str = 'tcp', debug_logger: DiasysLogger = None,
+                 transport: Transport = None, codecs: Dict[str, Union[str, Codec]] = None,
+                 default_codec: Union[str, Codec] = 'pickle', executor: Executor = None,
+                 control_timeout: float = None, warm_restart: bool = False, tracer: Tracer = None):
         """
         Args:
             services (List[Union[Service, RemoteService]]): List of all (remote) services to connect to.
@@ -621,6 +948,30 @@ class DialogSystem:
             debug_logger (DiasysLogger): If not `None`, all messags are printed to the logger, including send/receive events.
                                 Can be useful for debugging because you can still see messages received by the `DialogSystem`
                                 even if they are never forwarded (as expected) to your `Service`
+            transport (Transport): message transport connecting all services (see `services.transport`).
+                                   Defaults to a `ZMQTransport` on the given ports and protocol.
+                                   Use a `LocalTransport` to pass messages between services of this process
+                                   without serialization (doesn't support `RemoteService`s).
+            codecs (Dict[str, Union[str, Codec]]): mapping of topic (prefixes) to the codec (name) used for publishing
+                                                   messages of these topics, e.g. `{'beliefstate': 'compact'}`
+                                                   (see `services.codecs`). Only used by the default transport.
+                                                   Remote services have to accept the same codecs
+                                                   (see `Service.set_codecs`).
+            default_codec (Union[str, Codec]): codec (name) used for all other topics by the default transport
+            executor (Executor): runs the message listeners of all local services (see `services.executor`).
+                                 Defaults to a `ThreadExecutor` (one thread per listener), use a `PooledExecutor`
+                                 to process all messages on a bounded thread pool. Stopped by `shutdown`.
+            control_timeout (float): maximum time in seconds to wait for all services to acknowledge a control message
+                                     (start / end of a dialog, shutdown). If a service doesn't acknowledge in time,
+                                     a `TimeoutError` naming it is raised (`None`: wait forever).
+            warm_restart (bool): If True, the listeners of all services keep listening between two dialogs run by
+                                 `run_dialog`. Only the values they received are dropped when the next dialog
+                                 starts, saving one handshake per service listener and dialog.
+                                 Messages published after the `Topic.DIALOG_END` message of a dialog may still reach
+                                 the services (even after their `dialog_end`), so only use this if your services
+                                 don't publish messages after the end of the dialog.
+            tracer (Tracer): if not `None`, records the calls of all subscriber functions and all published messages
+                             of the local services (see `services.tracing`)
         """
         # node-local topics
         self.debug_logger = debug_logger
@@ -634,11 +985,15 @@ class DialogSystem:
         # node-local sockets
         self._domains = set()
 
-        # start proxy thread
-        self._proxy_dev = ProcessProxy(in_type=zmq.XSUB, out_type=zmq.XPUB)  # , mon_type=zmq.XSUB)
-        self._proxy_dev.bind_in(f"{protocol}://127.0.0.1:{pub_port}")
-        self._proxy_dev.bind_out(f"{protocol}://127.0.0.1:{sub_port}")
-        self._proxy_dev.start()
+        # start proxy / message broker
+        if transport is None:
+            domains = {service.domain.get_domain_name(): service.domain for service in services
+                       if isinstance(service, Service) and isinstance(service.domain, Domain)}
+            transport = ZMQTransport("127.0.0.1", sub_port, pub_port, protocol, codecs=codecs,
+                                     default_codec=default_codec, domains=domains.values())
+        self._transport = transport
+        self._transport.start()
+        self._executor = executor if executor is not None else ThreadExecutor()
         self._sub_port = sub_port
         self._pub_port = pub_port
 
@@ -646,14 +1001,22 @@ class DialogSystem:
         self._start_topics = set()
         self._end_topics = set()
         self._terminate_topics = set()
+        self._ready_topics = set()
+        self._ready_topic = f"{type(self).__name__}/{id(self)}/READY"  # probes the dialog system's own channels
+        self._control_topic_services = {}  # control topic -> name of the service listening to it
+        self._control_timeout = control_timeout
+        self._warm_restart = warm_restart
         self._stopEvent = threading.Event()
 
+        # multi-session control
+        self._control_lock = threading.RLock()  # control channel sockets are shared between threads
+        self._sessions = {}  # session id -> event that is set once the session ended
+        self._session_end_listener = None
+        self._session_listener_stop = threading.Event()
+
         # control channels
-        ctx = Context.instance()
-        self._control_channel_pub = ctx.socket(zmq.PUB)
-        self._control_channel_pub.sndhwm = 1100000
-        self._control_channel_pub.connect(f"{protocol}://127.0.0.1:{pub_port}")
-        self._control_channel_sub = ctx.socket(zmq.SUB)
+        self._control_channel_pub = self._transport.publisher()
+        self._control_channel_sub = self._transport.subscriber()
 
         # register services (local and remote)
         remote_services = {}
@@ -661,18 +1024,22 @@ class DialogSystem:
             if isinstance(service, Service):
                 # register local service
                 service_name = type(service).__name__ if service._identifier is None else service._identifier
+                service._transport = self._transport
+                service._executor = self._executor
+                service._tracer = tracer
                 service._init_pubsub()
                 self._add_service_info(service_name, service._domain_name, service._sub_topics, service._pub_topics,
-                                       service._start_topic, service._end_topic, service._terminate_topic)
+                                       service._start_topic, service._end_topic, service._terminate_topic,
+                                       service._ready_topic)
                 service._register_with_dialogsystem()
             elif isinstance(service, RemoteService):
                 remote_services[getattr(service, 'identifier')] = service
+        assert not remote_services or self._transport.is_remote_capable(), \
+            "remote services require a transport supporting connections from other nodes (e.g. ZMQTransport)"
         self._register_remote_services(remote_services, reg_port)
 
-        self._control_channel_sub.connect(f"{protocol}://127.0.0.1:{sub_port}")
         self._setup_dialog_end_listener()
-
-        time.sleep(0.25)
+        self._wait_until_ready()
 
     def _register_pub_topic(self, publisher, topic: str):
         """ Map a publisher instance to a topic """
@@ -713,9 +1080,10 @@ class DialogSystem:
                 if remote_service_identifier in remote_services:
                     print(f"registering service {remote_service_identifier}...")
                     # add remote service interface info
-                    domain_name, sub_topics, pub_topics, start_topic, end_topic, terminate_topic = pickle.loads(data)
+                    domain_name, sub_topics, pub_topics, start_topic, end_topic, terminate_topic, ready_topic = \
+                        pickle.loads(data)
                     self._add_service_info(remote_service_identifier, domain_name, sub_topics, pub_topics, start_topic,
-                                           end_topic, terminate_topic)
+                                           end_topic, terminate_topic, ready_topic)
                     self._remote_identifiers.add(remote_service_identifier)
                     # acknowledge service registration
                     reg_service.send(bytes(f'ACK_REGISTER_{remote_service_identifier}', encoding="ascii"))
@@ -729,7 +1097,7 @@ class DialogSystem:
         print("########## Finished registering all remote services ##########")
 
     def _add_service_info(self, service_name: str, domain_name: str, sub_topics: List[str], pub_topics: List[str], 
-                            start_topic: str, end_topic:str, terminate_topic: str):
+                            start_topic: str, end_topic:str, terminate_topic: str, ready_topic: str):
         """ Add all relevant info from a service (needed to construct dialog graph for debugging).
             Also, sets up all required control channels for this service based on the service's info.
             
@@ -742,6 +1110,8 @@ class DialogSystem:
             end_topic (str): control channel topic for setting given service into `non-listening` mode
             terminate_topic (str): control channel topic for stopping given service's listener loops and
                                    closing the listener sockets
+            ready_topic (str): control channel topic for checking whether the given service's listeners and
+                               publishers are connected
         """
         self._domains.add(domain_name)
         for topic in sub_topics:
@@ -753,24 +1123,44 @@ class DialogSystem:
         self._start_topics.add(start_topic)
         self._end_topics.add(end_topic)
         self._terminate_topics.add(terminate_topic)
+        self._ready_topics.add(ready_topic)
+        for control_topic in (start_topic, end_topic, terminate_topic, ready_topic):
+            self._control_topic_services[control_topic] = service_name
 
-        self._control_channel_sub.setsockopt(zmq.SUBSCRIBE, bytes(f"ACK/{start_topic}", encoding="ascii"))
-        self._control_channel_sub.setsockopt(zmq.SUBSCRIBE, bytes(f"ACK/{end_topic}", encoding="ascii"))
-        self._control_channel_sub.setsockopt(zmq.SUBSCRIBE, bytes(f"ACK/{terminate_topic}", encoding="ascii"))
+        self._control_channel_sub.subscribe(f"ACK/{start_topic}")
+        self._control_channel_sub.subscribe(f"ACK/{end_topic}")
+        self._control_channel_sub.subscribe(f"ACK/{terminate_topic}")
+        self._control_channel_sub.subscribe(f"ACK/{ready_topic}")
 
     def _setup_dialog_end_listener(self):
-        """ Creates socket for listening to Topic.DIALOG_END messages """
-        ctx = Context.instance()
-        self._end_socket = ctx.socket(zmq.SUB)
+        """ Creates subscriber channels for listening to Topic.DIALOG_END messages (single-dialog and session mode) """
         # subscribe to dialog end from all domains
-        self._end_socket.setsockopt(zmq.SUBSCRIBE, bytes(Topic.DIALOG_END, encoding="ascii"))
-        self._end_socket.connect(f"{self.protocol}://127.0.0.1:{self._sub_port}")
+        self._end_socket = self._transport.subscriber([Topic.DIALOG_END, f"ACK/{self._ready_topic}"])
+        self._session_end_socket = self._transport.subscriber([Topic.DIALOG_END, f"ACK/{self._ready_topic}"])
 
         # # add to list of local topics
         # if Topic.DIALOG_END not in self._local_sub_topics:
         #     self._local_sub_topics[Topic.DIALOG_END] = set()
         # self._local_sub_topics[Topic.DIALOG_END].add(type(self).__name__)
 
+    def _wait_until_ready(self):
+        """ Blocks until all services and the dialog end listeners receive messages (no fixed waiting time).
+            Subscriptions are propagated asynchronously, so readiness probes are sent until they are acknowledged.
+
+        Raises:
+            TimeoutError: if not all services acknowledged within the `control_timeout` of this dialog system
+        """
+        with self._control_lock:
+            for end_socket in (self._end_socket, self._session_end_socket):
+                _probe(end_socket, {self._ready_topic: lambda: _send_ack(self._control_channel_pub, self._ready_topic)})
+            probes = {ready_topic: lambda topic=ready_topic: _send_msg(self._control_channel_pub, topic, True)
+                      for ready_topic in self._ready_topics}
+            stragglers = _probe(self._control_channel_sub, probes, self._control_timeout)
+            if stragglers:
+                service_names = sorted(self._control_topic_services[topic] for topic in stragglers)
+                raise TimeoutError(f"services {', '.join(service_names)} didn't get ready within "
+                                   f"{self._control_timeout} seconds")
+
     def stop(self):
         """ Set stop event (can be queried by services via the `terminating()` function) """
         self._stopEvent.set()
@@ -787,9 +1177,36 @@ class DialogSystem:
             Blocks until all services sent ACK's confirming they're stopped.
         """
         self._stopEvent.set()
-        for terminate_topic in self._terminate_topics:
-            _send_msg(self._control_channel_pub, terminate_topic, True)
-            _recv_ack(self._control_channel_sub, terminate_topic)
+        if self._session_end_listener is not None:
+            self._session_listener_stop.set()
+            self._session_end_listener.join()
+            self._session_end_listener = None
+        self._session_end_socket.close()
+        with self._control_lock:
+            try:
+                self._handshake(self._terminate_topics, "shutdown")
+            except TimeoutError as e:
+                print(f"WARNING: {e}")
+        self._executor.shutdown()
+
+    def _handshake(self, topics: Iterable[str], action: str, content: Any = True, session_id: str = None):
+        """ Sends the control message to all given control topics at once and blocks until all services acknowledged.
+
+        Args:
+            topics (Iterable[str]): control topics of the services
+            action (str): name of the control action (used in error messages only)
+            content (Any): control message content
+            session_id (str): the session the control message belongs to (`None` for single-dialog mode)
+
+        Raises:
+            TimeoutError: if not all services acknowledged within the `control_timeout` of this dialog system
+        """
+        stragglers = _broadcast(self._control_channel_pub, self._control_channel_sub, topics, content, session_id,
+                                self._control_timeout)
+        if stragglers:
+            service_names = sorted(self._control_topic_services[topic] for topic in stragglers)
+            raise TimeoutError(f"services {', '.join(service_names)} didn't acknowledge {action} of session "
+                               f"{session_id} within {self._control_timeout} seconds")
 
     def _end_dialog(self):
         """ Block until all receivers stopped listening.
@@ -798,11 +1215,9 @@ class DialogSystem:
         # listen for Topic.DIALOG_END messages
         while True:
             try:
-                msg = self._end_socket.recv_multipart(copy=True)
                 # receive message for subscribed topic
-                topic = msg[0].decode("ascii")
-                timestamp, content = pickle.loads(msg[1])
-                if content:
+                topic, (timestamp, session_id, content) = self._end_socket.recv()
+                if content and session_id is None and topic.startswith(Topic.DIALOG_END):
                     if self.debug_logger:
                         self.debug_logger.info(f"- (DS): received DIALOG_END message in _end_dialog from topic {topic}")
                     self.stop()
@@ -815,31 +1230,116 @@ class DialogSystem:
                 print("ERROR in _end_dialog ")
 
         # stop receivers (blocking)
-        for end_topic in self._end_topics:
-            _send_msg(self._control_channel_pub, end_topic, True)
-            _recv_ack(self._control_channel_sub, end_topic)
+        self._stop_listeners(warm=self._warm_restart)
+
+    def _stop_listeners(self, session_id: str = None, warm: bool = False):
+        """ Block until all receivers stopped listening to the given session.
+            Then, calls `dialog_end` on all registered services.
+            On a warm restart (single-dialog mode only), only `dialog_end` is called and receivers keep listening. """
+        with self._control_lock:
+            self._handshake(self._end_topics, "end", _WARM_RESTART if warm else True, session_id)
         if self.debug_logger:
-            self.debug_logger.info(f"- (DS): all services STOPPED listening")
+            self.debug_logger.info(f"- (DS): all services STOPPED listening to session {session_id}")
 
-    def _start_dialog(self, start_signals: dict):
+    def _start_dialog(self, start_signals: dict, session_id: str = None, warm: bool = False):
         """ Block until all receivers started listening.
             Then, call `dialog_start`on all registered services.
-            Finally, publish all start signals given. """
+            Finally, publish all start signals given.
+            On a warm restart (single-dialog mode only), receivers still listening only drop their received values. """
     
-        self._stopEvent.clear()
-        if platform.system().lower() == 'windows':
-            time.sleep(1) # wait until stop event is cleared and dialog system is listening
-        # start receivers (blocking)
-        for start_topic in self._start_topics:
-            _send_msg(self._control_channel_pub, start_topic, True)
-            _recv_ack(self._control_channel_sub, start_topic)
-        if self.debug_logger:
-            self.debug_logger.info(f"- (DS): all services STARTED listening")
-        # publish first turn trigger
-        # for domain in self._domains:
-        # "wildcard" mechanism: publish start messages to all known domains
-        for topic in start_signals:
-            _send_msg(self._control_channel_pub, f"{topic}", start_signals[topic])
+        if session_id is None:
+            self._stopEvent.clear()
+        with self._control_lock:
+            # start receivers (blocking)
+            self._handshake(self._start_topics, "start", _WARM_RESTART if warm else True, session_id)
+            if self.debug_logger:
+                self.debug_logger.info(f"- (DS): all services STARTED listening to session {session_id}")
+            # publish first turn trigger
+            # for domain in self._domains:
+            # "wildcard" mechanism: publish start messages to all known domains
+            for topic in start_signals:
+                _send_msg(self._control_channel_pub, f"{topic}", start_signals[topic], session_id)
+
+    def _session_end_listener_thread(self):
+        """ Listens for `Topic.DIALOG_END` messages of running sessions and ends the respective sessions.
+            Meant to be run in a thread, stops on `shutdown`.
+        """
+        end_socket = self._session_end_socket
+        while not self._session_listener_stop.is_set():
+            try:
+                if not end_socket.poll(timeout=100):
+                    continue
+                topic, (timestamp, session_id, content) = end_socket.recv()
+                if content and session_id in self._sessions and topic.startswith(Topic.DIALOG_END):
+                    if self.debug_logger:
+                        self.debug_logger.info(f"- (DS): received DIALOG_END message for session {session_id}")
+                    self.end_session(session_id)
+            except KeyboardInterrupt:
+                break
+            except:
+                import traceback
+                traceback.print_exc()
+                print("ERROR in _session_end_listener_thread")
+
+    def start_session(self, start_signals: dict = {Topic.DIALOG_END: False}, session_id: str = None) -> str:
+        """ Start a new dialog session (non-blocking, returns once all services are ready for the session).
+            Any number of sessions may run at the same time, each with its own service state.
+            The session will end on receiving any `Topic.DIALOG_END` message with value `True` published in it.
+
+        Args:
+            start_signals (Dict[str, Any]): mapping from topic -> value
+                                            Publishes the value given for each topic to the respective topic.
+                                            Use this to trigger the start of your dialog.
+            session_id (str): unique identifier for the new session (a random one is created if `None`)
+
+        Returns:
+            The identifier of the new session
+        """
+        session_id = session_id if session_id is not None else uuid.uuid4().hex
+        with self._control_lock:
+            assert session_id not in self._sessions, f"session {session_id} is already running"
+            if self._session_end_listener is None:
+                self._session_end_listener = Thread(target=self._session_end_listener_thread)
+                self._session_end_listener.start()
+            self._sessions[session_id] = threading.Event()
+            try:
+                self._start_dialog(start_signals, session_id)
+            except TimeoutError:
+                self._sessions.pop(session_id).set()
+                raise
+        return session_id
+
+    def end_session(self, session_id: str):
+        """ End a running session: stops all listeners for this session, calls `dialog_end` on the session's
+            service state and frees it. Blocks until all services acknowledged.
+
+        Args:
+            session_id (str): identifier of the session to end
+        """
+        with self._control_lock:
+            if session_id not in self._sessions:
+                return
+            self._stop_listeners(session_id)
+            self._sessions.pop(session_id).set()
+
+    def wait_for_session(self, session_id: str, timeout: float = None) -> bool:
+        """ Block until the given session ended.
+
+        Args:
+            session_id (str): identifier of the session to wait for
+            timeout (float): maximum time to wait in seconds (`None`: wait forever)
+
+        Returns:
+            True, if the session ended - False, if the timeout expired before
+        """
+        ended = self._sessions.get(session_id)
+        if ended is None:
+            return True
+        return ended.wait(timeout)
+
+    def list_sessions(self) -> List[str]:
+        """ Returns the identifiers of all currently running sessions """
+        return list(self._sessions.keys())
 
     def run_dialog(self, start_signals: dict = {Topic.DIALOG_END: False}):
         """ Run a complete dialog (blocking).
@@ -852,7 +1352,7 @@ class DialogSystem:
                                             Publishes the value given for each topic to the respective topic.
                                             Use this to trigger the start of your dialog system.
         """
-        self._start_dialog(start_signals)
+        self._start_dialog(start_signals, warm=self._warm_restart)
         self._end_dialog()
 
     def list_published_topics(self):
@@ -903,6 +1403,7 @@ class DialogSystem:
             services = services.union(service_set)
         for service_set in self._sub_topics.values():
             services = services.union(service_set)
+        connections = self._list_topic_connections()
         errors, warnings = self.list_inconsistencies()
 
         # add services as nodes
@@ -915,9 +1416,9 @@ class DialogSystem:
             g.node('UNCONNECTED SERVICES', style='filled', color='#922b21', fontcolor='white', shape='box')
 
         # draw connections from publisher to subscribers as edges
-        for topic in self._pub_topics:
+        for topic, sub_topics in connections.items():
             publishers = self._pub_topics[topic]
-            receivers = self._sub_topics[topic] if topic in self._sub_topics else []
+            receivers = set().union(*[self._sub_topics[sub_topic] for sub_topic in sub_topics])
             for receiver in receivers:
                 for publisher in publishers:
                     g.edge(publisher, receiver, label=topic)
@@ -951,29 +1452,22 @@ class DialogSystem:
             * Even if there are no errors returned by this method, there is not guarantee that all publishers 
             eventually publish to their respective topics.
         """
-        # look for subscribers w/o publishers by checking topic prefixes
-        errors = {}
-        for sub_topic in self._sub_topics:
-            found_pub = False
-            for pub_topic in self._pub_topics:
-                if pub_topic.startswith(sub_topic):
-                    found_pub = True
-                    break
-            if not found_pub:
-                errors[sub_topic] = self._sub_topics[sub_topic]
-        # look for publishers w/o subscribers by checking topic prefixes
-        warnings = {}
-        for pub_topic in self._pub_topics:
-            found_sub = False
-            for sub_topic in self._sub_topics:
-                if pub_topic.startswith(sub_topic):
-                    found_sub = True
-                    break
-            if not found_sub:
-                warnings[pub_topic] = self._pub_topics[pub_topic]
+        connections = self._list_topic_connections()
+        # look for subscribers w/o publishers
+        connected_sub_topics = set().union(*connections.values())
+        errors = {sub_topic: self._sub_topics[sub_topic] for sub_topic in self._sub_topics
+                  if sub_topic not in connected_sub_topics}
+        # look for publishers w/o subscribers
+        warnings = {pub_topic: self._pub_topics[pub_topic] for pub_topic in self._pub_topics
+                    if not connections[pub_topic]}
 
         return errors, warnings
 
+    def _list_topic_connections(self) -> Dict[str, List[str]]:
+        """ Maps each published topic to all subscribed topics receiving its messages (prefix matching) """
+        router = TopicRouter({sub_topic: sub_topic for sub_topic in self._sub_topics})
+        return {pub_topic: [sub_topic for _, sub_topic in router.match(pub_topic)] for pub_topic in self._pub_topics}
+
     def print_inconsistencies(self):
         """ Checks for potential errors in the current messaging pipleline:
         e.g. len(list_local_inconsistencies()[0]) == 0 -> error free pipeline and prints them 
@@ -104,6 +104,8 @@ class PolicyEvaluator(Service):
 
     """
 
+    session_attributes = ('dialog_reward', 'dialog_turns')
+
     def __init__(self, domain: Domain, subgraph: dict = None, use_tensorboard=False,
                  experiment_name: str = '', turn_reward=-1, success_reward=20,
                  logger: DiasysLogger = DiasysLogger(), summary_writer=None):
@@ -0,0 +1,193 @@
+############################################################################################
+#
+# Copyright 2020, University of Stuttgart: Institute for Natural Language Processing (IMS)
+#
+# This file is part of Adviser.
+# Adviser is free software: you can redistribute it and/or modify'
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3.
+#
+# Adviser is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Adviser.  If not, see <https://www.gnu.org/licenses/>.
+#
+############################################################################################
+
+
+""" This module provides the structured tracing of service calls and published messages.
+
+    Pass a `Tracer` to the `services.service.DialogSystem` to record a `CallTrace` for every call of a
+    `services.service.PublishSubscribe` decorated function of the local services and a `PublishTrace` for every
+    published message. Traces can be exported as Chrome trace / Perfetto JSON (open with `chrome://tracing` or
+    https://ui.perfetto.dev) or aggregated into p50 / p95 / p99 tables per service function.
+"""
+
+import json
+import os
+import threading
+from collections import deque
+from typing import Dict, List, NamedTuple, Tuple
+
+import numpy as np
+
+
+class CallTrace(NamedTuple):
+    """ Trace of one call of a subscriber function. All times are POSIX timestamps in seconds. """
+    service: str
+    function: str
+    session_id: str
+    turn: int  # number of previous calls of the function in the dialog (the turn for functions called once per turn)
+    inputs: Dict[str, Tuple[float, float]]  # subscribed topic -> (publish time, receive time) of its (newest) value
+    start: float
+    end: float
+
+    @property
+    def duration(self) -> float:
+        """ Time spent in the function """
+        return self.end - self.start
+
+    @property
+    def wait(self) -> float:
+        """ Time from publishing the newest input until the function was called (delivery and queueing) """
+        return self.start - max(published for published, _ in self.inputs.values())
+
+    @property
+    def delivery(self) -> float:
+        """ Maximum time from publishing an input until it was received by the subscriber """
+        return max(received - published for published, received in self.inputs.values())
+
+
+class PublishTrace(NamedTuple):
+    """ Trace of one published message """
+    service: str
+    topic: str
+    session_id: str
+    timestamp: float
+    size: int  # size of the encoded message in bytes (None if the transport doesn't serialize messages)
+
+
+class Tracer:
+    """ Collects the traces of service calls and published messages (thread-safe).
+        Only the newest `max_traces` traces of each kind are kept.
+
+        Note: only services running in the process of the `DialogSystem` are traced.
+    """
+
+    def __init__(self, max_traces: int = 100000):
+        """
+        Args:
+            max_traces (int): maximum number of kept call traces and publish traces
+        """
+        self._calls = deque(maxlen=max_traces)
+        self._publishes = deque(maxlen=max_traces)
+        self._lock = threading.Lock()
+
+    def record_call(self, trace: CallTrace):
+        """ Adds the trace of a subscriber function call """
+        with self._lock:
+            self._calls.append(trace)
+
+    def record_publish(self, trace: PublishTrace):
+        """ Adds the trace of a published message """
+        with self._lock:
+            self._publishes.append(trace)
+
+    def get_calls(self) -> List[CallTrace]:
+        """ Returns all kept call traces (ordered by completion) """
+        with self._lock:
+            return list(self._calls)
+
+    def get_publishes(self) -> List[PublishTrace]:
+        """ Returns all kept publish traces (ordered by time) """
+        with self._lock:
+            return list(self._publishes)
+
+    def clear(self):
+        """ Removes all traces """
+        with self._lock:
+            self._calls.clear()
+            self._publishes.clear()
+
+    def to_chrome_trace(self) -> dict:
+        """ Returns all traces in the Chrome trace event format (also read by Perfetto).
+            Each service gets a track with its function calls and a track with the time its inputs were waiting,
+            published messages are instant events on the publishing service's track.
+        """
+        pid = os.getpid()
+        tids = {}  # track name -> thread id
+        events = []
+
+        def tid(track: str) -> int:
+            if track not in tids:
+                tids[track] = len(tids) + 1
+                events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tids[track],
+                               "args": {"name": track}})
+            return tids[track]
+
+        for call in self.get_calls():
+            args = {"session": call.session_id, "turn": call.turn, "topics": sorted(call.inputs),
+                    "wait_ms": call.wait * 1000, "delivery_ms": call.delivery * 1000}
+            events.append({"name": call.function, "cat": call.service, "ph": "X", "pid": pid,
+                           "tid": tid(call.service), "ts": call.start * 1e6, "dur": call.duration * 1e6,
+                           "args": args})
+            events.append({"name": f"{call.function} (waiting)", "cat": call.service, "ph": "X", "pid": pid,
+                           "tid": tid(f"{call.service} (queue)"), "ts": (call.start - call.wait) * 1e6,
+                           "dur": call.wait * 1e6, "args": args})
+        for publish in self.get_publishes():
+            events.append({"name": publish.topic, "cat": publish.service, "ph": "i", "s": "t", "pid": pid,
+                           "tid": tid(publish.service), "ts": publish.timestamp * 1e6,
+                           "args": {"session": publish.session_id, "size": publish.size}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: str):
+        """ Writes all traces to a Chrome trace / Perfetto JSON file """
+        with open(path, "w") as trace_file:
+            json.dump(self.to_chrome_trace(), trace_file)
+
+    def summary(self, percentiles: Tuple[int] = (50, 95, 99)) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """ Aggregates the traces per service function (calls) and per service and topic (published messages).
+
+        Args:
+            percentiles (Tuple[int]): percentiles to compute
+
+        Returns:
+            mapping of `service.function` / `service -> topic` -> metric -> `count` and `p<percentile>`
+            for the metrics `duration`, `wait`, `delivery` (in milliseconds) and `size` (in bytes)
+        """
+        metrics = {}  # row -> metric -> values
+
+        def add(row: str, metric: str, value: float):
+            metrics.setdefault(row, {}).setdefault(metric, []).append(value)
+
+        for call in self.get_calls():
+            row = f"{call.service}.{call.function}"
+            add(row, "duration", call.duration * 1000)
+            add(row, "wait", call.wait * 1000)
+            add(row, "delivery", call.delivery * 1000)
+        for publish in self.get_publishes():
+            if publish.size is not None:
+                add(f"{publish.service} -> {publish.topic}", "size", publish.size)
+
+        summary = {}
+        for row, row_metrics in metrics.items():
+            summary[row] = {}
+            for metric, values in row_metrics.items():
+                summary[row][metric] = {"count": len(values)}
+                for percentile, value in zip(percentiles, np.percentile(values, percentiles)):
+                    summary[row][metric][f"p{percentile}"] = float(value)
+        return summary
+
+    def format_summary(self, percentiles: Tuple[int] = (50, 95, 99)) -> str:
+        """ Returns the aggregated traces (see `summary`) as a table """
+        header = f"{'function / published topic':<48}{'metric':>10}{'count':>8}" + \
+                 "".join(f"{'p' + str(percentile):>10}" for percentile in percentiles)
+        lines = [header, "-" * len(header)]
+        for row, row_metrics in sorted(self.summary(percentiles).items()):
+            for metric, values in row_metrics.items():
+                lines.append(f"{row:<48}{metric:>10}{values['count']:>8}" +
+                             "".join(f"{values['p' + str(percentile)]:>10.2f}" for percentile in percentiles))
+        return "\n".join(lines)
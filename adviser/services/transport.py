@@ -0,0 +1,331 @@
+############################################################################################
+#
+# Copyright 2020, University of Stuttgart: Institute for Natural Language Processing (IMS)
+#
+# This file is part of Adviser.
+# Adviser is free software: you can redistribute it and/or modify'
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3.
+#
+# Adviser is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Adviser.  If not, see <https://www.gnu.org/licenses/>.
+#
+############################################################################################
+
+""" This module provides the message transports connecting services and dialog systems.
+
+    A transport creates publisher and subscriber channels. Publishers send `(topic, message)` pairs,
+    subscribers receive all messages whose topic starts with one of their subscribed topics (prefix matching).
+    Messages are `(timestamp, session_id, content)` tuples.
+"""
+
+import copy
+import queue
+import threading
+from typing import Any, Container, Dict, Iterable, List, Optional, Tuple, Union
+
+import zmq
+from zmq import Context
+from zmq.devices import ProcessProxy
+
+from services.codecs import Codec, get_codec
+from utils.domain.domain import Domain
+
+
+class Transport:
+    """ Abstract base class for message transports. """
+
+    def start(self):
+        """ Starts the message broker (called once by the `DialogSystem`). """
+        pass
+
+    def publisher(self, hwm: int = None):
+        """ Returns a new publisher channel with a `send(topic, message)` method.
+        `send` returns the size of the encoded message in bytes (None if the transport doesn't serialize messages).
+
+        Args:
+            hwm (int): maximum number of messages buffered for each (slow) subscriber, newer messages are dropped
+                       (None: transport default)
+        """
+        raise NotImplementedError
+
+    def subscriber(self, topics: Iterable[str] = ()):
+        """ Returns a new subscriber channel with `subscribe(topic)`, `recv()`, `recv_if(topics)`, `poll(timeout)`
+        and `close()` methods.
+        Channels are multiplexed by the executors in `services.executor`.
+
+        Args:
+            topics (Iterable[str]): topic prefixes to subscribe to
+        """
+        raise NotImplementedError
+
+    def is_remote_capable(self) -> bool:
+        """ Returns True, if services on other nodes can connect to this transport """
+        return False
+
+
+class _ZMQPublisher:
+    def __init__(self, socket: zmq.Socket, transport: 'ZMQTransport'):
+        self.socket = socket
+        self.transport = transport
+
+    def send(self, topic: str, message: Tuple[float, str, Any]) -> int:
+        codec = self.transport.get_codec(topic)
+        data = codec.encode(message)
+        self.socket.send_multipart((bytes(topic, encoding="ascii"), codec.name_bytes, data))
+        return len(data)
+
+    def close(self):
+        self.socket.close()
+
+
+class _ZMQSubscriber:
+    def __init__(self, socket: zmq.Socket, transport: 'ZMQTransport'):
+        self.socket = socket
+        self.transport = transport
+
+    def subscribe(self, topic: str):
+        self.socket.setsockopt(zmq.SUBSCRIBE, bytes(topic, encoding="ascii"))
+
+    def recv(self) -> Tuple[str, Tuple[float, str, Any]]:
+        return self.decode(self.socket.recv_multipart(copy=True))
+
+    def recv_if(self, topics: Container[str]) -> Optional[Tuple[str, Tuple[float, str, Any]]]:
+        """ Receives the next message, returns None (without decoding it) if its topic is not in `topics` """
+        frames = self.socket.recv_multipart(copy=True)
+        if frames[0].decode("ascii") not in topics:
+            return None
+        return self.decode(frames)
+
+    def decode(self, frames: List[bytes]) -> Tuple[str, Tuple[float, str, Any]]:
+        """ Decodes the frames of a message received from the socket """
+        topic, codec_name, data = frames
+        codec = self.transport.decoders.get(codec_name)
+        if codec is None:
+            raise ValueError(f"received message for topic {topic} encoded with codec {codec_name}, "
+                             f"which is not accepted by this transport")
+        return topic.decode("ascii"), codec.decode(data)
+
+    def poll(self, timeout: int = None) -> bool:
+        """ Waits at most `timeout` milliseconds for a message, returns True if one is available """
+        return self.socket.poll(timeout=timeout) != 0
+
+    def close(self):
+        self.socket.close()
+
+
+class ZMQTransport(Transport):
+    """ Transport sending encoded messages over a zmq XSUB/XPUB proxy.
+        Required for services running on other nodes or in other processes (see `services.service.RemoteService`).
+
+        Messages are encoded by the codec configured for their topic (see `services.codecs`).
+        Received messages are only decoded if their codec is configured for this transport, too.
+    """
+
+    def __init__(self, host_addr: str = "127.0.0.1", sub_port: int = 65533, pub_port: int = 65534,
+                 protocol: str = "tcp", codecs: Dict[str, Union[str, Codec]] = None,
+                 default_codec: Union[str, Codec] = 'pickle', domains: Iterable[Domain] = ()):
+        """
+        Args:
+            host_addr (str): IP-address of the node running the proxy (the `DialogSystem`)
+            sub_port (int): subscriber port following zmq's XSUB/XPUB pattern
+            pub_port (int): publisher port following zmq's XSUB/XPUB pattern
+            protocol (string): communication protocol, possible options: `tcp`, `inproc`, `ipc`
+            codecs (Dict[str, Union[str, Codec]]): mapping of topic (prefixes) to the codec (name) used for
+                                                   publishing messages of these topics, e.g. `{'beliefstate': 'compact'}`
+            default_codec (Union[str, Codec]): codec (name) used for all other topics
+            domains (Iterable[Domain]): domains used by the codecs to restore received belief states
+        """
+        self.host_addr = host_addr
+        self.sub_port = sub_port
+        self.pub_port = pub_port
+        self.protocol = protocol
+        self._proxy_dev = None
+
+        domains = list(domains)
+        self.default_codec = get_codec(default_codec, domains)
+        self.codecs = {topic: get_codec(codec, domains) for topic, codec in (codecs or {}).items()}
+        # only messages encoded with one of the configured codecs are decoded
+        self.decoders = {codec.name_bytes: codec for codec in [self.default_codec] + list(self.codecs.values())}
+        self._topic_codecs = {}  # cache: topic -> codec
+
+    def get_codec(self, topic: str) -> Codec:
+        """ Returns the codec configured for the longest matching topic prefix (or the default codec) """
+        codec = self._topic_codecs.get(topic)
+        if codec is None:
+            codec = self.default_codec
+            longest_prefix = ""
+            for prefix, prefix_codec in self.codecs.items():
+                if topic.startswith(prefix) and len(prefix) > len(longest_prefix):
+                    codec, longest_prefix = prefix_codec, prefix
+            self._topic_codecs[topic] = codec
+        return codec
+
+    def start(self):
+        self._proxy_dev = ProcessProxy(in_type=zmq.XSUB, out_type=zmq.XPUB)  # , mon_type=zmq.XSUB)
+        self._proxy_dev.bind_in(f"{self.protocol}://127.0.0.1:{self.pub_port}")
+        self._proxy_dev.bind_out(f"{self.protocol}://127.0.0.1:{self.sub_port}")
+        self._proxy_dev.start()
+        self._wait_for_proxy()
+
+    def _wait_for_proxy(self):
+        """ Blocks until messages pass through the proxy (it is bound in another process).
+            Otherwise, sockets connecting before the proxy is bound wait for zmq's reconnect interval. """
+        topic = f"{type(self).__name__}/{id(self)}/PROXY_READY"
+        pub_socket = Context.instance().socket(zmq.PUB)
+        sub_socket = Context.instance().socket(zmq.SUB)
+        for socket in (pub_socket, sub_socket):
+            socket.setsockopt(zmq.RECONNECT_IVL, 1)
+            socket.setsockopt(zmq.LINGER, 0)
+        sub_socket.setsockopt(zmq.SUBSCRIBE, bytes(topic, encoding="ascii"))
+        pub_socket.connect(f"{self.protocol}://{self.host_addr}:{self.pub_port}")
+        sub_socket.connect(f"{self.protocol}://{self.host_addr}:{self.sub_port}")
+        interval = 1
+        while True:
+            pub_socket.send(bytes(topic, encoding="ascii"))
+            if sub_socket.poll(timeout=interval):
+                break
+            interval = min(interval * 2, 100)
+        pub_socket.close()
+        sub_socket.close()
+
+    def publisher(self, hwm: int = None) -> _ZMQPublisher:
+        socket = Context.instance().socket(zmq.PUB)
+        socket.sndhwm = hwm if hwm is not None else 1100000
+        socket.connect(f"{self.protocol}://{self.host_addr}:{self.pub_port}")
+        return _ZMQPublisher(socket, self)
+
+    def subscriber(self, topics: Iterable[str] = ()) -> _ZMQSubscriber:
+        subscriber = _ZMQSubscriber(Context.instance().socket(zmq.SUB), self)
+        for topic in topics:
+            subscriber.subscribe(topic)
+        subscriber.socket.connect(f"{self.protocol}://{self.host_addr}:{self.sub_port}")
+        return subscriber
+
+    def is_remote_capable(self) -> bool:
+        return True
+
+
+class _LocalPublisher:
+    def __init__(self, transport: 'LocalTransport'):
+        self.transport = transport
+
+    def send(self, topic: str, message: Tuple[float, str, Any]):
+        self.transport._dispatch(topic, message)
+
+    def close(self):
+        pass
+
+
+class _LocalSubscriber:
+    def __init__(self, transport: 'LocalTransport'):
+        self.transport = transport
+        self.topics = set()
+        self._queue = queue.SimpleQueue()
+        self._pending = []
+        self._callback = None
+        self._callback_lock = threading.Lock()
+
+    def subscribe(self, topic: str):
+        self.transport._subscribe(self, topic)
+
+    def set_callback(self, callback):
+        """ Passes all (already and) future received messages to `callback(topic, message)` instead of queueing them """
+        with self._callback_lock:
+            while self._pending:
+                callback(*self._pending.pop())
+            while not self._queue.empty():
+                callback(*self._queue.get())
+            self._callback = callback
+
+    def _deliver(self, topic: str, message: Tuple[float, str, Any]):
+        if self._callback is None:
+            with self._callback_lock:
+                if self._callback is None:
+                    self._queue.put((topic, message))
+                    return
+        self._callback(topic, message)
+
+    def recv(self) -> Tuple[str, Tuple[float, str, Any]]:
+        if self._pending:
+            return self._pending.pop()
+        return self._queue.get()
+
+    def recv_if(self, topics: Container[str]) -> Optional[Tuple[str, Tuple[float, str, Any]]]:
+        """ Receives the next message, returns None if its topic is not in `topics` """
+        topic, message = self.recv()
+        return (topic, message) if topic in topics else None
+
+    def poll(self, timeout: int = None) -> bool:
+        """ Waits at most `timeout` milliseconds for a message, returns True if one is available """
+        if self._pending:
+            return True
+        try:
+            self._pending.append(self._queue.get(timeout=timeout / 1000.0 if timeout is not None else None))
+            return True
+        except queue.Empty:
+            return False
+
+    def close(self):
+        self.transport._unsubscribe(self)
+
+
+class LocalTransport(Transport):
+    """ Transport passing python objects between services of the same process through in-memory queues,
+        without any serialization.
+
+        Note: services on other nodes (`services.service.RemoteService`) can't connect to this transport.
+    """
+
+    def __init__(self, copy_on_publish: bool = True):
+        """
+        Args:
+            copy_on_publish (bool): If True, every subscriber receives its own deep copy of a message
+                                    (same isolation as serializing transports).
+                                    If False, all subscribers receive the published object itself - only use this if
+                                    your services never modify received or already published objects.
+        """
+        self.copy_on_publish = copy_on_publish
+        self._subscribers = []
+        self._routes: Dict[str, List[_LocalSubscriber]] = {}  # topic -> subscribers (prefix matches)
+        self._lock = threading.Lock()
+
+    def publisher(self, hwm: int = None) -> _LocalPublisher:
+        # messages are passed to the subscribers immediately, nothing is buffered on the publisher side
+        return _LocalPublisher(self)
+
+    def subscriber(self, topics: Iterable[str] = ()) -> _LocalSubscriber:
+        subscriber = _LocalSubscriber(self)
+        with self._lock:
+            self._subscribers.append(subscriber)
+        for topic in topics:
+            subscriber.subscribe(topic)
+        return subscriber
+
+    def _subscribe(self, subscriber: _LocalSubscriber, topic: str):
+        with self._lock:
+            subscriber.topics.add(topic)
+            self._routes = {}  # invalidate routing table
+
+    def _unsubscribe(self, subscriber: _LocalSubscriber):
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+            self._routes = {}  # invalidate routing table
+
+    def _dispatch(self, topic: str, message: Tuple[float, str, Any]):
+        """ Puts the message into the queue of each subscriber with a matching topic prefix """
+        routes = self._routes
+        receivers = routes.get(topic)
+        if receivers is None:
+            with self._lock:
+                receivers = [subscriber for subscriber in self._subscribers
+                             if any(topic.startswith(sub_topic) for sub_topic in subscriber.topics)]
+                self._routes[topic] = receivers
+        for receiver in receivers:
+            receiver._deliver(topic, copy.deepcopy(message) if self.copy_on_publish else message)
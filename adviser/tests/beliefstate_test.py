@@ -0,0 +1,75 @@
+import os
+import sys
+
+def get_root_dir():
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+sys.path.append(get_root_dir())
+from utils import UserActionType, UserAct
+from utils.beliefstate import BeliefState
+
+
+def test_new_turn_does_not_change_history(beliefstate, constraintA):
+    """
+    Tests whether modifying the current turn leaves the previous turns unchanged.
+
+    Args:
+        beliefstate: BeliefState object (given in conftest.py)
+        constraintA (dict): an existing slot-value pair in the domain (given in
+        conftest_<domain>.py)
+    """
+    beliefstate['informs'][constraintA['slot']] = {constraintA['value']: 1.0}
+    beliefstate.start_new_turn()
+    beliefstate['informs'][constraintA['slot']][constraintA['value']] = 0.5
+    beliefstate['user_acts'].add(UserActionType.Inform)
+    assert beliefstate[-2]['informs'][constraintA['slot']][constraintA['value']] == 1.0
+    assert not beliefstate[-2]['user_acts']
+
+
+def test_replica_follows_deltas(bst, constraintA, constraintA_alt, constraintB):
+    """
+    Tests whether a replica updated with the published deltas has the same history as the original
+    belief state, also if the original belief state is replaced.
+
+    Args:
+        bst: BST Object (given in conftest.py)
+        constraintA (dict): an existing slot-value pair in the domain (given in
+        conftest_<domain>.py)
+        constraintA_alt (dict): an existing slot-value pair with the same slot as constraintA
+        (given in conftest_<domain>.py)
+        constraintB (dict): an existing slot-value pair in the domain (given in
+        conftest_<domain>.py)
+    """
+    replica = BeliefState(bst.domain)
+    turns = [[UserAct(act_type=UserActionType.Inform, slot=constraintA['slot'], value=constraintA['value'])],
+             [UserAct(act_type=UserActionType.Request, slot=constraintB['slot'])],
+             [UserAct(act_type=UserActionType.Inform, slot=constraintA_alt['slot'],
+                      value=constraintA_alt['value'])],
+             [UserAct(act_type=UserActionType.Thanks)]]
+    for _ in range(2):
+        bst.dialog_start()
+        num_sent = 0
+        for user_acts in turns:
+            bst.update_bst(user_acts)
+            replica.apply_delta(bst.bs.get_delta(num_sent))
+            num_sent = len(bst.bs)
+            assert replica._history == bst.bs._history
+
+
+def test_fork_copies_current_turn(beliefstate, constraintA):
+    """
+    Tests whether modifying a forked belief state doesn't change the original one.
+
+    Args:
+        beliefstate: BeliefState object (given in conftest.py)
+        constraintA (dict): an existing slot-value pair in the domain (given in
+        conftest_<domain>.py)
+    """
+    beliefstate.start_new_turn()
+    fork = beliefstate.fork()
+    fork['informs'][constraintA['slot']] = {constraintA['value']: 1.0}
+    fork['user_acts'].add(UserActionType.Inform)
+    assert constraintA['slot'] not in beliefstate['informs']
+    assert not beliefstate['user_acts']
+    assert fork.is_first_turn()
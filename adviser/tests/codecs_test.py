@@ -0,0 +1,110 @@
+import os
+import sys
+
+import pytest
+
+def get_root_dir():
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+sys.path.append(get_root_dir())
+from services.codecs import CompactCodec, MsgpackCodec, PickleCodec, msgpack
+from utils import UserActionType, UserAct, SysAct, SysActionType
+
+
+def get_codecs(domain):
+    codecs = [PickleCodec([domain]), CompactCodec([domain])]
+    if msgpack is not None:
+        codecs.append(MsgpackCodec([domain]))
+    return codecs
+
+
+def test_encode_dialog_acts(domain, constraintA):
+    """
+    Tests whether user and system acts are restored after encoding and decoding them.
+
+    Args:
+        domain: Domain object (given in conftest.py)
+        constraintA (dict): an existing slot-value pair in the domain (given in
+        conftest_<domain>.py)
+    """
+    user_acts = [UserAct(text="hi", act_type=UserActionType.Hello),
+                 UserAct(act_type=UserActionType.Inform, slot=constraintA['slot'], value=constraintA['value'],
+                         score=0.5)]
+    sys_act = SysAct(act_type=SysActionType.Request, slot_values={constraintA['slot']: []})
+    message = (1.5, 'session', {'user_acts': user_acts, 'sys_act': sys_act})
+    for codec in get_codecs(domain):
+        timestamp, session_id, content = codec.decode(codec.encode(message))
+        assert (timestamp, session_id) == (1.5, 'session')
+        assert content['user_acts'] == user_acts
+        assert content['user_acts'][0].text == "hi"
+        assert content['sys_act'] == sys_act
+
+
+def test_encode_beliefstate(domain, beliefstate, constraintA):
+    """
+    Tests whether a belief state (including its history and domain) is restored after encoding and decoding it.
+
+    Args:
+        domain: Domain object (given in conftest.py)
+        beliefstate: BeliefState object (given in conftest.py)
+        constraintA (dict): an existing slot-value pair in the domain (given in
+        conftest_<domain>.py)
+    """
+    beliefstate.start_new_turn()
+    beliefstate['user_acts'].add(UserActionType.Inform)
+    beliefstate['informs'][constraintA['slot']] = {constraintA['value']: 1.0}
+    beliefstate['num_matches'] = 3
+    for codec in get_codecs(domain):
+        decoded = codec.decode(codec.encode(beliefstate))
+        assert decoded.domain.get_domain_name() == domain.get_domain_name()
+        assert decoded._history == beliefstate._history
+        assert decoded.is_first_turn()
+
+
+def test_compact_codec_rejects_unknown_types(domain):
+    """
+    Tests whether the compact codec refuses to encode objects it has no schema for.
+
+    Args:
+        domain: Domain object (given in conftest.py)
+    """
+    with pytest.raises(TypeError):
+        CompactCodec([domain]).encode(object())
+
+
+def test_compact_codec_rejects_untrusted_messages(domain, beliefstate):
+    """
+    Tests whether the compact codec refuses to decode belief states of domains it wasn't given and
+    messages nested too deeply, instead of loading the domain or exceeding the recursion limit.
+
+    Args:
+        domain: Domain object (given in conftest.py)
+        beliefstate: BeliefState object (given in conftest.py)
+    """
+    data = CompactCodec([domain]).encode(beliefstate)
+    with pytest.raises(ValueError):
+        CompactCodec().decode(data)
+    nested_lists = bytes([CompactCodec._LIST, 1]) * 100000 + bytes([CompactCodec._NONE])
+    with pytest.raises(ValueError):
+        CompactCodec([domain]).decode(nested_lists)
+
+
+@pytest.mark.skipif(msgpack is None, reason="requires the msgpack package")
+def test_msgpack_codec_rejects_untrusted_messages(domain, beliefstate):
+    """
+    Tests whether the msgpack codec refuses to decode belief states of domains it wasn't given and
+    extension types nested too deeply.
+
+    Args:
+        domain: Domain object (given in conftest.py)
+        beliefstate: BeliefState object (given in conftest.py)
+    """
+    data = MsgpackCodec([domain]).encode(beliefstate)
+    with pytest.raises(ValueError):
+        MsgpackCodec().decode(data)
+    nested_tuples = msgpack.packb(None)
+    for _ in range(MsgpackCodec.MAX_EXT_DEPTH + 1):
+        nested_tuples = msgpack.packb(msgpack.ExtType(MsgpackCodec._TUPLE, nested_tuples))
+    with pytest.raises(ValueError):
+        MsgpackCodec([domain]).decode(nested_tuples)
@@ -0,0 +1,55 @@
+import os
+import sys
+
+def get_root_dir():
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.append(get_root_dir())
+import pytest
+from utils.domain.columnarlookupdomain import ColumnarLookupDomain
+
+
+@pytest.fixture
+def columnar_domain(domain):
+    """ Columnar domain of the same database as the domain given in conftest.py """
+    return ColumnarLookupDomain(domain.get_domain_name())
+
+
+def test_find_entities(columnar_domain, domain, constraintA):
+    """
+    Tests whether the columnar domain finds the same entities as the sqlite domain.
+
+    Args:
+        columnar_domain: ColumnarLookupDomain object
+        domain: Domain object (given in conftest.py)
+        constraintA (dict): an existing slot-value pair in the domain (given in
+        conftest_<domain>.py)
+    """
+    assert columnar_domain.find_entities({}) == domain.find_entities({})
+    constraints = {constraintA['slot']: constraintA['value'].upper(), 'other_slot': 'dontcare'}
+    entities = columnar_domain.find_entities(constraints)
+    assert len(entities) > 0
+    assert entities == domain.find_entities(constraints)
+    entity_id = entities[0][domain.get_primary_key()]
+    assert columnar_domain.find_info_about_entity(entity_id, []) == domain.find_info_about_entity(entity_id, [])
+    assert columnar_domain.find_info_about_entity('no entity', []) == []
+
+
+def test_count_entities(columnar_domain, domain, constraintA):
+    """
+    Tests whether the columnar domain counts the matching entities and their values.
+
+    Args:
+        columnar_domain: ColumnarLookupDomain object
+        domain: Domain object (given in conftest.py)
+        constraintA (dict): an existing slot-value pair in the domain (given in
+        conftest_<domain>.py)
+    """
+    constraints = {constraintA['slot']: constraintA['value']}
+    entities = domain.find_entities(constraints)
+    assert columnar_domain.count_entities(constraints) == len(entities)
+    assert columnar_domain.count_entities({}) == len(domain.find_entities({}))
+    assert columnar_domain.count_entities({constraintA['slot']: 'no value'}) == 0
+    slot = domain.get_primary_key()
+    value_counts = columnar_domain.distinct_value_counts(constraints, [slot])
+    assert value_counts == {slot: {entity[slot]: 1 for entity in entities}}
@@ -0,0 +1,128 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+import requests
+
+def get_root_dir():
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+sys.path.append(get_root_dir())
+from examples.qa.worldknowledge.domain import WorldKnowledgeDomain
+from tools.httpstub import StubServer
+from utils.domain.httpclient import HTTPClient
+
+
+class Counter(object):
+    """ Route answering with the number of requests so far """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, params: dict):
+        self.count += 1
+        return {'count': self.count, 'params': params}
+
+
+def test_http_client_coalesces_and_caches():
+    """
+    Tests whether identical requests sent at the same time are answered by one request to the server,
+    whether the response is cached and whether all requests use the same connection.
+    """
+    with StubServer({'/count': Counter()}, latency=0.2) as server:
+        client = HTTPClient(ttl=60)
+        responses = []
+        threads = [threading.Thread(target=lambda: responses.append(client.get(server.url + '/count',
+                                                                               params={'q': 'a'})))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert [response['count'] for response in responses] == [1] * 4
+        assert client.get(server.url + '/count', params={'q': 'a'})['count'] == 1
+        assert client.get(server.url + '/count', params={'q': 'b'}) == {'count': 2, 'params': {'q': 'b'}}
+        info = client.get_cache_info()
+        assert (info.misses, info.coalesced, info.hits, info.size) == (2, 3, 1, 2)
+        assert server.requests['/count'] == 2
+        assert server.connections == 1
+        client.close()
+
+
+def test_http_client_returns_own_responses():
+    """
+    Tests whether changing a response doesn't change the cached response or the responses of
+    coalesced requests.
+    """
+    with StubServer({'/count': Counter()}, latency=0.2) as server:
+        client = HTTPClient(ttl=60)
+        responses = []
+        threads = [threading.Thread(target=lambda: responses.append(client.get(server.url + '/count')))
+                   for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert responses[0] == responses[1] and responses[0] is not responses[1]
+        responses[0]['count'] = 10
+        responses[1]['params']['q'] = 'changed'
+        assert client.get(server.url + '/count') == {'count': 1, 'params': {}}
+        assert server.requests['/count'] == 1
+        client.close()
+
+
+def test_http_client_stale_while_revalidate():
+    """
+    Tests whether an expired response is returned while it is fetched again in the background.
+    """
+    with StubServer({'/count': Counter()}) as server:
+        client = HTTPClient(ttl=0.5, stale_ttl=60)
+        assert client.get(server.url + '/count')['count'] == 1
+        time.sleep(0.6)
+        assert client.get(server.url + '/count')['count'] == 1
+        deadline = time.monotonic() + 5
+        count = 1
+        while count == 1 and time.monotonic() < deadline:
+            time.sleep(0.05)
+            count = client.get(server.url + '/count')['count']
+        assert count == 2
+        assert client.get_cache_info().stale_hits >= 1
+        client.close()
+
+
+def test_http_client_errors_are_not_cached():
+    """
+    Tests whether failed requests raise an error every time they are sent.
+    """
+    with StubServer({}) as server:
+        client = HTTPClient()
+        for _ in range(2):
+            with pytest.raises(requests.HTTPError):
+                client.get(server.url + '/missing')
+        assert server.requests['/missing'] == 2
+        client.close()
+
+
+class LexiconDomain(WorldKnowledgeDomain):
+    def _init_name_lexicon(self):
+        return {'paris': [{'id': f'Q{idx}', 'label': f'Paris {idx}'} for idx in range(4)]}
+
+
+def test_world_knowledge_queries_topics_concurrently():
+    """
+    Tests whether the world knowledge domain queries all topic entities of a question at the same time.
+    """
+    bindings = {'results': {'bindings': [{'itemLabel': {'value': 'France'}}]}}
+    with StubServer({'/sparql': lambda params: bindings}, latency=0.3) as server:
+        client = HTTPClient()
+        domain = LexiconDomain(sparql_url=server.url + '/sparql', client=client)
+        start = time.perf_counter()
+        answers = domain.find_entities({'relation': 'P17', 'topic': 'paris', 'direction': 'out'})
+        assert time.perf_counter() - start < 4 * 0.3
+        assert [answer['subject'] for answer in answers] == [f'Paris {idx}' for idx in range(4)]
+        assert all(answer['object'] == 'France' for answer in answers)
+        assert server.requests['/sparql'] == 4
+        client.close()
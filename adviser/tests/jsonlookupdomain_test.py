@@ -1,4 +1,6 @@
 import os
+import sqlite3
+import threading
 import sys
 import argparse
 
@@ -7,6 +9,7 @@ def get_root_dir():
 
 sys.path.append(get_root_dir())
 import pytest
+from utils.domain import Domain
 from utils.domain.jsonlookupdomain import JSONLookupDomain
 
 
@@ -41,3 +44,167 @@ def test_query_db(load_supehero_domain : JSONLookupDomain):
     # print(entities[0])
 
 
+
+
+def test_domains_share_database_copy(domain):
+    """
+    Tests whether all domains of a database query the same in-memory copy, which can't be modified.
+
+    Args:
+        domain: Domain object (given in conftest.py)
+    """
+    other_domain = JSONLookupDomain(domain.get_domain_name())
+    assert other_domain.db is not domain.db
+    query_str = f"SELECT * FROM {domain.get_domain_name()}"
+    assert other_domain.query_db(query_str) == domain.query_db(query_str)
+    with pytest.raises(sqlite3.OperationalError):
+        domain.query_db(f"DELETE FROM {domain.get_domain_name()}")
+    assert len(other_domain.query_db(query_str)) > 0
+
+
+def test_memory_mapped_database(domain):
+    """
+    Tests whether a domain reading the memory mapped database file finds the same entities.
+
+    Args:
+        domain: Domain object (given in conftest.py)
+    """
+    mapped_domain = JSONLookupDomain(domain.get_domain_name(), in_memory=False)
+    assert mapped_domain.find_entities({}) == domain.find_entities({})
+
+
+def test_query_cache(domain, constraintA):
+    """
+    Tests whether repeated queries are answered from the result cache with fresh rows and whether
+    quotes in constraint values are passed as query parameters.
+
+    Args:
+        domain: Domain object (given in conftest.py)
+        constraintA (dict): an existing slot-value pair in the domain (given in
+        conftest_<domain>.py)
+    """
+    cached_domain = JSONLookupDomain(domain.get_domain_name(), cache_size=2)
+    constraints = {constraintA['slot']: constraintA['value']}
+    entities = cached_domain.find_entities(constraints)
+    assert len(entities) > 0
+    entities[0].clear()
+    assert cached_domain.find_entities(dict(constraints, other='dontcare')) == domain.find_entities(constraints)
+    info = cached_domain.get_cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+    assert cached_domain.find_entities({constraintA['slot']: "it's"}) == []
+    entity_id = domain.find_entities(constraints)[0][domain.get_primary_key()]
+    assert cached_domain.find_info_about_entity(entity_id, [domain.get_primary_key()]) == \
+        [{domain.get_primary_key(): entity_id}]
+    assert cached_domain.get_cache_info().currsize == 2
+    cached_domain.invalidate_cache()
+    assert cached_domain.get_cache_info().currsize == 0
+
+
+def test_informable_slot_indexes(domain, constraintA):
+    """
+    Tests whether constraints on informable slots search an index instead of scanning the table.
+
+    Args:
+        domain: Domain object (given in conftest.py)
+        constraintA (dict): an existing slot-value pair in the domain (given in
+        conftest_<domain>.py)
+    """
+    indexed_domain = JSONLookupDomain(domain.get_domain_name(), indexes='covering')
+    entities = indexed_domain.find_entities({constraintA['slot']: constraintA['value'].upper()})
+    assert entities == domain.find_entities({constraintA['slot']: constraintA['value']})
+    indexed_domain.find_entities({})
+    plans = indexed_domain.get_query_plans()
+    assert len(plans) == 2
+    full_scans = indexed_domain.get_query_plans(full_scans_only=True)
+    assert list(full_scans) == [query_str for query_str in plans if 'WHERE' not in query_str]
+    with pytest.raises(ValueError):
+        JSONLookupDomain(domain.get_domain_name(), indexes='all')
+
+
+def test_aggregate_queries(domain, constraintA):
+    """
+    Tests whether counting the matching entities and their values with SQL gives the same results
+    as counting the entities found.
+
+    Args:
+        domain: Domain object (given in conftest.py)
+        constraintA (dict): an existing slot-value pair in the domain (given in
+        conftest_<domain>.py)
+    """
+    constraints = {constraintA['slot']: constraintA['value']}
+    entities = domain.find_entities(constraints)
+    assert domain.count_entities(constraints) == len(entities)
+    assert domain.count_entities({}) == len(domain.find_entities({}))
+    slots = domain.get_system_requestable_slots()
+    assert domain.distinct_value_counts(constraints, slots) == \
+        Domain.distinct_value_counts(domain, constraints, slots)
+
+
+def test_compiled_ontology(domain):
+    """
+    Tests whether the ontology accessors return the slots and values of the ontology as tuples
+    and whether the value index tables point to all positions of the values.
+
+    Args:
+        domain: Domain object (given in conftest.py)
+    """
+    informable = domain.ontology_json['informable']
+    assert domain.get_informable_slots() == tuple(informable)
+    assert domain.get_requestable_slots() == tuple(domain.ontology_json['requestable'])
+    assert domain.get_system_requestable_slots() is domain.get_system_requestable_slots()
+    for slot, values in informable.items():
+        assert domain.get_possible_values(slot) == tuple(values)
+        value_indices = domain.get_value_indices(slot)
+        assert sorted(idx for indices in value_indices.values() for idx in indices) == list(range(len(values)))
+        assert all(values[idx] == value for value, indices in value_indices.items() for idx in indices)
+        assert (slot in domain.get_binary_slots()) == (len(values) == 2)
+
+
+def test_value_indices_of_repeated_values(domain):
+    """
+    Tests whether a value listed twice in the ontology has both of its positions in the value index table.
+
+    Args:
+        domain: Domain object (given in conftest.py)
+    """
+    slot = domain.get_informable_slots()[0]
+    values = list(domain.ontology_json['informable'][slot])
+    domain.ontology_json['informable'][slot] = values + [values[0]]
+    domain._compile_ontology()
+    assert domain.get_value_indices(slot)[values[0]] == (0, len(values))
+
+
+def test_concurrent_queries(domain, constraintA):
+    """
+    Tests whether threads querying the same domain at the same time use their own connections
+    and find the same entities.
+
+    Args:
+        domain: Domain object (given in conftest.py)
+        constraintA (dict): an existing slot-value pair in the domain (given in
+        conftest_<domain>.py)
+    """
+    threaded_domain = JSONLookupDomain(domain.get_domain_name(), cache_size=0)
+    constraints = {constraintA['slot']: constraintA['value']}
+    expected = domain.find_entities(constraints)
+    connections, errors = set(), []
+    start = threading.Barrier(8)
+
+    def query():
+        try:
+            start.wait()
+            for _ in range(50):
+                assert threaded_domain.find_entities(constraints) == expected
+                assert threaded_domain.count_entities(constraints) == len(expected)
+            connections.add(threaded_domain.db)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=query) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert len(connections) == 8
+    assert threaded_domain.db not in connections
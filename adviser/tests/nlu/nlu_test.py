@@ -12,6 +12,8 @@ sys.path.append(get_root_dir())
 from utils.useract import UserActionType, UserAct
 from utils.domain.jsonlookupdomain import JSONLookupDomain
 from services.nlu.nlu import HandcraftedNLU
+from services.nlu.artifact import CompiledRules
+from services.nlu.regexmatcher import RegexMatcher, required_literals
 from utils.common import Language
 from utils.sysact import SysAct, SysActionType
 
@@ -173,6 +175,145 @@ def test_check(nlu):
 
 
 
+def test_regex_matcher(nlu):
+	"""
+
+	Tests if the compiled rules match the same user utterances as searching the rule strings
+
+	Args:
+		nlu: NlU Object (given in conftest.py)
+
+	"""
+	for user_utterance in ["Hi", "I dont care", "who is batman", "is there a hero in green", "thanks, bye"]:
+		assert nlu.general_matcher.match(user_utterance) == [
+			act for act, regex in nlu.general_regex.items() if re.search(regex, user_utterance, re.I)]
+		assert nlu.request_matcher.match(user_utterance) == [
+			slot for slot in nlu.USER_REQUESTABLE
+			if nlu._check(re.search(nlu.request_regex[slot], user_utterance, re.I))]
+		assert nlu.inform_matcher.match(user_utterance) == [
+			(slot, value) for slot in nlu.USER_INFORMABLE for value, regex in nlu.inform_regex[slot].items()
+			if nlu._check(re.search(regex, user_utterance, re.I))]
+
+
+def test_regex_matcher_prefilter():
+	"""
+
+	Tests if the required literals of the rules are found and if the prefilter skips only rules which can't match
+
+	"""
+	assert required_literals(r"(\b(the )?(hero|villain)s?\b)", re.I) == {'hero', 'villain'}
+	assert required_literals(r"\b(green|red|[a-z]+ish)\b", re.I) == {'green', 'red', 'ish'}
+	assert required_literals(r"\b(green|red|\w+)\b", re.I) is None
+	rules = {'green': r"\b(green)\b", 'nlp': r"\b(nlp|natural language processing)\b", 'any': r"(\w+ color)"}
+	matcher = RegexMatcher(rules)
+	assert matcher.get_num_candidates("I like red") == 0
+	assert matcher.get_num_candidates("a green color") == 2
+	assert matcher.match("Natural Language Proce\u017fsing in GREEN color") == ['green', 'nlp', 'any']
+	assert matcher.match("no match") == []
+
+
+def test_compiled_rules_artifact(nlu, tmp_path):
+	"""
+
+	Tests if the compiled rules are loaded from their artifact and if the artifact is ignored once a source changed
+
+	Args:
+		nlu: NlU Object (given in conftest.py)
+		tmp_path: temporary folder (given by pytest)
+
+	"""
+	source = tmp_path / 'source.nlu'
+	source.write_text('template')
+	artifact_file = str(tmp_path / 'rules.pickle')
+	rules = CompiledRules(nlu.general_regex, nlu.request_regex, nlu.inform_regex, nlu.USER_REQUESTABLE,
+						  nlu.USER_INFORMABLE)
+	rules.save(artifact_file, str(tmp_path), ['source.nlu'])
+	loaded = CompiledRules.load(artifact_file, str(tmp_path))
+	assert loaded.matches_slots(nlu.USER_REQUESTABLE, nlu.USER_INFORMABLE)
+	assert not loaded.matches_slots(nlu.USER_REQUESTABLE[:-1], nlu.USER_INFORMABLE)
+	for user_utterance in ["who is batman", "is there a hero in green", "I dont care"]:
+		assert loaded.inform_matcher.match(user_utterance) == nlu.inform_matcher.match(user_utterance)
+		assert loaded.general_matcher.match(user_utterance) == nlu.general_matcher.match(user_utterance)
+	source.write_text('changed template')
+	assert CompiledRules.load(artifact_file, str(tmp_path)) is None
+	assert CompiledRules.load(str(tmp_path / 'missing.pickle'), str(tmp_path)) is None
+
+
+def test_parse_batch(nlu):
+	"""
+
+	Tests if a batch of utterances is parsed like single turns after the given system acts, without changing the
+	dialog state of the NLU, also in several processes
+
+	Args:
+		nlu: NlU Object (given in conftest.py)
+
+	"""
+	request = SysAct(act_type=SysActionType.Request, slot_values={"primary_uniform_color": []})
+	utterances = ["I dont care", "I dont care", "yes", "what is their real name", "thanks, bye"]
+	sys_acts = [request, None, request, None, request]
+	expected = []
+	for user_utterance, sys_act in zip(utterances, sys_acts):
+		nlu.dialog_start()
+		nlu.sys_act_info['last_act'] = sys_act
+		expected.append(nlu.extract_user_acts(nlu, user_utterance=user_utterance)['user_acts'])
+	nlu.dialog_start()
+	nlu.sys_act_info['last_act'] = request
+	user_acts = nlu.parse_batch(utterances, sys_acts)
+	assert user_acts == expected
+	assert user_acts[0] != user_acts[1]
+	assert nlu.user_acts == [] and nlu.sys_act_info['last_act'] is request
+	assert nlu.parse_batch(utterances, sys_acts, num_workers=2) == expected
+	with pytest.raises(ValueError):
+		nlu.parse_batch(utterances, sys_acts[1:])
+
+
+def test_parse_batch_during_dialog(nlu):
+	"""
+
+	Tests if a dialog turn handled while a batch is parsed neither sees nor changes the state of the batch
+
+	Args:
+		nlu: NlU Object (given in conftest.py)
+
+	"""
+	request = SysAct(act_type=SysActionType.Request, slot_values={"primary_uniform_color": []})
+	nlu.dialog_start()
+	nlu.sys_act_info['last_act'] = request
+	expected_turn = nlu.extract_user_acts(nlu, user_utterance="I dont care")['user_acts']
+	expected_batch = nlu.parse_batch(["I dont care"])
+	assert expected_turn != expected_batch[0]
+	turns = []
+
+	class TurnDuringParsing(str):
+		def strip(self):
+			# the dialog's turn is handled while the batch parses this utterance
+			turns.append(nlu.extract_user_acts(nlu, user_utterance="I dont care")['user_acts'])
+			return str.strip(self)
+
+	nlu.dialog_start()
+	nlu.sys_act_info['last_act'] = request
+	assert nlu.parse_batch([TurnDuringParsing("I dont care")]) == expected_batch
+	assert turns == [expected_turn]
+	assert nlu.user_acts == expected_turn and nlu.sys_act_info['last_act'] is request
+
+
+def test_batch_worker_factory(nlu):
+	"""
+
+	Tests if the worker processes of parse_batch create their NLU with the constructor arguments of the NLU
+
+	Args:
+		nlu: NlU Object (given in conftest.py)
+
+	"""
+	worker_nlu = nlu._batch_worker_factory()()
+	assert type(worker_nlu) is type(nlu)
+	assert worker_nlu.domain is nlu.domain
+	assert worker_nlu.logger is nlu.logger
+	assert worker_nlu.language == nlu.language
+
+
 def test_assigned_score(nlu):
 	"""
 
@@ -8,6 +8,9 @@ def get_root_dir():
 
 sys.path.append(get_root_dir())
 from utils import SysAct, SysActionType, UserActionType
+from utils.beliefstate import BeliefState
+from utils.domain.jsonlookupdomain import JSONLookupDomain
+from services.policy import HandcraftedPolicy
 
 
 def execute_choose_sys_act(policy, beliefstate):
@@ -664,10 +667,10 @@ def test_gen_next_request_with_non_binary_slots(policy, beliefstate):
     system_requestable = [slot for slot in policy.domain.get_system_requestable_slots() if
                           len(policy.domain.get_possible_values(slot)) != 2]
     if system_requestable:
-        temp = {system_requestable[0]: ['foo', 'bar']}
-        temp.update({slot: ['foo'] for slot in system_requestable[1:]})
+        value_counts = {system_requestable[0]: {'foo': 1, 'bar': 1}}
+        value_counts.update({slot: {'foo': 1} for slot in system_requestable[1:]})
         beliefstate['informs'] = {}
-        slot = policy._gen_next_request(temp, beliefstate)
+        slot = policy._gen_next_request(value_counts, beliefstate)
         assert slot != ""
         assert slot == system_requestable[0]
 
@@ -682,10 +685,10 @@ def test_gen_next_request_with_non_binary_slot_with_one_value(policy, beliefstat
         beliefstate: BeliefState object (given in conftest.py)
     """
     system_requestable = policy.domain.get_system_requestable_slots()
-    temp = {slot: ['foo'] if len(policy.domain.get_possible_values(slot)) != 2  else []
-            for slot in system_requestable}
+    value_counts = {slot: {'foo': 1} if len(policy.domain.get_possible_values(slot)) != 2 else {}
+                    for slot in system_requestable}
     beliefstate['informs'] = {}
-    slot = policy._gen_next_request(temp, beliefstate)
+    slot = policy._gen_next_request(value_counts, beliefstate)
     assert slot == ""
 
 
@@ -704,10 +707,10 @@ def test_gen_next_request_with_binary_slots(policy, beliefstate):
     if binary_slots:
         bin_slot = binary_slots[0]
         val1, val2 = policy.domain.get_possible_values(bin_slot)
-        temp = {bin_slot: [val1] * 3 + [val2] * 4}
-        temp.update({slot: [] for slot in system_requestable if slot != bin_slot})
+        value_counts = {bin_slot: {val1: 3, val2: 4}}
+        value_counts.update({slot: {} for slot in system_requestable if slot != bin_slot})
         beliefstate['informs'] = {}
-        slot = policy._gen_next_request(temp, beliefstate)
+        slot = policy._gen_next_request(value_counts, beliefstate)
         assert slot != ""
         assert slot == bin_slot
 
@@ -728,12 +731,12 @@ def test_highest_info_gain_with_difference_between_slots(policy, constraint_bina
     if constraint_binaryA and constraint_binaryB:
         val1A, val2A = policy.domain.get_possible_values(constraint_binaryA['slot'])
         val1B, val2B = policy.domain.get_possible_values(constraint_binaryB['slot'])
-        temp = {
-            constraint_binaryA['slot']: [val1A] * 3 + [val2A] * 4,
-            constraint_binaryB['slot']: [val1B] + [val2B] * 5
+        value_counts = {
+            constraint_binaryA['slot']: {val1A: 3, val2A: 4},
+            constraint_binaryB['slot']: {val1B: 1, val2B: 5}
         }
         bin_slots = [constraint_binaryA['slot'], constraint_binaryB['slot']]
-        slot = policy._highest_info_gain(bin_slots, temp)
+        slot = policy._highest_info_gain(bin_slots, value_counts)
         assert slot != ""
         assert slot == constraint_binaryA['slot']
 
@@ -752,12 +755,12 @@ constraint_binaryB):
         only two possible values (given in conftest_<domain>.py)
     """
     if constraint_binaryA and constraint_binaryB:
-        temp = {
-            constraint_binaryA['slot']: [constraint_binaryA['value']] * 3 ,
-            constraint_binaryB['slot']: [constraint_binaryB['value']]
+        value_counts = {
+            constraint_binaryA['slot']: {constraint_binaryA['value']: 3},
+            constraint_binaryB['slot']: {constraint_binaryB['value']: 1}
         }
         bin_slots = [constraint_binaryA['slot'], constraint_binaryB['slot']]
-        slot = policy._highest_info_gain(bin_slots, temp)
+        slot = policy._highest_info_gain(bin_slots, value_counts)
         assert slot == ""
 
 
@@ -991,4 +994,82 @@ def test_convert_inform_by_constraints_without_results(policy, beliefstate):
     sys_act = SysAct()
     policy._convert_inform_by_constraints([], sys_act, beliefstate)
     assert sys_act.type == SysActionType.InformByName
-    assert 'none' in sys_act.slot_values[primkey]
\ No newline at end of file
+    assert 'none' in sys_act.slot_values[primkey]
+
+def test_find_candidates_refines_previous_candidates(policy, beliefstate, constraintA, constraint_binaryA):
+    """
+    Tests whether the candidates for added constraints are filtered from the candidates of the
+    previous turn and whether relaxed constraints query the database again.
+
+    Args:
+        policy: Policy Object (given in conftest.py)
+        beliefstate: BeliefState object (given in conftest.py)
+        constraintA (dict): an existing slot-value pair in the domain (given in
+        conftest_<domain>.py)
+        constraint_binaryA (dict): an existing slot-value pair in the domain for a slot with only
+        two possible values (given in conftest_<domain>.py)
+    """
+    policy.dialog_start()
+    primary_key = policy.domain.get_primary_key()
+    constraints = {constraintA['slot']: constraintA['value']}
+    candidates = policy._find_candidates(dict(constraints), beliefstate)
+    assert policy.candidates[0] == constraints
+    if constraint_binaryA:
+        constraints[constraint_binaryA['slot']] = constraint_binaryA['value']
+    refined = policy._find_candidates(dict(constraints), beliefstate)
+    assert [entity[primary_key] for entity in refined] == \
+        [entity[primary_key] for entity in policy.domain.find_entities(constraints)]
+    assert len(refined) <= len(candidates)
+    relaxed = policy._find_candidates({}, beliefstate)
+    assert len(relaxed) == policy.domain.count_entities({})
+
+
+def test_find_candidates_informs_requestable_slots():
+    """
+    Tests whether the candidates only contain the primary key and the system requestable slots
+    (although all informable slots are cached for refining them), so that an inform by primary
+    key names the same slots as for the results of the domain.
+    """
+    domain = JSONLookupDomain('ImsCourses')
+    policy = HandcraftedPolicy(domain)
+    policy.dialog_start()
+    beliefstate = BeliefState(domain)
+    candidates = policy._find_candidates({'turn': 'sose'}, beliefstate)
+    assert candidates == domain.find_entities({'turn': 'sose'})
+    sys_act = SysAct()
+    policy._convert_inform_by_primkey(candidates, sys_act, beliefstate)
+    assert list(sys_act.slot_values) == ['applied_nlp', 'bachelor', 'ects', 'lang', 'name']
+
+
+def test_highest_info_gain_over_all_slots(policy, beliefstate):
+    """
+    Tests whether the slot whose values split the results most evenly is requested if binary slots
+    aren't asked about last.
+
+    Args:
+        policy: Policy Object (given in conftest.py)
+        beliefstate: BeliefState object (given in conftest.py)
+    """
+    system_requestable = policy.domain.get_system_requestable_slots()
+    if len(system_requestable) > 1:
+        value_counts = {slot: {'foo': 9, 'bar': 1} for slot in system_requestable}
+        value_counts[system_requestable[-1]] = {'foo': 4, 'bar': 3, 'baz': 3}
+        beliefstate['informs'] = {}
+        policy.prefer_non_binary = False
+        assert policy._gen_next_request(value_counts, beliefstate) == system_requestable[-1]
+        assert policy._highest_info_gain(system_requestable[:-1], value_counts) == system_requestable[0]
+
+
+def test_highest_info_gain_ignores_missing_values(policy):
+    """
+    Tests whether results without a value (None) for a slot don't add to the information gain of
+    asking about the slot.
+
+    Args:
+        policy: Policy Object (given in conftest.py)
+    """
+    system_requestable = policy.domain.get_system_requestable_slots()
+    if len(system_requestable) > 1:
+        slot_a, slot_b = system_requestable[:2]
+        value_counts = {slot_a: {'true': 6, 'false': 4}, slot_b: {'true': 9, 'false': 1, None: 10}}
+        assert policy._highest_info_gain([slot_b, slot_a], value_counts) == slot_a
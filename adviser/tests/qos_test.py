@@ -0,0 +1,76 @@
+import os
+import sys
+
+def get_root_dir():
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+sys.path.append(get_root_dir())
+from services.qos import DropPolicy, QoS
+
+
+def test_put_unbounded():
+    """
+    Tests whether a queue without maximum length keeps all values.
+    """
+    values, timestamps = [], []
+    qos = QoS()
+    dropped = sum(qos.put(values, timestamps, value, float(value)) for value in range(10))
+    assert dropped == 0
+    assert values == list(range(10))
+    assert timestamps == [float(value) for value in range(10)]
+
+
+def test_put_drop_oldest():
+    """
+    Tests whether a full queue drops its oldest value for a received one.
+    """
+    values, timestamps = [], []
+    qos = QoS(max_queue=3, policy=DropPolicy.DROP_OLDEST)
+    dropped = sum(qos.put(values, timestamps, value, float(value)) for value in range(5))
+    assert dropped == 2
+    assert values == [2, 3, 4]
+    assert timestamps == [2.0, 3.0, 4.0]
+
+
+def test_put_drop_newest():
+    """
+    Tests whether a full queue drops received values.
+    """
+    values, timestamps = [], []
+    qos = QoS(max_queue=3, policy=DropPolicy.DROP_NEWEST)
+    dropped = sum(qos.put(values, timestamps, value, float(value)) for value in range(5))
+    assert dropped == 2
+    assert values == [0, 1, 2]
+
+
+def test_put_coalesce():
+    """
+    Tests whether a full queue merges received values into its newest value.
+    """
+    values, timestamps = [], []
+    qos = QoS(max_queue=2, policy=DropPolicy.COALESCE, merge=lambda queued, received: queued + received)
+    dropped = sum(qos.put(values, timestamps, value, float(value)) for value in range(5))
+    assert dropped == 3
+    assert values == [0, 1 + 2 + 3 + 4]
+    assert timestamps == [0.0, 4.0]
+
+
+def test_put_max_queue_override():
+    """
+    Tests whether a single value is kept if the maximum queue length is overridden (as for sub_topics).
+    """
+    values, timestamps = [0], [0.0]
+    assert QoS(max_queue=10).put(values, timestamps, 1, 1.0, max_queue=1) == 1
+    assert values == [1]
+
+
+def test_sample():
+    """
+    Tests whether messages following the previously accepted message too early are rejected.
+    """
+    qos = QoS(sample_rate=10)
+    assert qos.sample(1.0, None)
+    assert not qos.sample(1.05, 1.0)
+    assert qos.sample(1.1, 1.0)
+    assert QoS().sample(1.0, 1.0)
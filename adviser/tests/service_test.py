@@ -0,0 +1,277 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+def get_root_dir():
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+sys.path.append(get_root_dir())
+from services.bst import HandcraftedBST
+from services.policy import HandcraftedPolicy
+from services.executor import PooledExecutor
+from services.qos import QoS
+from services.service import DialogSystem, PublishSubscribe, Service
+from services.simulator.simulator import HandcraftedUserSimulator
+from services.stats.evaluation import PolicyEvaluator
+from services.tracing import Tracer
+from services.transport import LocalTransport
+from utils import UserActionType, UserAct
+from utils.logger import DiasysLogger, LogLevel
+
+
+def test_session_state_is_separated(bst, constraintA):
+    """
+    Tests whether changes to the session attributes in one session don't affect other sessions
+    or the single-dialog state of the service.
+
+    Args:
+        bst: BST Object (given in conftest.py)
+        constraintA (dict): an existing slot-value pair in the domain (given in
+        conftest_<domain>.py)
+    """
+    outer_bs = bst.bs
+    bst._start_session('a')
+    bst._start_session('b')
+    user_acts = [UserAct(act_type=UserActionType.Inform, slot=constraintA['slot'],
+                         value=constraintA['value'])]
+    with bst.session_scope('a'):
+        bst.update_bst(user_acts)
+        assert constraintA['slot'] in bst.bs['informs']
+    with bst.session_scope('b'):
+        assert constraintA['slot'] not in bst.bs['informs']
+    assert bst.bs is outer_bs
+    assert constraintA['slot'] not in bst.bs['informs']
+
+
+def test_end_session_frees_state(bst):
+    """
+    Tests whether ending a session removes its state from the service.
+
+    Args:
+        bst: BST Object (given in conftest.py)
+    """
+    bst._start_session('a')
+    bst._end_session('a')
+    assert 'a' not in bst._sessions
+
+
+def test_concurrent_sessions(domain):
+    """
+    Tests whether a dialog system runs several simulated dialogs at the same time.
+
+    Args:
+        domain: Domain object (given in conftest.py)
+    """
+    logger = DiasysLogger(console_log_lvl=LogLevel.NONE)
+    evaluator = PolicyEvaluator(domain=domain, logger=logger)
+    services = [HandcraftedUserSimulator(domain, logger=logger), HandcraftedBST(domain=domain),
+                HandcraftedPolicy(domain=domain, logger=logger), evaluator]
+    ds = DialogSystem(services=services, sub_port=65523, pub_port=65524)
+    try:
+        start_signals = {f'user_acts/{domain.get_domain_name()}': []}
+        sessions = [ds.start_session(start_signals) for _ in range(4)]
+        for session in sessions:
+            assert ds.wait_for_session(session, timeout=30)
+        assert not ds.list_sessions()
+        assert len(evaluator.eval_rewards) == 4
+        assert all(service._sessions == {} for service in services)
+    finally:
+        ds.shutdown()
+
+
+def test_local_transport(domain):
+    """
+    Tests whether a dialog system using the in-process transport runs simulated dialogs.
+
+    Args:
+        domain: Domain object (given in conftest.py)
+    """
+    logger = DiasysLogger(console_log_lvl=LogLevel.NONE)
+    evaluator = PolicyEvaluator(domain=domain, logger=logger)
+    ds = DialogSystem(services=[HandcraftedUserSimulator(domain, logger=logger), HandcraftedBST(domain=domain),
+                                HandcraftedPolicy(domain=domain, logger=logger), evaluator],
+                      transport=LocalTransport())
+    try:
+        start_signals = {f'user_acts/{domain.get_domain_name()}': []}
+        for _ in range(2):
+            ds.run_dialog(start_signals)
+        session = ds.start_session(start_signals)
+        assert ds.wait_for_session(session, timeout=30)
+        assert len(evaluator.eval_rewards) == 3
+    finally:
+        ds.shutdown()
+
+
+def test_pooled_executor(domain):
+    """
+    Tests whether a dialog system multiplexing all service listeners on a small worker pool
+    runs several simulated dialogs at the same time.
+
+    Args:
+        domain: Domain object (given in conftest.py)
+    """
+    logger = DiasysLogger(console_log_lvl=LogLevel.NONE)
+    evaluator = PolicyEvaluator(domain=domain, logger=logger)
+    ds = DialogSystem(services=[HandcraftedUserSimulator(domain, logger=logger), HandcraftedBST(domain=domain),
+                                HandcraftedPolicy(domain=domain, logger=logger), evaluator],
+                      transport=LocalTransport(), executor=PooledExecutor(num_workers=2))
+    try:
+        start_signals = {f'user_acts/{domain.get_domain_name()}': []}
+        ds.run_dialog(start_signals)
+        sessions = [ds.start_session(start_signals) for _ in range(4)]
+        for session in sessions:
+            assert ds.wait_for_session(session, timeout=30)
+        assert len(evaluator.eval_rewards) == 5
+    finally:
+        ds.shutdown()
+
+
+def test_warm_restart(domain):
+    """
+    Tests whether a dialog system keeping the service listeners listening between dialogs runs simulated dialogs.
+
+    Args:
+        domain: Domain object (given in conftest.py)
+    """
+    logger = DiasysLogger(console_log_lvl=LogLevel.NONE)
+    evaluator = PolicyEvaluator(domain=domain, logger=logger)
+    ds = DialogSystem(services=[HandcraftedUserSimulator(domain, logger=logger), HandcraftedBST(domain=domain),
+                                HandcraftedPolicy(domain=domain, logger=logger), evaluator],
+                      transport=LocalTransport(), warm_restart=True)
+    try:
+        start_signals = {f'user_acts/{domain.get_domain_name()}': []}
+        for _ in range(3):
+            ds.run_dialog(start_signals)
+        assert len(evaluator.eval_rewards) == 3
+    finally:
+        ds.shutdown()
+
+
+class SlowStartService(Service):
+    def dialog_start(self):
+        time.sleep(0.5)
+
+
+def test_control_timeout_reports_stragglers(domain):
+    """
+    Tests whether services not acknowledging the start of a dialog in time are reported.
+
+    Args:
+        domain: Domain object (given in conftest.py)
+    """
+    ds = DialogSystem(services=[HandcraftedBST(domain=domain), SlowStartService(domain=domain)],
+                      transport=LocalTransport(), control_timeout=0.1)
+    try:
+        with pytest.raises(TimeoutError, match='SlowStartService') as error:
+            ds.start_session()
+        assert 'HandcraftedBST' not in str(error.value)
+        assert not ds.list_sessions()
+    finally:
+        time.sleep(0.5)
+        ds.shutdown()
+
+
+class FrameProducer(Service):
+    @PublishSubscribe(pub_topics=['frame', 'trigger'])
+    def produce(self, frame=None, trigger=None):
+        return {'frame': frame} if trigger is None else {'trigger': trigger}
+
+
+class FrameConsumer(Service):
+    def __init__(self):
+        Service.__init__(self)
+        self.received = None
+        self.called = threading.Event()
+
+    @PublishSubscribe(sub_topics=['trigger'], queued_sub_topics=['frame'], qos={'frame': QoS(max_queue=3)})
+    def consume(self, trigger, frame):
+        self.received = frame
+        self.called.set()
+
+
+def test_qos_bounds_queued_topic():
+    """
+    Tests whether a subscriber keeps only the newest values of a queued topic with a maximum queue length
+    and counts the dropped values.
+    """
+    producer, consumer = FrameProducer(), FrameConsumer()
+    ds = DialogSystem(services=[producer, consumer], transport=LocalTransport())
+    try:
+        ds._start_dialog({})
+        for frame in range(10):
+            producer.produce(frame=frame)
+        producer.produce(trigger=True)
+        assert consumer.called.wait(timeout=10)
+        assert consumer.received == [7, 8, 9]
+        assert consumer.get_drop_counts() == {'consume': {'frame': 7}}
+        ds._stop_listeners()
+    finally:
+        ds.shutdown()
+
+
+def test_tracing(domain):
+    """
+    Tests whether the calls of all subscriber functions and all published messages of a dialog are traced.
+
+    Args:
+        domain: Domain object (given in conftest.py)
+    """
+    logger = DiasysLogger(console_log_lvl=LogLevel.NONE)
+    tracer = Tracer()
+    ds = DialogSystem(services=[HandcraftedUserSimulator(domain, logger=logger), HandcraftedBST(domain=domain),
+                                HandcraftedPolicy(domain=domain, logger=logger),
+                                PolicyEvaluator(domain=domain, logger=logger)],
+                      transport=LocalTransport(), tracer=tracer)
+    try:
+        ds.run_dialog({f'user_acts/{domain.get_domain_name()}': []})
+    finally:
+        ds.shutdown()
+    calls = tracer.get_calls()
+    bst_turns = [call.turn for call in calls if call.function == 'update_bst']
+    assert bst_turns == list(range(len(bst_turns)))
+    assert all(call.service == 'HandcraftedBST' for call in calls if call.function == 'update_bst')
+    assert all(call.start <= call.end for call in calls)
+    published_topics = {publish.topic for publish in tracer.get_publishes()}
+    assert f'beliefstate/{domain.get_domain_name()}' in published_topics
+    assert 'HandcraftedPolicy.choose_sys_act' in tracer.summary()
+
+
+def test_codecs_per_topic(domain):
+    """
+    Tests whether a dialog system runs simulated dialogs with compact encoded dialog acts and belief states.
+
+    Args:
+        domain: Domain object (given in conftest.py)
+    """
+    logger = DiasysLogger(console_log_lvl=LogLevel.NONE)
+    evaluator = PolicyEvaluator(domain=domain, logger=logger)
+    ds = DialogSystem(services=[HandcraftedUserSimulator(domain, logger=logger), HandcraftedBST(domain=domain),
+                                HandcraftedPolicy(domain=domain, logger=logger), evaluator],
+                      sub_port=65523, pub_port=65524,
+                      codecs={'user_acts': 'compact', 'sys_act': 'compact', 'beliefstate': 'compact'})
+    try:
+        ds.run_dialog({f'user_acts/{domain.get_domain_name()}': []})
+        assert len(evaluator.eval_rewards) == 1
+    finally:
+        ds.shutdown()
+
+
+def test_list_inconsistencies(domain):
+    """
+    Tests whether subscribed topics without publishers and published topics without subscribers are found.
+
+    Args:
+        domain: Domain object (given in conftest.py)
+    """
+    ds = DialogSystem(services=[HandcraftedBST(domain=domain), HandcraftedPolicy(domain=domain)],
+                      transport=LocalTransport())
+    try:
+        errors, warnings = ds.list_inconsistencies()
+        assert set(errors) == {'user_acts'}
+        assert set(warnings) == {'sys_act', 'sys_state'}
+    finally:
+        ds.shutdown()
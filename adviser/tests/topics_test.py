@@ -0,0 +1,32 @@
+import os
+import sys
+
+def get_root_dir():
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+sys.path.append(get_root_dir())
+from utils.topics import TopicRouter
+
+
+def test_router_finds_longest_prefix():
+    """
+    Tests whether the router maps topics to the value of their longest subscribed prefix.
+    """
+    router = TopicRouter({'sys_act': 'sys_act', 'sys_act_info': 'sys_act_info',
+                          'sys_act/superhero': 'superhero_sys_act'})
+    assert router.longest_match('sys_act/superhero') == ('sys_act/superhero', 'superhero_sys_act')
+    assert router.longest_match('sys_act/lecturers') == ('sys_act', 'sys_act')
+    assert router.longest_match('sys_act_info/superhero') == ('sys_act_info', 'sys_act_info')
+    assert router.longest_match('user_acts/superhero') is None
+
+
+def test_router_lists_all_prefixes():
+    """
+    Tests whether the router returns all matching prefixes (shortest first), also after adding new prefixes.
+    """
+    router = TopicRouter({'beliefstate': 1})
+    assert router.match('beliefstate/superhero') == (('beliefstate', 1),)
+    router.add('beliefstate/superhero', 2)
+    assert router.match('beliefstate/superhero') == (('beliefstate', 1), ('beliefstate/superhero', 2))
+    assert router.match('belief') == ()
@@ -0,0 +1,70 @@
+import json
+import os
+import sys
+
+def get_root_dir():
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+sys.path.append(get_root_dir())
+from services.tracing import CallTrace, PublishTrace, Tracer
+
+
+def create_tracer() -> Tracer:
+    """ Creates a tracer with 100 calls of one function (taking 1 to 100 ms) and one published message """
+    tracer = Tracer()
+    for turn in range(100):
+        start = 1000.0 + turn
+        tracer.record_call(CallTrace('Service', 'function', None, turn, {'topic': (start - 0.002, start - 0.001)},
+                                     start, start + (turn + 1) / 1000))
+    tracer.record_publish(PublishTrace('Service', 'topic/domain', None, 1000.0, 42))
+    return tracer
+
+
+def test_call_trace_metrics():
+    """
+    Tests whether the time spent in a function, waiting and delivering its inputs is derived from a call trace.
+    """
+    trace = CallTrace('Service', 'function', None, 0, {'a': (1.0, 1.5), 'b': (2.0, 2.25)}, 3.0, 3.5)
+    assert trace.duration == 0.5
+    assert trace.wait == 1.0
+    assert trace.delivery == 0.5
+
+
+def test_max_traces():
+    """
+    Tests whether only the newest traces are kept.
+    """
+    tracer = Tracer(max_traces=2)
+    for turn in range(3):
+        tracer.record_call(CallTrace('Service', 'function', None, turn, {'topic': (0.0, 0.0)}, 0.0, 1.0))
+    assert [call.turn for call in tracer.get_calls()] == [1, 2]
+
+
+def test_summary():
+    """
+    Tests whether the traces are aggregated per function and published topic.
+    """
+    summary = create_tracer().summary()
+    assert set(summary) == {'Service.function', 'Service -> topic/domain'}
+    duration = summary['Service.function']['duration']
+    assert duration['count'] == 100
+    assert abs(duration['p50'] - 50.5) < 1e-6
+    assert abs(duration['p99'] - 99.01) < 1e-6
+    assert summary['Service -> topic/domain']['size']['p95'] == 42
+
+
+def test_chrome_trace_export(tmp_path):
+    """
+    Tests whether the traces are exported as valid Chrome trace events.
+    """
+    path = os.path.join(str(tmp_path), 'trace.json')
+    create_tracer().export_chrome_trace(path)
+    with open(path) as trace_file:
+        events = json.load(trace_file)['traceEvents']
+    calls = [event for event in events if event['ph'] == 'X' and event['name'] == 'function']
+    assert len(calls) == 100
+    assert calls[0]['args']['turn'] == 0
+    assert abs(calls[0]['dur'] - 1000) < 1e-3
+    assert len([event for event in events if event['ph'] == 'i']) == 1
+    assert {event['args']['name'] for event in events if event['ph'] == 'M'} == {'Service', 'Service (queue)'}
@@ -0,0 +1,87 @@
+############################################################################################
+#
+# Copyright 2020, University of Stuttgart: Institute for Natural Language Processing (IMS)
+#
+# This file is part of Adviser.
+# Adviser is free software: you can redistribute it and/or modify'
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3.
+#
+# Adviser is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Adviser.  If not, see <https://www.gnu.org/licenses/>.
+#
+############################################################################################
+
+"""
+Compares the cost of publishing full belief states and belief state deltas depending on the dialog length:
+bytes and pickling time of the message sent by the BST in a turn.
+
+Usage (from the adviser folder):
+python tools/benchmarks/beliefstate_delta.py --turns 5 10 25 50 100
+"""
+
+import argparse
+import os
+import pickle
+import sys
+import time
+
+head_location = os.path.abspath(os.path.join(os.path.abspath(__file__), '..', '..', '..'))  # main folder of adviser
+sys.path.append(head_location)
+
+from services.bst import HandcraftedBST
+from utils import UserAct, UserActionType
+from utils.domain.jsonlookupdomain import JSONLookupDomain
+
+
+def measure(message, repetitions: int):
+    """ Returns the pickled size (bytes) and the pickling time (seconds) of a message """
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        data = pickle.dumps(message)
+    return len(data), (time.perf_counter() - start) / repetitions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-d", "--domain", default="ImsLecturers", help="name of the domain")
+    parser.add_argument("-t", "--turns", type=int, nargs='+', default=[5, 10, 25, 50, 100],
+                        help="dialog lengths to measure")
+    parser.add_argument("-r", "--repetitions", type=int, default=200, help="repetitions of each measurement")
+    args = parser.parse_args()
+
+    domain = JSONLookupDomain(args.domain)
+    bst = HandcraftedBST(domain=domain)
+    bst.dialog_start()
+    slots = list(domain.get_informable_slots())
+    values = {slot: domain.get_possible_values(slot) for slot in slots}
+
+    print(f"{'turns':>8}{'full bytes':>12}{'full us':>10}{'delta bytes':>13}{'delta us':>10}{'new turn us':>13}")
+    num_turns = 0
+    for target_turns in sorted(args.turns):
+        while num_turns < target_turns:
+            # alternate between informing about different slots and requesting them
+            slot = slots[num_turns % len(slots)]
+            if num_turns % 2 == 0:
+                value = values[slot][num_turns % len(values[slot])]
+                user_acts = [UserAct(act_type=UserActionType.Inform, slot=slot, value=value)]
+            else:
+                user_acts = [UserAct(act_type=UserActionType.Request, slot=slot)]
+            num_sent = len(bst.bs)
+            bst.update_bst(user_acts)
+            num_turns += 1
+        # the message published in the last turn
+        full_bytes, full_time = measure(bst.bs, args.repetitions)
+        delta_bytes, delta_time = measure(bst.bs.get_delta(num_sent), args.repetitions)
+        start = time.perf_counter()
+        for _ in range(args.repetitions):
+            bst.bs.start_new_turn()
+        new_turn_time = (time.perf_counter() - start) / args.repetitions
+        del bst.bs._history[-args.repetitions:]
+        print(f"{target_turns:>8}{full_bytes:>12}{1e6 * full_time:>10.1f}{delta_bytes:>13}{1e6 * delta_time:>10.1f}"
+              f"{1e6 * new_turn_time:>13.1f}")
@@ -0,0 +1,111 @@
+############################################################################################
+#
+# Copyright 2020, University of Stuttgart: Institute for Natural Language Processing (IMS)
+#
+# This file is part of Adviser.
+# Adviser is free software: you can redistribute it and/or modify'
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3.
+#
+# Adviser is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Adviser.  If not, see <https://www.gnu.org/licenses/>.
+#
+############################################################################################
+
+"""
+Measures the encoding / decoding time and the bytes on the wire per dialog turn of the message codecs
+(see `services.codecs`) for the messages of simulated dialogs (user acts, system acts and belief states).
+
+Usage (from the adviser folder):
+python tools/benchmarks/codec_cost.py --dialogs 100
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+
+head_location = os.path.abspath(os.path.join(os.path.abspath(__file__), '..', '..', '..'))  # main folder of adviser
+sys.path.append(head_location)
+
+from services.bst import HandcraftedBST
+from services.codecs import CompactCodec, MsgpackCodec, PickleCodec, msgpack
+from services.policy import HandcraftedPolicy
+from services.service import DialogSystem
+from services.simulator.simulator import HandcraftedUserSimulator
+from services.stats.evaluation import PolicyEvaluator
+from services.transport import LocalTransport
+from utils import common
+from utils.domain.jsonlookupdomain import JSONLookupDomain
+from utils.logger import DiasysLogger, LogLevel
+
+TOPICS = ('user_acts', 'sys_act', 'beliefstate')
+
+
+def record_messages(domain: JSONLookupDomain, num_dialogs: int):
+    """ Runs simulated dialogs and returns the published messages per topic and the number of turns """
+    common.init_random(0)
+    logger = DiasysLogger(console_log_lvl=LogLevel.NONE)
+    evaluator = PolicyEvaluator(domain=domain, logger=logger)
+    transport = LocalTransport()
+    recorder = transport.subscriber([f"{topic}/" for topic in TOPICS])
+    ds = DialogSystem(services=[HandcraftedUserSimulator(domain, logger=logger),
+                                HandcraftedBST(domain=domain),
+                                HandcraftedPolicy(domain=domain, logger=logger),
+                                evaluator],
+                      transport=transport)
+    for _ in range(num_dialogs):
+        ds.run_dialog({f'user_acts/{domain.get_domain_name()}': []})
+    ds.shutdown()
+
+    messages = defaultdict(list)
+    while recorder.poll(0):
+        topic, message = recorder.recv()
+        messages[topic.split('/')[0]].append(message)
+    return messages, sum(evaluator.eval_turns)
+
+
+def measure(codec, messages: list, repetitions: int):
+    """ Returns the encoding time, decoding time (seconds) and encoded size (bytes) of all messages """
+    encoded = [codec.encode(message) for message in messages]
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        for message in messages:
+            codec.encode(message)
+    encode_time = (time.perf_counter() - start) / repetitions
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        for data in encoded:
+            codec.decode(data)
+    decode_time = (time.perf_counter() - start) / repetitions
+    return encode_time, decode_time, sum(len(data) for data in encoded)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-d", "--domain", default="ImsLecturers", help="name of the domain")
+    parser.add_argument("-n", "--dialogs", type=int, default=100, help="number of simulated dialogs to record")
+    parser.add_argument("-r", "--repetitions", type=int, default=5, help="repetitions of each measurement")
+    args = parser.parse_args()
+
+    domain = JSONLookupDomain(args.domain)
+    messages, turns = record_messages(domain, args.dialogs)
+    codecs = [PickleCodec(), CompactCodec([domain])]
+    if msgpack is not None:
+        codecs.append(MsgpackCodec([domain]))
+    else:
+        print("msgpack is not installed, skipping MsgpackCodec")
+
+    print(f"{turns} turns, per turn:")
+    print(f"{'topic':<14}{'codec':<10}{'messages':>10}{'bytes':>10}{'encode us':>12}{'decode us':>12}")
+    for topic in TOPICS:
+        for codec in codecs:
+            encode_time, decode_time, size = measure(codec, messages[topic], args.repetitions)
+            print(f"{topic:<14}{codec.name:<10}{len(messages[topic]) / turns:>10.2f}{size / turns:>10.1f}"
+                  f"{1e6 * encode_time / turns:>12.2f}{1e6 * decode_time / turns:>12.2f}")
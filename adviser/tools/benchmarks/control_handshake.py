@@ -0,0 +1,125 @@
+###############################################################################
+#
+# Copyright 2020, University of Stuttgart: Institute for Natural Language Processing (IMS)
+#
+# This file is part of Adviser.
+# Adviser is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3.
+#
+# Adviser is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Adviser.  If not, see <https://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+"""
+Measures the per-dialog setup overhead of the dialog system control plane (start and end handshake with all services)
+depending on the number of services, and the throughput of short simulated dialogs.
+
+Modes:
+    * serial: the dialog system sends the control messages to one service after the other, waiting for each ACK
+    * parallel: the dialog system sends the control messages to all services at once and gathers their ACK's
+    * warm: parallel, service listeners keep listening between dialogs (`DialogSystem(warm_restart=True)`)
+
+Usage (from the adviser folder):
+python tools/benchmarks/control_handshake.py --services 0 8 16 --repeats 200
+"""
+
+import argparse
+import os
+import sys
+import time
+
+head_location = os.path.abspath(os.path.join(os.path.abspath(__file__), '..', '..', '..'))  # main folder of adviser
+sys.path.append(head_location)
+
+from services.bst import HandcraftedBST
+from services.policy import HandcraftedPolicy
+from services.service import DialogSystem, PublishSubscribe, Service, _send_msg, _recv_ack
+from services.simulator.simulator import HandcraftedUserSimulator
+from services.stats.evaluation import PolicyEvaluator
+from services.transport import LocalTransport, ZMQTransport
+from utils import common
+from utils.domain.jsonlookupdomain import JSONLookupDomain
+from utils.logger import DiasysLogger, LogLevel
+
+MODES = ('serial', 'parallel', 'warm')
+
+
+class IdleService(Service):
+    """ Service with two listeners never receiving any message (only takes part in the control handshakes) """
+
+    @PublishSubscribe(sub_topics=["idle_a"])
+    def listen_a(self, idle_a):
+        pass
+
+    @PublishSubscribe(sub_topics=["idle_b"])
+    def listen_b(self, idle_b):
+        pass
+
+
+def serial_handshake(ds: DialogSystem, topics):
+    """ Sends the control message to one service after the other (the dialog system's former behaviour) """
+    for topic in topics:
+        _send_msg(ds._control_channel_pub, topic, True)
+        _recv_ack(ds._control_channel_sub, topic)
+
+
+def measure_handshake(ds: DialogSystem, mode: str, repeats: int) -> float:
+    """ Returns the mean time (in ms) of a start and end handshake with all services """
+    start = time.perf_counter()
+    for _ in range(repeats):
+        if mode == 'serial':
+            serial_handshake(ds, ds._start_topics)
+            serial_handshake(ds, ds._end_topics)
+        else:
+            ds._start_dialog({}, warm=mode == 'warm')
+            ds._stop_listeners(warm=mode == 'warm')
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def measure_dialogs(ds: DialogSystem, domain: JSONLookupDomain, num_dialogs: int) -> float:
+    """ Returns the number of simulated dialogs per second """
+    start_signals = {f'user_acts/{domain.get_domain_name()}': []}
+    start = time.perf_counter()
+    for _ in range(num_dialogs):
+        ds.run_dialog(start_signals)
+    return num_dialogs / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-d", "--domain", default="superhero", help="name of the domain")
+    parser.add_argument("-s", "--services", type=int, nargs='+', default=[0, 8, 16],
+                        help="numbers of additional idle services")
+    parser.add_argument("-r", "--repeats", type=int, default=200, help="number of handshakes per measurement")
+    parser.add_argument("-n", "--dialogs", type=int, default=50, help="number of dialogs per measurement")
+    parser.add_argument("-t", "--transport", choices=['zmq', 'local'], default='zmq', help="message transport")
+    args = parser.parse_args()
+
+    common.init_random(0)
+    logger = DiasysLogger(console_log_lvl=LogLevel.NONE)
+    domain = JSONLookupDomain(args.domain)
+
+    print(f"{'services':>10}{'mode':>10}{'handshake ms':>14}{'dialogs/s':>12}")
+    run = 0
+    for num_idle in args.services:
+        for mode in MODES:
+            services = [HandcraftedUserSimulator(domain, logger=logger), HandcraftedBST(domain=domain),
+                        HandcraftedPolicy(domain=domain, logger=logger), PolicyEvaluator(domain=domain, logger=logger)]
+            services += [IdleService(domain=domain) for _ in range(num_idle)]
+            # every dialog system needs its own ports: the proxies of earlier runs live until the process exits
+            transport = ZMQTransport(sub_port=65533 - 2 * run, pub_port=65534 - 2 * run) \
+                if args.transport == 'zmq' else LocalTransport()
+            run += 1
+            ds = DialogSystem(services=services, transport=transport, warm_restart=mode == 'warm')
+            handshake_ms = measure_handshake(ds, mode, args.repeats)
+            # serial handshakes aren't used by dialogs anymore: only measure dialogs for the current modes
+            dialogs_per_second = measure_dialogs(ds, domain, args.dialogs) if mode != 'serial' else float('nan')
+            print(f"{len(services):>10}{mode:>10}{handshake_ms:>14.3f}{dialogs_per_second:>12.1f}")
+            ds.shutdown()
@@ -0,0 +1,101 @@
+############################################################################################
+#
+# Copyright 2020, University of Stuttgart: Institute for Natural Language Processing (IMS)
+#
+# This file is part of Adviser.
+# Adviser is free software: you can redistribute it and/or modify'
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3.
+#
+# Adviser is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Adviser.  If not, see <https://www.gnu.org/licenses/>.
+#
+############################################################################################
+
+
+"""
+Measures the query throughput of one `JSONLookupDomain` queried by several threads at the same time
+(like the services and sessions of a dialog system), depending on the number of threads:
+
+    * shared: all threads use the same connection (the former behaviour)
+    * memory: each thread opens its own connection to the in-memory copy of the database (`in_memory=True`)
+    * mmap: each thread opens its own connection to the memory mapped database file (`in_memory=False`)
+
+Every query counts the entities meeting a random constraint on a synthetic database with `--rows` rows
+(results aren't cached).
+
+Usage (from the adviser folder):
+python tools/benchmarks/domain_concurrency.py --threads 1 2 4 8 --rows 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+head_location = os.path.abspath(os.path.join(os.path.abspath(__file__), '..', '..', '..'))  # main folder of adviser
+sys.path.append(head_location)
+
+from tools.benchmarks.domain_loading import create_synthetic_domain
+from utils.domain.jsonlookupdomain import JSONLookupDomain
+
+MODES = ('shared', 'memory', 'mmap')
+
+
+def measure(domain: JSONLookupDomain, mode: str, num_threads: int, num_queries: int) -> float:
+    """ Returns the number of queries per second of all threads """
+    slots = list(domain.get_informable_slots())
+    shared_db = domain.db
+    barrier = threading.Barrier(num_threads + 1)
+
+    def query(seed: int):
+        if mode == 'shared':
+            domain.db = shared_db
+        rand = random.Random(seed)
+        constraints = []
+        for _ in range(num_queries):
+            slot = rand.choice(slots)
+            constraints.append({slot: rand.choice(domain.get_possible_values(slot))})
+        barrier.wait()
+        for query_constraints in constraints:
+            domain.count_entities(query_constraints)
+        barrier.wait()
+
+    threads = [threading.Thread(target=query, args=(seed,)) for seed in range(num_threads)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    barrier.wait()
+    seconds = time.perf_counter() - start
+    for thread in threads:
+        thread.join()
+    return num_threads * num_queries / seconds
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-t", "--threads", type=int, nargs='+', default=[1, 2, 4, 8], help="numbers of threads")
+    parser.add_argument("-r", "--rows", type=int, default=100000, help="number of rows of the synthetic database")
+    parser.add_argument("-q", "--queries", type=int, default=200, help="number of queries per thread")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs")
+    with tempfile.TemporaryDirectory() as folder:
+        name, ontology_file, db_file = create_synthetic_domain(folder, args.rows)
+        print(f"{'threads':>8}" + "".join(f"{mode + ' q/s':>14}" for mode in MODES))
+        domains = {mode: JSONLookupDomain(name, json_ontology_file=os.path.relpath(ontology_file, head_location),
+                                          sqllite_db_file=os.path.relpath(db_file, head_location),
+                                          in_memory=mode != 'mmap', cache_size=0)
+                   for mode in MODES}
+        for num_threads in args.threads:
+            throughputs = [measure(domains[mode], mode, num_threads, args.queries) for mode in MODES]
+            print(f"{num_threads:>8}" + "".join(f"{throughput:>14.1f}" for throughput in throughputs))
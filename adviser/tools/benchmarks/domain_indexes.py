@@ -0,0 +1,76 @@
+############################################################################################
+#
+# Copyright 2020, University of Stuttgart: Institute for Natural Language Processing (IMS)
+#
+# This file is part of Adviser.
+# Adviser is free software: you can redistribute it and/or modify'
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3.
+#
+# Adviser is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Adviser.  If not, see <https://www.gnu.org/licenses/>.
+#
+############################################################################################
+
+
+"""
+Measures the time of `JSONLookupDomain.find_entities` queries on a synthetic database with `--rows` rows
+depending on the indexes created for the informable slots (see `JSONLookupDomain(indexes=...)`) and lists
+the queries still scanning the whole table.
+
+Usage (from the adviser folder):
+python tools/benchmarks/domain_indexes.py --rows 100000 1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+head_location = os.path.abspath(os.path.join(os.path.abspath(__file__), '..', '..', '..'))  # main folder of adviser
+sys.path.append(head_location)
+
+from tools.benchmarks.domain_loading import create_synthetic_domain
+from utils.domain.jsonlookupdomain import JSONLookupDomain
+
+
+def measure(domain: JSONLookupDomain, num_queries: int, num_slots: int) -> float:
+    """ Returns the mean time (in ms) of `find_entities` with `num_slots` random informable slot constraints """
+    slots = list(domain.get_informable_slots())
+    random.seed(0)
+    constraints = [{slot: random.choice(domain.get_possible_values(slot)).upper()
+                    for slot in random.sample(slots, num_slots)} for _ in range(num_queries)]
+    start = time.perf_counter()
+    for query_constraints in constraints:
+        domain.find_entities(query_constraints)
+    return (time.perf_counter() - start) / num_queries * 1000
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-r", "--rows", type=int, nargs='+', default=[100000, 1000000],
+                        help="numbers of rows of the synthetic database")
+    parser.add_argument("-q", "--queries", type=int, default=50, help="number of queries per measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        print(f"{'rows':>10}{'indexes':>10}{'1 slot ms':>12}{'2 slots ms':>12}")
+        for num_rows in args.rows:
+            os.makedirs(os.path.join(folder, str(num_rows)))
+            name, ontology_file, db_file = create_synthetic_domain(os.path.join(folder, str(num_rows)), num_rows)
+            # indexes are only created on the in-memory copy: measure the modes from least to most indexes
+            for indexes in JSONLookupDomain.INDEX_MODES:
+                domain = JSONLookupDomain(name, json_ontology_file=os.path.relpath(ontology_file, head_location),
+                                          sqllite_db_file=os.path.relpath(db_file, head_location), cache_size=0,
+                                          indexes=indexes)
+                single, double = measure(domain, args.queries, 1), measure(domain, args.queries, 2)
+                print(f"{num_rows:>10}{indexes:>10}{single:>12.3f}{double:>12.3f}")
+                for query_str in domain.get_query_plans(full_scans_only=True):
+                    print(f"{'':>10}full scan: {query_str}")
@@ -0,0 +1,147 @@
+###############################################################################
+#
+# Copyright 2020, University of Stuttgart: Institute for Natural Language Processing (IMS)
+#
+# This file is part of Adviser.
+# Adviser is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3.
+#
+# Adviser is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Adviser.  If not, see <https://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+"""
+Measures the startup time and memory (RSS) of loading several `JSONLookupDomain` instances of the same database,
+as done by the services of a dialog system.
+
+Loaders:
+    * dump: every instance dumps the database file as SQL text and replays it into its own in-memory database
+            (the former loader, for comparison)
+    * backup: the database file is copied once per process with the sqlite backup API (`in_memory=True`)
+    * mmap: the database file is memory mapped read-only (`in_memory=False`)
+
+Note: the RSS of the mmap loader counts the mapped file pages once per connection, although all connections
+(and processes) share the same pages of the OS page cache.
+
+Each measurement runs in a new process. Besides the ImsCourses and ImsLecturers databases, a synthetic
+database with `--rows` rows is measured.
+
+Usage (from the adviser folder):
+python tools/benchmarks/domain_loading.py --instances 4 --rows 1000000
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from io import StringIO
+
+head_location = os.path.abspath(os.path.join(os.path.abspath(__file__), '..', '..', '..'))  # main folder of adviser
+sys.path.append(head_location)
+
+from utils.domain.jsonlookupdomain import JSONLookupDomain
+
+LOADERS = ('dump', 'backup', 'mmap')
+
+
+def get_rss() -> float:
+    """ Returns the resident set size of this process in MB (Linux only) """
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return float('nan')
+
+
+def dump_load(domain: JSONLookupDomain, db_file_path: str):
+    """ Replaces the database connection of the domain by the former loader (SQL text dump + replay) """
+    file_db = sqlite3.connect(db_file_path)
+    script = StringIO()
+    for line in file_db.iterdump():
+        script.write('%s\n' % line)
+    file_db.close()
+    domain.db = sqlite3.connect(':memory:', check_same_thread=False)
+    domain.db.row_factory = domain._sqllite_dict_factory
+    domain.db.cursor().executescript(script.getvalue())
+    domain.db.commit()
+
+
+def measure(loader: str, name: str, ontology_file: str, db_file: str, num_instances: int, results):
+    """ Loads `num_instances` domains, puts (seconds for the first instance, seconds for all, RSS increase in MB) """
+    rss_before = get_rss()
+    start = time.perf_counter()
+    first = None
+    domains = []
+    for _ in range(num_instances):
+        domain = JSONLookupDomain(name, json_ontology_file=ontology_file, sqllite_db_file=db_file,
+                                  in_memory=loader == 'backup')
+        if loader == 'dump':
+            dump_load(domain, os.path.join(domain._get_root_dir(), db_file))
+        # read all pages of the table once (e.g. mapped pages)
+        domain.query_db(f"SELECT count(*) FROM {name}")
+        domains.append(domain)
+        if first is None:
+            first = time.perf_counter() - start
+    results.put((first, time.perf_counter() - start, get_rss() - rss_before))
+
+
+def create_synthetic_domain(folder: str, num_rows: int):
+    """ Creates ontology and database files of a domain with `num_rows` entities, returns their paths """
+    name = 'synthetic'
+    categories = [f'category{idx}' for idx in range(50)]
+    areas = [f'area{idx}' for idx in range(20)]
+    ontology = {'key': 'name', 'requestable': ['category', 'area', 'price'], 'system_requestable': ['category', 'area'],
+                'informable': {'category': categories, 'area': areas}, 'binary': [], 'pronoun_map': {}}
+    ontology_file = os.path.join(folder, name + '.json')
+    with open(ontology_file, 'w') as f:
+        json.dump(ontology, f)
+    db_file = os.path.join(folder, name + '.db')
+    db = sqlite3.connect(db_file)
+    db.execute(f"CREATE TABLE {name} (name TEXT PRIMARY KEY, category TEXT, area TEXT, price INTEGER)")
+    db.executemany(f"INSERT INTO {name} VALUES (?, ?, ?, ?)",
+                   ((f'entity{idx}', categories[idx % len(categories)], areas[idx % len(areas)], idx % 100)
+                    for idx in range(num_rows)))
+    db.commit()
+    db.close()
+    return name, ontology_file, db_file
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-i", "--instances", type=int, default=4, help="number of domain instances per database")
+    parser.add_argument("-r", "--rows", type=int, default=1000000, help="number of rows of the synthetic database")
+    parser.add_argument("-l", "--loaders", nargs='+', choices=LOADERS, default=list(LOADERS), help="loaders to measure")
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context('spawn')  # fresh process per measurement
+    with tempfile.TemporaryDirectory() as folder:
+        root_dir = head_location
+        domains = [(name, os.path.join('resources', 'ontologies', name + '.json'),
+                    os.path.join('resources', 'databases', name + '.db')) for name in ('ImsCourses', 'ImsLecturers')]
+        if args.rows > 0:
+            name, ontology_file, db_file = create_synthetic_domain(folder, args.rows)
+            # domain files are given relative to the adviser folder
+            domains.append((name, os.path.relpath(ontology_file, root_dir), os.path.relpath(db_file, root_dir)))
+
+        print(f"{'database':<14}{'size MB':>9}{'loader':>8}{'first s':>10}{f'{args.instances}x s':>10}{'RSS MB':>10}")
+        for name, ontology_file, db_file in domains:
+            size = os.path.getsize(os.path.join(root_dir, db_file)) / 2 ** 20
+            for loader in args.loaders:
+                results = ctx.Queue()
+                process = ctx.Process(target=measure, args=(loader, name, ontology_file, db_file, args.instances,
+                                                            results))
+                process.start()
+                first, total, rss = results.get()
+                process.join()
+                print(f"{name:<14}{size:>9.1f}{loader:>8}{first:>10.3f}{total:>10.3f}{rss:>10.1f}")
@@ -0,0 +1,142 @@
+############################################################################################
+#
+# Copyright 2020, University of Stuttgart: Institute for Natural Language Processing (IMS)
+#
+# This file is part of Adviser.
+# Adviser is free software: you can redistribute it and/or modify'
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3.
+#
+# Adviser is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Adviser.  If not, see <https://www.gnu.org/licenses/>.
+#
+############################################################################################
+
+"""
+Compares the execution models of service listeners (see `services.executor`): one thread per listener
+(`ThreadExecutor`) and a single poller with a bounded worker pool (`PooledExecutor`).
+
+Runs simulated dialogs in several domains at the same time (one user simulator, BST, policy and evaluator per domain)
+and reports the number of threads, the memory usage, the wake-up latency (round trip of a message through an
+echo service) and the dialog throughput.
+
+Usage (from the adviser folder):
+python tools/benchmarks/executor_overhead.py --workers 2 4 8 --dialogs 30
+"""
+
+import argparse
+import os
+import resource
+import statistics
+import sys
+import threading
+import time
+
+head_location = os.path.abspath(os.path.join(os.path.abspath(__file__), '..', '..', '..'))  # main folder of adviser
+sys.path.append(head_location)
+
+from services.bst import HandcraftedBST
+from services.executor import PooledExecutor, ThreadExecutor
+from services.policy import HandcraftedPolicy
+from services.service import DialogSystem, PublishSubscribe, Service, _send_msg
+from services.simulator.simulator import HandcraftedUserSimulator
+from services.stats.evaluation import PolicyEvaluator
+from services.transport import LocalTransport, ZMQTransport
+from utils import common
+from utils.domain.jsonlookupdomain import JSONLookupDomain
+from utils.logger import DiasysLogger, LogLevel
+
+DOMAINS = ('ImsLecturers', 'superhero')
+
+
+class EchoService(Service):
+    """ Answers each ping with a pong """
+
+    @PublishSubscribe(sub_topics=["ping"], pub_topics=["pong"])
+    def echo(self, ping: float = None) -> dict(pong=float):
+        return {'pong': ping}
+
+
+def get_rss() -> float:
+    """ Returns the resident set size of this process in MB """
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure_wakeup_latency(ds: DialogSystem, transport, num_pings: int) -> list:
+    """ Returns the round trip times (seconds) of pings sent to the echo service """
+    publisher = transport.publisher()
+    subscriber = transport.subscriber(["pong"])
+    session = ds.start_session({})
+    time.sleep(0.1)  # make sure the subscription reached the proxy
+    latencies = []
+    for _ in range(num_pings):
+        start = time.perf_counter()
+        _send_msg(publisher, "ping", start, session)
+        subscriber.recv()
+        latencies.append(time.perf_counter() - start)
+    ds.end_session(session)
+    subscriber.close()
+    return latencies
+
+
+def run(name: str, transport, executor, domains: list, num_dialogs: int, num_pings: int):
+    common.init_random(0)
+    threads_before = threading.active_count()
+    rss_before = get_rss()
+    logger = DiasysLogger(console_log_lvl=LogLevel.NONE)
+    services = [EchoService()]
+    evaluators = []
+    for domain in domains:
+        evaluators.append(PolicyEvaluator(domain=domain, logger=logger))
+        services += [HandcraftedUserSimulator(domain, logger=logger), HandcraftedBST(domain=domain),
+                     HandcraftedPolicy(domain=domain, logger=logger), evaluators[-1]]
+    ds = DialogSystem(services=services, transport=transport, executor=executor)
+
+    latencies = measure_wakeup_latency(ds, transport, num_pings)
+
+    # run dialogs in all domains at the same time
+    start = time.perf_counter()
+    for _ in range(num_dialogs):
+        sessions = [ds.start_session({f'user_acts/{domain.get_domain_name()}': []}) for domain in domains]
+        for session in sessions:
+            ds.wait_for_session(session)
+    elapsed = time.perf_counter() - start
+    num_threads = threading.active_count() - threads_before
+    rss = get_rss() - rss_before
+    ds.shutdown()
+
+    num_run = num_dialogs * len(domains)
+    print(f"{name:<22}{num_threads:>8}{rss:>10.1f}{1e6 * statistics.median(latencies):>12.0f}"
+          f"{1e6 * sorted(latencies)[int(0.95 * len(latencies))]:>12.0f}{num_run / elapsed:>12.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-w", "--workers", type=int, nargs='+', default=[2, 4, 8],
+                        help="pool sizes of the pooled executor to measure")
+    parser.add_argument("-n", "--dialogs", type=int, default=30, help="number of dialogs per domain")
+    parser.add_argument("-p", "--pings", type=int, default=500, help="number of pings for the wake-up latency")
+    parser.add_argument("-t", "--transport", choices=['zmq', 'local'], default='zmq', help="message transport")
+    args = parser.parse_args()
+
+    domains = [JSONLookupDomain(name) for name in DOMAINS]
+    executors = [('threads', ThreadExecutor())] + \
+                [(f'pooled ({workers} workers)', PooledExecutor(num_workers=workers)) for workers in args.workers]
+    print(f"{'executor':<22}{'threads':>8}{'RSS MB':>10}{'p50 us':>12}{'p95 us':>12}{'dialogs/s':>12}")
+    for idx, (name, executor) in enumerate(executors):
+        # NOTE: the zmq proxy of a dialog system keeps running until the process exits, use new ports for each run
+        transport = ZMQTransport(sub_port=65533 - 2 * idx, pub_port=65534 - 2 * idx) if args.transport == 'zmq' \
+            else LocalTransport()
+        run(name, transport, executor, domains, args.dialogs, args.pings)
@@ -0,0 +1,94 @@
+###############################################################################
+#
+# Copyright 2020, University of Stuttgart: Institute for Natural Language Processing (IMS)
+#
+# This file is part of Adviser.
+# Adviser is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3.
+#
+# Adviser is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Adviser.  If not, see <https://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+"""
+Measures the throughput (simulated dialogs per second) of a single service graph
+(user simulator, BST, policy, evaluator) depending on the number of concurrently running sessions.
+
+Usage (from the adviser folder):
+python tools/benchmarks/multisession_throughput.py --sessions 1 8 32 128 --dialogs 256
+"""
+
+import argparse
+import os
+import sys
+import time
+
+head_location = os.path.abspath(os.path.join(os.path.abspath(__file__), '..', '..', '..'))  # main folder of adviser
+sys.path.append(head_location)
+
+from services.bst import HandcraftedBST
+from services.policy import HandcraftedPolicy
+from services.service import DialogSystem
+from services.simulator.simulator import HandcraftedUserSimulator
+from services.stats.evaluation import PolicyEvaluator
+from utils import common
+from utils.domain.jsonlookupdomain import JSONLookupDomain
+from utils.logger import DiasysLogger, LogLevel
+
+
+def run_sequential(ds: DialogSystem, start_signals: dict, num_dialogs: int) -> float:
+    """ Runs `num_dialogs` dialogs one after the other using `run_dialog` and returns the elapsed time """
+    start = time.perf_counter()
+    for _ in range(num_dialogs):
+        ds.run_dialog(start_signals)
+    return time.perf_counter() - start
+
+
+def run_sessions(ds: DialogSystem, start_signals: dict, num_dialogs: int, num_sessions: int) -> float:
+    """ Runs `num_dialogs` dialogs keeping `num_sessions` sessions open at any time and returns the elapsed time """
+    start = time.perf_counter()
+    started = 0
+    running = []
+    while started < num_dialogs or running:
+        # keep the number of running sessions constant
+        while started < num_dialogs and len(running) < num_sessions:
+            running.append(ds.start_session(start_signals))
+            started += 1
+        ds.wait_for_session(running.pop(0))
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-d", "--domain", default="ImsLecturers", help="name of the domain")
+    parser.add_argument("-s", "--sessions", type=int, nargs='+', default=[1, 8, 32, 128],
+                        help="numbers of concurrent sessions to measure")
+    parser.add_argument("-n", "--dialogs", type=int, default=256, help="number of dialogs per measurement")
+    args = parser.parse_args()
+
+    common.init_random(0)
+    logger = DiasysLogger(console_log_lvl=LogLevel.NONE)
+    domain = JSONLookupDomain(args.domain)
+    evaluator = PolicyEvaluator(domain=domain, logger=logger)
+    ds = DialogSystem(services=[HandcraftedUserSimulator(domain, logger=logger),
+                                HandcraftedBST(domain=domain),
+                                HandcraftedPolicy(domain=domain, logger=logger),
+                                evaluator])
+    start_signals = {f'user_acts/{domain.get_domain_name()}': []}
+
+    elapsed = run_sequential(ds, start_signals, args.dialogs)
+    print(f"{'mode':<12}{'sessions':>10}{'dialogs':>10}{'seconds':>10}{'dialogs/s':>12}")
+    print(f"{'run_dialog':<12}{1:>10}{args.dialogs:>10}{elapsed:>10.2f}{args.dialogs / elapsed:>12.1f}")
+    for num_sessions in args.sessions:
+        elapsed = run_sessions(ds, start_signals, args.dialogs, num_sessions)
+        print(f"{'sessions':<12}{num_sessions:>10}{args.dialogs:>10}{elapsed:>10.2f}{args.dialogs / elapsed:>12.1f}")
+    success = evaluator.eval_success
+    print(f"success rate over all dialogs: {sum(success) / max(len(success), 1):.2f}")
+    ds.shutdown()
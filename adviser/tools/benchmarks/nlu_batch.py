@@ -0,0 +1,84 @@
+############################################################################################
+#
+# Copyright 2020, University of Stuttgart: Institute for Natural Language Processing (IMS)
+#
+# This file is part of Adviser.
+# Adviser is free software: you can redistribute it and/or modify'
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3.
+#
+# Adviser is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Adviser.  If not, see <https://www.gnu.org/licenses/>.
+#
+############################################################################################
+
+
+"""
+Measures the time of labeling a corpus of `--utterances` utterances (the utterances of the NLU tests, repeated)
+with the handcrafted NLU of a domain, half of them following a system request:
+
+    * turns: one dialog turn per utterance (`dialog_start`, setting the system act, `extract_user_acts`)
+    * batch: `HandcraftedNLU.parse_batch` in this process
+    * processes: `HandcraftedNLU.parse_batch` in `--workers` processes
+
+The user acts of all modes are compared.
+
+Usage (from the adviser folder):
+python tools/benchmarks/nlu_batch.py --domain ImsCourses --utterances 20000 --workers 4
+"""
+
+import argparse
+import os
+import sys
+import time
+
+head_location = os.path.abspath(os.path.join(os.path.abspath(__file__), '..', '..', '..'))  # main folder of adviser
+sys.path.append(head_location)
+
+from services.nlu.nlu import HandcraftedNLU
+from tools.benchmarks.nlu_throughput import CORPORA, GENERAL_CORPORA, read_utterances
+from utils.domain.jsonlookupdomain import JSONLookupDomain
+from utils.logger import DiasysLogger, LogLevel
+from utils.sysact import SysAct, SysActionType
+
+
+def parse_turns(nlu: HandcraftedNLU, utterances, sys_acts):
+    user_acts = []
+    for utterance, sys_act in zip(utterances, sys_acts):
+        nlu.dialog_start()
+        nlu.sys_act_info['last_act'] = sys_act
+        user_acts.append(nlu.extract_user_acts(nlu, user_utterance=utterance)['user_acts'])
+    return user_acts
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-d", "--domain", choices=list(CORPORA.values()), default='ImsCourses', help="domain")
+    parser.add_argument("-u", "--utterances", type=int, default=20000, help="number of utterances")
+    parser.add_argument("-w", "--workers", type=int, default=4, help="number of processes")
+    args = parser.parse_args()
+
+    test_file = next(test_file for test_file, domain_name in CORPORA.items() if domain_name == args.domain)
+    corpus = read_utterances(test_file) + [utterance for general_file in GENERAL_CORPORA
+                                           for utterance in read_utterances(general_file)]
+    utterances = [corpus[idx % len(corpus)] for idx in range(args.utterances)]
+    nlu = HandcraftedNLU(domain=JSONLookupDomain(args.domain), logger=DiasysLogger(console_log_lvl=LogLevel.NONE))
+    request = SysAct(SysActionType.Request, {nlu.USER_REQUESTABLE[0]: []})
+    sys_acts = [request if idx % 2 else None for idx in range(args.utterances)]
+
+    print(f"{'mode':<12}{'workers':>8}{'seconds':>10}{'utt/s':>10}")
+    results = []
+    for mode, workers in (('turns', 1), ('batch', 1), ('processes', args.workers)):
+        start = time.perf_counter()
+        if mode == 'turns':
+            results.append(parse_turns(nlu, utterances, sys_acts))
+        else:
+            results.append(nlu.parse_batch(utterances, sys_acts, num_workers=workers))
+        seconds = time.perf_counter() - start
+        print(f"{mode:<12}{workers:>8}{seconds:>10.2f}{args.utterances / seconds:>10.0f}")
+    assert all(result == results[0] for result in results), "modes found different user acts"
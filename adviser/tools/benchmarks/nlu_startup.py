@@ -0,0 +1,99 @@
+############################################################################################
+#
+# Copyright 2020, University of Stuttgart: Institute for Natural Language Processing (IMS)
+#
+# This file is part of Adviser.
+# Adviser is free software: you can redistribute it and/or modify'
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3.
+#
+# Adviser is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Adviser.  If not, see <https://www.gnu.org/licenses/>.
+#
+############################################################################################
+
+
+"""
+Measures the startup of the handcrafted NLU of each domain in a new process, i.e. the time until the rules are
+ready, and the time of the first pass over the utterances of the NLU tests (which compiles the searched rules):
+
+    * eager: the JSON rule files are read and all rules are compiled (the former startup)
+    * json: the JSON rule files are read, the rules are compiled when they are searched the first time
+    * artifact: the compiled rules are loaded from their artifact (see `services.nlu.artifact`)
+
+The artifacts are written by `tools/regextemplates/gen_regexes.py` (e.g. `gen_regexes.py ImsCourses` compiles the
+existing JSON files), domains without an up-to-date artifact are skipped in the artifact mode.
+
+Usage (from the adviser folder):
+python tools/benchmarks/nlu_startup.py
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+head_location = os.path.abspath(os.path.join(os.path.abspath(__file__), '..', '..', '..'))  # main folder of adviser
+sys.path.append(head_location)
+
+from services.nlu.artifact import CompiledRules, get_artifact_file
+from tools.benchmarks.nlu_throughput import CORPORA, GENERAL_CORPORA, read_utterances
+from utils.common import Language
+from utils.domain.jsonlookupdomain import JSONLookupDomain
+
+MODES = ('eager', 'json', 'artifact')
+
+
+def measure(mode: str, domain_name: str, utterances: list, results):
+    """ Puts (seconds until the rules are ready, seconds of the first pass) or None if there is no artifact """
+    # the domain isn't part of the startup of the NLU
+    domain = JSONLookupDomain(domain_name)
+    requestable, informable = domain.get_requestable_slots(), domain.get_informable_slots()
+    folder = os.path.join(head_location, 'resources', 'nlu_regexes')
+    start = time.perf_counter()
+    if mode == 'artifact':
+        rules = CompiledRules.load(os.path.join(folder, get_artifact_file(domain_name, Language.ENGLISH)),
+                                   head_location)
+        if rules is None or not rules.matches_slots(requestable, informable):
+            results.put(None)
+            return
+    else:
+        rules = CompiledRules.from_json(folder, domain_name, Language.ENGLISH, requestable, informable)
+        if mode == 'eager':
+            for matcher in (rules.general_matcher, rules.request_matcher, rules.inform_matcher):
+                for idx in range(len(matcher._rules)):
+                    matcher._get_pattern(idx)
+    ready = time.perf_counter() - start
+    start = time.perf_counter()
+    for utterance in utterances:
+        for matcher in (rules.general_matcher, rules.request_matcher, rules.inform_matcher):
+            matcher.match(utterance)
+    results.put((ready, time.perf_counter() - start))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-m", "--modes", nargs='+', choices=MODES, default=list(MODES), help="modes to measure")
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context('spawn')  # fresh process (without cached patterns) per measurement
+    general_utterances = [utterance for test_file in GENERAL_CORPORA for utterance in read_utterances(test_file)]
+    print(f"{'domain':<14}{'mode':>10}{'ready ms':>10}{'first pass ms':>15}")
+    for test_file, domain_name in CORPORA.items():
+        utterances = read_utterances(test_file) + general_utterances
+        for mode in args.modes:
+            results = ctx.Queue()
+            process = ctx.Process(target=measure, args=(mode, domain_name, utterances, results))
+            process.start()
+            result = results.get()
+            process.join()
+            if result is None:
+                print(f"{domain_name:<14}{mode:>10}{'no up-to-date artifact':>25}")
+            else:
+                print(f"{domain_name:<14}{mode:>10}{result[0] * 1000:>10.1f}{result[1] * 1000:>15.1f}")
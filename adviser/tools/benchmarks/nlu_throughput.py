@@ -0,0 +1,129 @@
+############################################################################################
+#
+# Copyright 2020, University of Stuttgart: Institute for Natural Language Processing (IMS)
+#
+# This file is part of Adviser.
+# Adviser is free software: you can redistribute it and/or modify'
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3.
+#
+# Adviser is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Adviser.  If not, see <https://www.gnu.org/licenses/>.
+#
+############################################################################################
+
+
+"""
+Measures the throughput (utterances per second) of `HandcraftedNLU.extract_user_acts` on the utterances of the
+NLU tests (tests/nlu) of each domain, together with the utterances of the tests of the general acts
+(answering a request of the system):
+
+    * search: `re.search` with the rule strings for every rule (the former implementation, relying on the
+              cache of compiled patterns of the `re` module)
+    * compiled: every rule compiled once (`services.nlu.regexmatcher.RegexMatcher` without prefilter)
+    * prefilter: compiled rules, only the rules whose required literals occur in the utterance are searched
+
+Usage (from the adviser folder):
+python tools/benchmarks/nlu_throughput.py --repeat 20
+"""
+
+import argparse
+import ast
+import os
+import re
+import sys
+import time
+
+head_location = os.path.abspath(os.path.join(os.path.abspath(__file__), '..', '..', '..'))  # main folder of adviser
+sys.path.append(head_location)
+
+from services.nlu.nlu import HandcraftedNLU
+from services.nlu.regexmatcher import RegexMatcher
+from utils.domain.jsonlookupdomain import JSONLookupDomain
+from utils.logger import DiasysLogger, LogLevel
+from utils.sysact import SysAct, SysActionType
+
+MODES = ('search', 'compiled', 'prefilter')
+# test file -> domain (the utterances of the general tests are added to every domain)
+CORPORA = {'courses_regexes_test.py': 'ImsCourses', 'lecturers_regexes_test.py': 'ImsLecturers',
+           'superheroes_regexes_test.py': 'superhero'}
+GENERAL_CORPORA = ('general_regexes_test.py', 'nlu_test.py')
+
+
+class SearchMatcher(object):
+    """ Matches every rule with `re.search`, like the former implementation """
+
+    def __init__(self, rules: dict, require_group: bool = True):
+        self.rules = rules
+        self.require_group = require_group
+
+    def match(self, utterance: str):
+        keys = []
+        for key, rule in self.rules.items():
+            match = re.search(rule, utterance, re.I)
+            if match and (not self.require_group or HandcraftedNLU._check(match)):
+                keys.append(key)
+        return keys
+
+
+def read_utterances(test_file: str):
+    """ Returns the utterances passed as `user_utterance` or iterated over in the tests """
+    tree = ast.parse(open(os.path.join(head_location, 'tests', 'nlu', test_file)).read())
+    utterances = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.keyword) and node.arg == 'user_utterance' and isinstance(node.value, ast.Constant):
+            utterances.append(node.value.value)
+        elif isinstance(node, ast.For) and isinstance(node.iter, ast.List):
+            utterances += [elt.value for elt in node.iter.elts if isinstance(elt, ast.Constant)]
+    return [utterance for utterance in utterances if isinstance(utterance, str)]
+
+
+def set_mode(nlu: HandcraftedNLU, mode: str):
+    """ Replaces the matchers of the NLU by the matchers of the mode """
+    request_rules = {slot: nlu.request_regex[slot] for slot in nlu.USER_REQUESTABLE}
+    inform_rules = {(slot, value): regex for slot in nlu.USER_INFORMABLE
+                    for value, regex in nlu.inform_regex[slot].items()}
+    if mode == 'search':
+        matcher = SearchMatcher
+    else:
+        def matcher(rules: dict, require_group: bool = True):
+            return RegexMatcher(rules, require_group=require_group, prefilter=mode == 'prefilter')
+    nlu.general_matcher = matcher(nlu.general_regex, require_group=False)
+    nlu.request_matcher = matcher(request_rules)
+    nlu.inform_matcher = matcher(inform_rules)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-r", "--repeat", type=int, default=20, help="number of passes over the utterances")
+    args = parser.parse_args()
+
+    general_utterances = [utterance for test_file in GENERAL_CORPORA for utterance in read_utterances(test_file)]
+    logger = DiasysLogger(console_log_lvl=LogLevel.NONE)
+    print(f"{'domain':<14}{'rules':>7}{'utterances':>12}" + "".join(f"{mode + ' utt/s':>16}" for mode in MODES))
+    for test_file, domain_name in CORPORA.items():
+        utterances = read_utterances(test_file) + general_utterances
+        nlu = HandcraftedNLU(domain=JSONLookupDomain(domain_name), logger=logger)
+        num_rules = len(nlu.general_regex) + len(nlu.request_regex) + sum(
+            len(values) for values in nlu.inform_regex.values())
+        throughputs, results = [], []
+        for mode in MODES:
+            set_mode(nlu, mode)
+            nlu.dialog_start()
+            # in the middle of the dialog: the system asked for a slot
+            nlu.sys_act_info['last_act'] = SysAct(SysActionType.Request, {nlu.USER_REQUESTABLE[0]: []})
+            results.append([nlu.extract_user_acts(nlu, user_utterance=utterance)['user_acts']
+                            for utterance in utterances])
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                for utterance in utterances:
+                    nlu.extract_user_acts(nlu, user_utterance=utterance)
+            throughputs.append(args.repeat * len(utterances) / (time.perf_counter() - start))
+        assert all(result == results[0] for result in results), "modes found different user acts"
+        print(f"{domain_name:<14}{num_rules:>7}{len(utterances):>12}"
+              + "".join(f"{throughput:>16.0f}" for throughput in throughputs))
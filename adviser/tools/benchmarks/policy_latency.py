@@ -0,0 +1,89 @@
+############################################################################################
+#
+# Copyright 2020, University of Stuttgart: Institute for Natural Language Processing (IMS)
+#
+# This file is part of Adviser.
+# Adviser is free software: you can redistribute it and/or modify'
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3.
+#
+# Adviser is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Adviser.  If not, see <https://www.gnu.org/licenses/>.
+#
+############################################################################################
+
+
+"""
+Measures the per-turn latency of the handcrafted policy (`HandcraftedPolicy.choose_sys_act`) in simulated dialogs,
+finding the candidates of each turn with a new database query or among the candidates of the previous turn
+(`HandcraftedPolicy(incremental_candidates=True)`).
+
+Besides the given domains, a synthetic domain with `--rows` entities is measured.
+
+Usage (from the adviser folder):
+python tools/benchmarks/policy_latency.py --dialogs 200 --rows 100000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+head_location = os.path.abspath(os.path.join(os.path.abspath(__file__), '..', '..', '..'))  # main folder of adviser
+sys.path.append(head_location)
+
+from services.bst import HandcraftedBST
+from services.policy import HandcraftedPolicy
+from services.service import DialogSystem
+from services.simulator.simulator import HandcraftedUserSimulator
+from services.stats.evaluation import PolicyEvaluator
+from services.tracing import Tracer
+from services.transport import LocalTransport
+from tools.benchmarks.domain_loading import create_synthetic_domain
+from utils import common
+from utils.domain.jsonlookupdomain import JSONLookupDomain
+from utils.logger import DiasysLogger, LogLevel
+
+
+def measure(domain: JSONLookupDomain, incremental: bool, num_dialogs: int, percentiles=(50, 95, 99)) -> dict:
+    """ Returns the number of policy turns and their latency percentiles (in ms) """
+    common.init_random(0)
+    logger = DiasysLogger(console_log_lvl=LogLevel.NONE)
+    tracer = Tracer()
+    ds = DialogSystem(services=[HandcraftedUserSimulator(domain, logger=logger), HandcraftedBST(domain=domain),
+                                HandcraftedPolicy(domain=domain, logger=logger, incremental_candidates=incremental),
+                                PolicyEvaluator(domain=domain, logger=logger)],
+                      transport=LocalTransport(), tracer=tracer)
+    for _ in range(num_dialogs):
+        ds.run_dialog({f'user_acts/{domain.get_domain_name()}': []})
+    ds.shutdown()
+    return tracer.summary(percentiles)['HandcraftedPolicy.choose_sys_act']['duration']
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-d", "--domains", nargs='+', default=['superhero', 'ImsCourses'], help="names of the domains")
+    parser.add_argument("-r", "--rows", type=int, default=100000, help="number of rows of the synthetic domain")
+    parser.add_argument("-n", "--dialogs", type=int, default=200, help="number of dialogs per measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        domains = [JSONLookupDomain(name) for name in args.domains]
+        if args.rows > 0:
+            name, ontology_file, db_file = create_synthetic_domain(folder, args.rows)
+            domains.append(JSONLookupDomain(name, json_ontology_file=os.path.relpath(ontology_file, head_location),
+                                            sqllite_db_file=os.path.relpath(db_file, head_location)))
+
+        print(f"{'domain':<14}{'candidates':>12}{'turns':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for domain in domains:
+            for incremental in (False, True):
+                # no results of earlier measurements
+                domain.invalidate_cache()
+                latency = measure(domain, incremental, args.dialogs)
+                print(f"{domain.get_domain_name():<14}{'previous' if incremental else 'query':>12}"
+                      f"{latency['count']:>8}{latency['p50']:>10.3f}{latency['p95']:>10.3f}{latency['p99']:>10.3f}")
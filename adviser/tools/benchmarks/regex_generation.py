@@ -0,0 +1,113 @@
+############################################################################################
+#
+# Copyright 2020, University of Stuttgart: Institute for Natural Language Processing (IMS)
+#
+# This file is part of Adviser.
+# Adviser is free software: you can redistribute it and/or modify'
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3.
+#
+# Adviser is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Adviser.  If not, see <https://www.gnu.org/licenses/>.
+#
+############################################################################################
+
+
+"""
+Measures the generation of the NLU rules from a template (`tools/regextemplates/gen_regexes.py`) for the
+ImsLecturers template and an ontology with `--values` additional lecturer names:
+
+    * cold: all slots are created (without cache), in one process or in `--workers` processes
+    * unchanged: nothing changed since the last generation
+    * template edit: one line of the first request rule changed (all request slots depend on it)
+    * value added: one value added to the department slot
+
+After every step, the rules are compared with the rules of a generation without cache.
+
+Usage (from the adviser folder):
+python tools/benchmarks/regex_generation.py --values 5000 --workers 4
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+head_location = os.path.abspath(os.path.join(os.path.abspath(__file__), '..', '..', '..'))  # main folder of adviser
+sys.path.append(head_location)
+
+from tools.regextemplates.gen_regexes import create_json_from_template
+from utils.domain.jsonlookupdomain import JSONLookupDomain
+
+DOMAIN = 'ImsLecturers'
+EDITED_LINE = '    "{rREQUEST()} {slot_synonyms("department")}"\n'
+
+
+def read_rules(folder: str):
+    rules = []
+    for kind in ('Request', 'Inform'):
+        with open(os.path.join(folder, f'{DOMAIN}{kind}Rules.json')) as f:
+            rules.append(json.load(f))
+    return rules
+
+
+def generate(step: str, domain: JSONLookupDomain, template_file: str, folder: str, workers: int,
+             use_cache: bool = True, check: bool = True):
+    start = time.perf_counter()
+    num_created = create_json_from_template(domain, template_file, workers=workers, use_cache=use_cache,
+                                            folder=folder)
+    seconds = time.perf_counter() - start
+    if check:
+        rules = read_rules(folder)
+        reference_folder = os.path.join(folder, 'reference')
+        create_json_from_template(domain, template_file + '.reference', use_cache=False, folder=reference_folder)
+        assert rules == read_rules(reference_folder), f"{step}: rules differ from a generation without cache"
+    print(f"{step:<28}{workers:>8}{num_created:>10}{seconds:>10.2f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-v", "--values", type=int, default=5000, help="number of additional lecturer names")
+    parser.add_argument("-w", "--workers", type=int, default=4, help="number of processes of the parallel steps")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=head_location) as folder:
+        os.makedirs(os.path.join(folder, 'reference'))
+        with open(os.path.join(head_location, 'resources', 'ontologies', DOMAIN + '.json')) as f:
+            ontology = json.load(f)
+        ontology['informable']['name'] += [f'lecturer {idx}' for idx in range(args.values)]
+        ontology_file = os.path.join(folder, DOMAIN + '.json')
+
+        def load_domain():
+            with open(ontology_file, 'w') as f:
+                json.dump(ontology, f)
+            return JSONLookupDomain(DOMAIN, json_ontology_file=os.path.relpath(ontology_file, head_location))
+
+        template_file = os.path.join(folder, DOMAIN + '.nlu')
+        shutil.copy(os.path.join(head_location, 'resources', 'nlu_regexes', DOMAIN + '.nlu'), template_file)
+        # the reference generation reads its own copy of the template
+        shutil.copy(template_file, template_file + '.reference')
+        domain = load_domain()
+        print(f"{DOMAIN} with {sum(len(values) for values in ontology['informable'].values())} values")
+        print(f"{'step':<28}{'workers':>8}{'created':>10}{'seconds':>10}")
+        generate('cold', domain, template_file, folder, 1, use_cache=False, check=False)
+        generate('cold', domain, template_file, folder, args.workers, use_cache=False)
+        generate('unchanged', domain, template_file, folder, args.workers)
+        for file in (template_file, template_file + '.reference'):
+            with open(file) as f:
+                template = f.read()
+            assert EDITED_LINE in template
+            with open(file, 'w') as f:
+                f.write(template.replace(EDITED_LINE, EDITED_LINE.replace('"\n', '(\\\\ please)?"\n'), 1))
+        generate('template edit', domain, template_file, folder, args.workers)
+        ontology['informable']['department'].append('linguistics')
+        domain = load_domain()
+        generate('value added', domain, template_file, folder, args.workers)
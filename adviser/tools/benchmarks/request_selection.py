@@ -0,0 +1,99 @@
+############################################################################################
+#
+# Copyright 2020, University of Stuttgart: Institute for Natural Language Processing (IMS)
+#
+# This file is part of Adviser.
+# Adviser is free software: you can redistribute it and/or modify'
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3.
+#
+# Adviser is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Adviser.  If not, see <https://www.gnu.org/licenses/>.
+#
+############################################################################################
+
+
+"""
+Measures the time the handcrafted policy needs per turn to choose the slot to request next
+(`HandcraftedPolicy._gen_next_request`) for result sets of `--rows` candidates:
+
+    * rows: counting the values of each slot in the result rows (as done for API domains)
+    * sql: counting the values with `GROUP BY` queries (`JSONLookupDomain.distinct_value_counts`)
+    * columnar: counting the values with `bincount` over dictionary encoded columns
+                (`ColumnarLookupDomain.distinct_value_counts`)
+
+The entropy of the values of all open slots is computed in one vectorized pass for each of them
+(column "select ms").
+
+Usage (from the adviser folder):
+python tools/benchmarks/request_selection.py --rows 10000 100000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+head_location = os.path.abspath(os.path.join(os.path.abspath(__file__), '..', '..', '..'))  # main folder of adviser
+sys.path.append(head_location)
+
+from services.policy import HandcraftedPolicy
+from tools.benchmarks.domain_loading import create_synthetic_domain
+from utils.beliefstate import BeliefState
+from utils.domain.columnarlookupdomain import ColumnarLookupDomain
+from utils.domain.jsonlookupdomain import JSONLookupDomain
+
+COUNTERS = ('rows', 'sql', 'columnar')
+
+
+def count_rows(domain: JSONLookupDomain, slots):
+    """ Counts the values of the slots in all rows of the domain """
+    value_counts = defaultdict(lambda: defaultdict(int))
+    for result in domain.find_entities({}):
+        for slot in slots:
+            value_counts[slot][result[slot]] += 1
+    return value_counts
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-r", "--rows", type=int, nargs='+', default=[10000, 100000],
+                        help="numbers of candidates (rows of the synthetic database)")
+    parser.add_argument("-n", "--repeats", type=int, default=20, help="number of turns per measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        print(f"{'rows':>10}{'counter':>10}{'count ms':>10}{'select ms':>11}{'slot':>10}")
+        for num_rows in args.rows:
+            os.makedirs(os.path.join(folder, str(num_rows)))
+            name, ontology_file, db_file = create_synthetic_domain(os.path.join(folder, str(num_rows)), num_rows)
+            files = dict(json_ontology_file=os.path.relpath(ontology_file, head_location),
+                         sqllite_db_file=os.path.relpath(db_file, head_location))
+            domains = {'rows': JSONLookupDomain(name, cache_size=0, **files),
+                       'sql': JSONLookupDomain(name, cache_size=0, **files),
+                       'columnar': ColumnarLookupDomain(name, **files)}
+            for counter in COUNTERS:
+                domain = domains[counter]
+                policy = HandcraftedPolicy(domain, prefer_non_binary=False)
+                beliefstate = BeliefState(domain)
+                slots = domain.get_system_requestable_slots()
+                count_seconds, select_seconds = 0, 0
+                for _ in range(args.repeats):
+                    start = time.perf_counter()
+                    if counter == 'rows':
+                        value_counts = count_rows(domain, slots)
+                    else:
+                        value_counts = domain.distinct_value_counts({}, slots)
+                    counted = time.perf_counter()
+                    slot = policy._gen_next_request(value_counts, beliefstate)
+                    count_seconds += counted - start
+                    select_seconds += time.perf_counter() - counted
+                print(f"{num_rows:>10}{counter:>10}{count_seconds / args.repeats * 1000:>10.3f}"
+                      f"{select_seconds / args.repeats * 1000:>11.3f}{slot:>10}")
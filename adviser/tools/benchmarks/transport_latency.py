@@ -0,0 +1,79 @@
+###############################################################################
+#
+# Copyright 2020, University of Stuttgart: Institute for Natural Language Processing (IMS)
+#
+# This file is part of Adviser.
+# Adviser is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3.
+#
+# Adviser is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Adviser.  If not, see <https://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+"""
+Compares the mean latency per dialog turn (simulated user -> BST -> policy -> simulated user)
+of the zmq transport and the in-process transport (with and without copying published messages).
+
+Usage (from the adviser folder):
+python tools/benchmarks/transport_latency.py --dialogs 200
+"""
+
+import argparse
+import os
+import sys
+import time
+
+head_location = os.path.abspath(os.path.join(os.path.abspath(__file__), '..', '..', '..'))  # main folder of adviser
+sys.path.append(head_location)
+
+from services.bst import HandcraftedBST
+from services.policy import HandcraftedPolicy
+from services.service import DialogSystem
+from services.simulator.simulator import HandcraftedUserSimulator
+from services.stats.evaluation import PolicyEvaluator
+from services.transport import LocalTransport, ZMQTransport
+from utils import common
+from utils.domain.jsonlookupdomain import JSONLookupDomain
+from utils.logger import DiasysLogger, LogLevel
+
+
+def measure(domain: JSONLookupDomain, transport, num_dialogs: int):
+    """ Runs `num_dialogs` simulated dialogs and returns the number of turns, elapsed time and success rate """
+    common.init_random(0)
+    logger = DiasysLogger(console_log_lvl=LogLevel.NONE)
+    evaluator = PolicyEvaluator(domain=domain, logger=logger)
+    ds = DialogSystem(services=[HandcraftedUserSimulator(domain, logger=logger),
+                                HandcraftedBST(domain=domain),
+                                HandcraftedPolicy(domain=domain, logger=logger),
+                                evaluator],
+                      transport=transport)
+    start_signals = {f'user_acts/{domain.get_domain_name()}': []}
+    start = time.perf_counter()
+    for _ in range(num_dialogs):
+        ds.run_dialog(start_signals)
+    elapsed = time.perf_counter() - start
+    ds.shutdown()
+    return sum(evaluator.eval_turns), elapsed, sum(evaluator.eval_success) / max(num_dialogs, 1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-d", "--domain", default="ImsLecturers", help="name of the domain")
+    parser.add_argument("-n", "--dialogs", type=int, default=200, help="number of dialogs per transport")
+    args = parser.parse_args()
+
+    domain = JSONLookupDomain(args.domain)
+    transports = [('zmq', ZMQTransport()),
+                  ('local', LocalTransport()),
+                  ('local (no copy)', LocalTransport(copy_on_publish=False))]
+    print(f"{'transport':<18}{'turns':>8}{'seconds':>10}{'ms/turn':>10}{'success':>10}")
+    for name, transport in transports:
+        turns, elapsed, success = measure(domain, transport, args.dialogs)
+        print(f"{name:<18}{turns:>8}{elapsed:>10.2f}{1000 * elapsed / max(turns, 1):>10.3f}{success:>10.2f}")
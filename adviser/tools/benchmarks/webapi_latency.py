@@ -0,0 +1,121 @@
+############################################################################################
+#
+# Copyright 2020, University of Stuttgart: Institute for Natural Language Processing (IMS)
+#
+# This file is part of Adviser.
+# Adviser is free software: you can redistribute it and/or modify'
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3.
+#
+# Adviser is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Adviser.  If not, see <https://www.gnu.org/licenses/>.
+#
+############################################################################################
+
+
+"""
+Measures the latency of a world knowledge question whose topic matches several knowledge graph entities
+(one SPARQL query each), answered by a local stub server with a simulated round-trip time:
+
+    * sequential: one `requests.post` after the other, each opening a new connection (the former behaviour)
+    * client: all queries at the same time through the shared `HTTPClient` (connections kept alive, no cache)
+    * cached: the same question again (responses cached)
+    * sessions: `--sessions` sessions asking the same new question at the same time (identical requests coalesced)
+
+Usage (from the adviser folder):
+python tools/benchmarks/webapi_latency.py --topics 4 --latency 0.05
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+import requests
+
+head_location = os.path.abspath(os.path.join(os.path.abspath(__file__), '..', '..', '..'))  # main folder of adviser
+sys.path.append(head_location)
+
+from examples.qa.worldknowledge.domain import SPARQL_PARAMS, WorldKnowledgeDomain
+from tools.httpstub import StubServer
+from utils.domain.httpclient import HTTPClient
+
+BINDINGS = {'results': {'bindings': [{'itemLabel': {'value': f'answer{idx}'}} for idx in range(5)]}}
+
+
+class SyntheticLexiconDomain(WorldKnowledgeDomain):
+    """ World knowledge domain with a synthetic name lexicon: each topic matches `num_topics` entities """
+
+    num_topics = 4
+
+    def _init_name_lexicon(self):
+        return {f'topic{question}': [{'id': f'Q{question}{idx}', 'label': f'entity {idx}'}
+                                     for idx in range(self.num_topics)] for question in range(10000)}
+
+
+def sequential_find_entities(domain: WorldKnowledgeDomain, constraints: dict):
+    """ The former implementation: one blocking request per topic entity """
+    answers = []
+    for topic_id, topic_label in domain._find_topic_entities(constraints['topic']):
+        query = domain._get_out_query(constraints['relation'], topic_id)
+        data = requests.post(domain.sparql_url, params=SPARQL_PARAMS, data={'query': query}).json()
+        answers += domain._get_labels(data)
+    return answers
+
+
+def measure(find_entities, questions) -> float:
+    """ Returns the median latency in ms """
+    latencies = []
+    for question in questions:
+        start = time.perf_counter()
+        find_entities({'relation': 'P17', 'topic': question, 'direction': 'out'})
+        latencies.append((time.perf_counter() - start) * 1000)
+    return statistics.median(latencies)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-t", "--topics", type=int, default=4, help="number of entities matching a topic")
+    parser.add_argument("-l", "--latency", type=float, default=0.05, help="simulated round-trip time in seconds")
+    parser.add_argument("-q", "--questions", type=int, default=20, help="number of questions per measurement")
+    parser.add_argument("-s", "--sessions", type=int, default=8, help="number of concurrent sessions")
+    args = parser.parse_args()
+
+    SyntheticLexiconDomain.num_topics = args.topics
+    with StubServer({'/sparql': lambda params: BINDINGS}, latency=args.latency) as server:
+        client = HTTPClient()
+        domain = SyntheticLexiconDomain(sparql_url=server.url + '/sparql', client=client)
+        questions = [f'topic{idx}' for idx in range(args.questions)]
+        print(f"{args.topics} topic entities, {args.latency * 1000:.0f} ms round-trip")
+        print(f"{'mode':<12}{'p50 ms':>10}{'requests':>10}{'connections':>13}")
+        for mode in ('sequential', 'client', 'cached'):
+            requests_before, connections_before = server.requests['/sparql'], server.connections
+            if mode == 'sequential':
+                latency = measure(lambda constraints: sequential_find_entities(domain, constraints), questions)
+            else:
+                latency = measure(domain.find_entities, questions)
+            print(f"{mode:<12}{latency:>10.1f}{server.requests['/sparql'] - requests_before:>10}"
+                  f"{server.connections - connections_before:>13}")
+
+        requests_before = server.requests['/sparql']
+        latencies = []
+        def ask(question):
+            start = time.perf_counter()
+            domain.find_entities({'relation': 'P17', 'topic': question, 'direction': 'out'})
+            latencies.append((time.perf_counter() - start) * 1000)
+        for question in range(args.questions, 2 * args.questions):
+            threads = [threading.Thread(target=ask, args=(f'topic{question}',)) for _ in range(args.sessions)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        print(f"{'sessions':<12}{statistics.median(latencies):>10.1f}"
+              f"{server.requests['/sparql'] - requests_before:>10}{'':>13}")
+        client.close()
@@ -0,0 +1,128 @@
+############################################################################################
+#
+# Copyright 2020, University of Stuttgart: Institute for Natural Language Processing (IMS)
+#
+# This file is part of Adviser.
+# Adviser is free software: you can redistribute it and/or modify'
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3.
+#
+# Adviser is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Adviser.  If not, see <https://www.gnu.org/licenses/>.
+#
+############################################################################################
+
+
+""" Local HTTP server answering requests with JSON, used to test and benchmark the web API domains
+    without network access (see `utils.domain.httpclient`).
+
+Example:
+    with StubServer({'/forecast': lambda params: {'list': []}}, latency=0.05) as server:
+        domain = WeatherDomain(api_url=server.url)
+"""
+
+import json
+import socket
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict
+from urllib.parse import parse_qsl, urlsplit
+
+
+class StubServer(object):
+    """ HTTP/1.1 server (keeping connections alive) in a background thread, answering each request path with
+        the JSON returned by its route for the query and form parameters of the request.
+
+    Attributes:
+        requests (Counter): number of requests per path
+        connections (int): number of connections opened by clients
+    """
+
+    def __init__(self, routes: Dict[str, Callable[[dict], Any]], latency: float = 0.0, port: int = 0):
+        """
+        Args:
+            routes (Dict[str, Callable[[dict], Any]]): path -> function returning the response for the parameters
+            latency (float): seconds each request is delayed, like the round-trip to a remote server
+            port (int): port to listen on (0 chooses a free port)
+        """
+        self.routes = routes
+        self.latency = latency
+        self.requests = Counter()
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._create_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """ The base URL of the server """
+        return 'http://127.0.0.1:%d' % self._server.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _create_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                # send small responses right away (like web servers do), the headers and the body are written
+                # separately and would wait for the delayed acknowledgement of the client
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with stub._lock:
+                    stub.connections += 1
+
+            def do_GET(self):
+                self._respond({})
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode('utf-8')
+                self._respond(dict(parse_qsl(body)))
+
+            def _respond(self, params: dict):
+                url = urlsplit(self.path)
+                params.update(parse_qsl(url.query))
+                with stub._lock:
+                    stub.requests[url.path] += 1
+                time.sleep(stub.latency)
+                if url.path in stub.routes:
+                    try:
+                        status, body = 200, json.dumps(stub.routes[url.path](params)).encode('utf-8')
+                    except Exception as error:
+                        status, body = 500, json.dumps({'error': str(error)}).encode('utf-8')
+                else:
+                    status, body = 404, b'{}'
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -18,55 +18,154 @@
 ###############################################################################
 
 import argparse
+import hashlib
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 
 head_location = os.path.abspath(os.path.join(os.path.abspath(__file__), '..', '..', '..')) # main folder of adviser
 sys.path.append(head_location)
 
 import json
+from services.nlu.artifact import CompiledRules, get_artifact_file, get_rule_files, hash_files
+from utils.common import Language
 from utils.domain.jsonlookupdomain import JSONLookupDomain
 from utils.useract import UserAct, UserActionType
 from tools.regextemplates.rules.regexfile import RegexFile
 
+# increase when the regexes created from unchanged templates change
+CACHE_VERSION = 1
 
-def _write_dict_to_file(dict_object: dict, filename: str):
-    file_path = os.path.join(head_location, 'resources', 'nlu_regexes', filename)
+
+def _write_dict_to_file(dict_object: dict, filename: str, folder: str = None):
+    file_path = os.path.join(folder or os.path.join(head_location, 'resources', 'nlu_regexes'), filename)
     with open(file_path, 'w', encoding='utf-8') as file:
         json.dump(dict_object, file, sort_keys=True)
 
 
-def _create_request_json(domain: JSONLookupDomain, template: RegexFile):
-    request_regex_json = {}
-    for slot in domain.get_requestable_slots():
-        request_act = UserAct(act_type=UserActionType.Request, slot=slot)
-        request_regex_json[slot] = template.create_regex(request_act)
-    return request_regex_json
+def _create_regexes(template: RegexFile, domain: JSONLookupDomain, intent: str, slot: str):
+    """ Returns the regex of a request or the regexes of the values of an inform of the slot, and the
+        dependencies (rules, functions) they were created from """
+    with template.global_memory.record() as dependencies:
+        if intent == 'request':
+            regexes = template.create_regex(UserAct(act_type=UserActionType.Request, slot=slot))
+        else:
+            regexes = {value: template.create_regex(UserAct(act_type=UserActionType.Inform, slot=slot, value=value))
+                       for value in domain.get_possible_values(slot)}
+    return regexes, sorted(dependencies)
+
+
+# template of a worker process, see `_init_worker`
+_worker_template = None
+
+
+def _init_worker(domain: JSONLookupDomain, template_filename: str):
+    global _worker_template
+    _worker_template = RegexFile(template_filename, domain)
+
+
+def _create_regexes_in_worker(intent: str, slot: str):
+    return _create_regexes(_worker_template, _worker_template.global_memory.domain, intent, slot)
+
+
+def _hash_values(values) -> str:
+    return hashlib.sha256(json.dumps(values, sort_keys=True).encode()).hexdigest()
 
 
-def _create_inform_json(domain: JSONLookupDomain, template: RegexFile):
-    inform_regex_json = {}
-    for slot in domain.get_informable_slots():
-        inform_regex_json[slot] = {}
-        for value in domain.get_possible_values(slot):
-            inform_act = UserAct(act_type=UserActionType.Inform, slot=slot, value=value)
-            inform_regex_json[slot][value] = template.create_regex(inform_act)
-    return inform_regex_json
+def _load_cache(cache_file: str, domain_name: str) -> dict:
+    try:
+        with open(cache_file, encoding='utf-8') as file:
+            cache = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    if cache.get('version') != CACHE_VERSION or cache.get('domain') != domain_name:
+        return {}
+    return cache['slots']
 
 
-def create_json_from_template(domain: JSONLookupDomain, template_filename: str):
+def create_json_from_template(domain: JSONLookupDomain, template_filename: str, workers: int = 1,
+                              use_cache: bool = True, folder: str = None) -> int:
+    """ Writes the request and inform rules of the domain created from the template (to resources/nlu_regexes by
+    default or to `folder`)
+
+    The regexes of every slot are cached in `{template_filename}.cache` together with the hashes of the values of
+    the slot and of the rules and functions of the template they were created from. Only the regexes of slots with
+    changed values or dependencies are created again, independent slots are distributed to `workers` processes.
+
+    Returns:
+        int -- number of slots whose regexes were created
+    """
     template = RegexFile(template_filename, domain)
     domain_name = domain.get_domain_name()
-    _write_dict_to_file(_create_request_json(domain, template), f'{domain_name}RequestRules.json')
-    _write_dict_to_file(_create_inform_json(domain, template), f'{domain_name}InformRules.json')
+    fingerprints = template.get_fingerprints()
+    db_file = os.path.join('resources', 'databases', f'{domain_name}.db')
+    if os.path.exists(os.path.join(head_location, db_file)):
+        fingerprints['database'] = hash_files(head_location, [db_file])
+    cache_file = template_filename + '.cache'
+    cache = _load_cache(cache_file, domain_name) if use_cache else {}
+
+    jobs = [('request', slot) for slot in domain.get_requestable_slots()]
+    jobs += [('inform', slot) for slot in domain.get_informable_slots()]
+    entries = {}
+    changed_jobs = []
+    for intent, slot in jobs:
+        values_hash = _hash_values(domain.get_possible_values(slot)) if intent == 'inform' else None
+        entry = cache.get(f'{intent} {slot}')
+        if entry is not None and entry['values'] == values_hash and all(
+                fingerprint is not None and fingerprints.get(dependency) == fingerprint
+                for dependency, fingerprint in entry['dependencies'].items()):
+            entries[f'{intent} {slot}'] = entry
+        else:
+            changed_jobs.append((intent, slot, values_hash))
+
+    if workers > 1 and len(changed_jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(changed_jobs)), initializer=_init_worker,
+                                 initargs=(domain, template_filename)) as executor:
+            results = list(executor.map(_create_regexes_in_worker, [intent for intent, _, _ in changed_jobs],
+                                        [slot for _, slot, _ in changed_jobs]))
+    else:
+        results = [_create_regexes(template, domain, intent, slot) for intent, slot, _ in changed_jobs]
+    for (intent, slot, values_hash), (regexes, dependencies) in zip(changed_jobs, results):
+        entries[f'{intent} {slot}'] = {'values': values_hash, 'regexes': regexes, 'dependencies': {
+            dependency: fingerprints.get(dependency) for dependency in dependencies}}
+
+    with open(cache_file, 'w', encoding='utf-8') as file:
+        json.dump({'version': CACHE_VERSION, 'domain': domain_name, 'slots': entries}, file)
+    _write_dict_to_file({slot: entries[f'request {slot}']['regexes'] for slot in domain.get_requestable_slots()},
+                        f'{domain_name}RequestRules.json', folder)
+    _write_dict_to_file({slot: entries[f'inform {slot}']['regexes'] for slot in domain.get_informable_slots()},
+                        f'{domain_name}InformRules.json', folder)
+    return len(changed_jobs)
+
+
+def create_compiled_rules(domain: JSONLookupDomain, template_filename: str = None,
+                          language: Language = Language.ENGLISH):
+    """ Writes the artifact of the compiled rules loaded by the NLU, keyed by a hash of the template, the ontology
+        and the JSON rule files of the domain (see `services.nlu.artifact`) """
+    folder = os.path.join(head_location, 'resources', 'nlu_regexes')
+    domain_name = domain.get_domain_name()
+    rules = CompiledRules.from_json(folder, domain_name, language, domain.get_requestable_slots(),
+                                    domain.get_informable_slots())
+    sources = [os.path.join('resources', 'ontologies', f'{domain_name}.json')]
+    sources += [os.path.join('resources', 'nlu_regexes', filename) for filename in get_rule_files(domain_name, language)]
+    if template_filename is not None:
+        sources.insert(0, os.path.relpath(template_filename, head_location))
+    rules.save(os.path.join(folder, get_artifact_file(domain_name, language)), head_location, sources)
 
 
 if __name__ == '__main__':
     # command line arguments
     parser = argparse.ArgumentParser()
     parser.add_argument("domain", help="name of the domain")
-    parser.add_argument("filename", help="name of your .nlu file without the .nlu ending (e.g.: resources/nlu_regexes/YOURNLUFILE.nlu -> provide YOURFILE)")
+    parser.add_argument("filename", nargs='?', help="name of your .nlu file without the .nlu ending (e.g.: resources/nlu_regexes/YOURNLUFILE.nlu -> provide YOURFILE), if omitted, only the existing JSON files are compiled")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="number of processes creating the regexes")
+    parser.add_argument("--no-cache", action='store_true', help="create the regexes of all slots again")
+    parser.add_argument("--german", action='store_true', help="compile the German JSON files (without a .nlu file)")
     args = parser.parse_args()
-    nlu_file = os.path.join(head_location, 'resources', 'nlu_regexes', f"{args.filename}.nlu")
     dom = JSONLookupDomain(args.domain)
-    create_json_from_template(dom, nlu_file)
+    if args.filename is not None and not args.german:
+        nlu_file = os.path.join(head_location, 'resources', 'nlu_regexes', f"{args.filename}.nlu")
+        create_json_from_template(dom, nlu_file, workers=args.workers, use_cache=not args.no_cache)
+        create_compiled_rules(dom, nlu_file)
+    else:
+        create_compiled_rules(dom, language=Language.GERMAN if args.german else Language.ENGLISH)
@@ -24,6 +24,8 @@ class Command:
     def __init__(self, arguments: str):
         self.arguments = arguments
         self.inner_commands = []
+        # lines of the rule file defining a top level command (including its block)
+        self.source = None
 
     def are_arguments_valid(self) -> bool:
         raise NotImplementedError()
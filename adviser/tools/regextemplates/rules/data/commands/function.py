@@ -17,7 +17,7 @@
 #
 ###############################################################################
 
-from typing import List
+from typing import Hashable, List
 from random import choices
 
 from tools.regextemplates.rules.data.commands.command import Command
@@ -30,6 +30,14 @@ from tools.regextemplates.rules.parsing.parsers.functionparser.functionparser im
 FUNCTION_PARSER = FunctionParser()
 
 
+def _freeze(value: object) -> Hashable:
+    """ Returns a hashable copy of the (argument) value, raises a TypeError if it can't be hashed """
+    if isinstance(value, (list, tuple)):
+        return type(value).__name__, tuple(_freeze(item) for item in value)
+    hash(value)
+    return value
+
+
 class Function(Command):
     def __init__(self, arguments: str):
         Command.__init__(self, arguments)
@@ -41,6 +49,8 @@ class Function(Command):
         self.messages = []
         self.special_cases = []
         self.additions = []
+        # argument values -> (output, dependencies), the output only depends on the arguments
+        self._outputs = {}
 
     def _parse_arguments(self):
         parsed_objects = FUNCTION_PARSER.parse(self.arguments.replace(' ', ''))
@@ -77,6 +87,21 @@ class Function(Command):
         return len(parameters.variables) == len(self.argument_names)
 
     def apply(self, parameters: Memory = None) -> str:
+        try:
+            key = _freeze([variable.value for variable in parameters.variables])
+        except TypeError:
+            return self._apply(parameters)
+        global_memory = parameters.global_memory
+        if key not in self._outputs:
+            with global_memory.record() as dependencies:
+                output = self._apply(parameters)
+            self._outputs[key] = output, frozenset(dependencies)
+        output, dependencies = self._outputs[key]
+        # the functions called by this function are dependencies of the caller as well
+        global_memory.add_dependencies(dependencies)
+        return output
+
+    def _apply(self, parameters: Memory) -> str:
         argument_values = [variable.value for variable in parameters.variables]
         if self.free_parameter is not None:
             variables = self._build_memory_with_free_parameter(argument_values,
@@ -21,6 +21,7 @@ from typing import List
 
 from tools.regextemplates.rules.data.commands.command import Command
 from tools.regextemplates.rules.data.commands.probability import Probability
+from tools.regextemplates.rules.data.expressions.expression import Expression
 from tools.regextemplates.rules.data.memory import Memory
 from tools.regextemplates.rules.parsing.parsers.messageparser.messageparser import MessageParser
 from tools.regextemplates.rules.parsing.parsers.messageparser.data.messagecomponent import MessageComponent, MessageComponentType
@@ -37,6 +38,8 @@ class Message(Command):
 
         self.components = self._parse_message()
         self.score = 1.0
+        # index of a code component -> its parsed expression (parsed when the message is applied the first time)
+        self._expressions = {}
 
     def _parse_message(self) -> List[MessageComponent]:
         return MESSAGE_PARSER.parse(self.arguments)
@@ -59,12 +62,16 @@ class Message(Command):
 
     def apply(self, parameters: Memory) -> str:
         output = ''
-        for component in self.components:
+        for index, component in enumerate(self.components):
             if component.component_type == MessageComponentType.STRING:
                 output += component.value
             elif component.component_type == MessageComponentType.ADVISER_CODE or \
                 component.component_type == MessageComponentType.PYTHON_CODE:
-                code = component.value + '$'  # CodeParser expects end of statement
-                expression = CODE_PARSER.parse(code)[0]
-                output += expression.evaluate(parameters)
+                output += self._get_expression(index).evaluate(parameters)
         return output
+
+    def _get_expression(self, index: int) -> Expression:
+        if index not in self._expressions:
+            code = self.components[index].value + '$'  # CodeParser expects end of statement
+            self._expressions[index] = CODE_PARSER.parse(code)[0]
+        return self._expressions[index]
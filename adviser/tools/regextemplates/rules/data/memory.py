@@ -17,7 +17,8 @@
 #
 ###############################################################################
 
-from typing import Dict, List, Callable
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Callable, Set
 from utils.domain.jsonlookupdomain import JSONLookupDomain
 
 
@@ -63,7 +64,7 @@ class Memory:
         if function_name not in self.function_dict:
             if not self.global_memory or function_name not in self.global_memory.function_dict:
                 raise ValueError(f'No such function "{function_name}" found.')
-            return self.global_memory.function_dict[function_name]
+            return self.global_memory.get_function(function_name)
         return self.function_dict[function_name]
     
     def get_member(self, primary_key_value: str, attribute_name: str) -> str:
@@ -75,8 +76,31 @@ class GlobalMemory(Memory):
     def __init__(self, domain: JSONLookupDomain):
         Memory.__init__(self, None)
         self.domain = domain
-    
+        # open recordings of the used global functions, rules and the database (see `record`)
+        self._recordings: List[Set[str]] = []
+
+    @contextmanager
+    def record(self) -> Iterator[Set[str]]:
+        """Records the dependencies (e.g. "function synonyms", "rule inform 0" or "database") used
+        in the context, recordings can be nested"""
+        recording = set()
+        self._recordings.append(recording)
+        try:
+            yield recording
+        finally:
+            self._recordings.pop()
+
+    def add_dependencies(self, dependencies: Iterable[str]):
+        for recording in self._recordings:
+            recording.update(dependencies)
+
+    def get_function(self, function_name: str) -> 'Function':
+        function = Memory.get_function(self, function_name)
+        self.add_dependencies([f'function {function_name}'])
+        return function
+
     def get_member(self, primary_key_value: str, attribute_name: str) -> str:
+        self.add_dependencies(['database'])
         primary_key_name = self.domain.get_primary_key()
         table_name = self.domain.get_domain_name()
         query_result = self.domain.query_db(
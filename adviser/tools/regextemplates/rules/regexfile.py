@@ -17,6 +17,7 @@
 #
 ###############################################################################
 
+import hashlib
 import os
 import sys
 
@@ -107,11 +108,31 @@ class RegexFile:
             str -- the message returned by the rule
         """
         slots = self._create_memory_from_user_act(user_act)
-        for rule in self._rules[user_act.type.value]:
+        intent = user_act.type.value
+        for index, rule in enumerate(self._rules[intent]):
             if rule.is_applicable(slots):
+                # the regex depends on the applied rule and on the rules checked before
+                self.global_memory.add_dependencies([f'rule {intent} {i}' for i in range(index + 1)])
                 return rule.apply(slots)
         raise BaseException('No rule was found for the given system act.')
 
+    def get_fingerprints(self) -> Dict[str, str]:
+        """Returns hashes of the sources of the rules and functions, by the names under which the
+        global memory records them as dependencies (python functions are left out)
+
+        Returns:
+            Dict[str, str] -- e.g. "rule inform 0" or "function synonyms" -> hash
+        """
+        fingerprints = {}
+        for intent, rules in self._rules.items():
+            for index, rule in enumerate(rules):
+                fingerprints[f'rule {intent} {index}'] = _hash(rule.source)
+        for function in self.global_memory.functions:
+            if not isinstance(function, PythonFunction):
+                # the source of built-in functions is None
+                fingerprints[f'function {function.function_name}'] = _hash(function.source)
+        return fingerprints
+
     def _create_memory_from_user_act(self, user_act: UserAct) -> Memory:
         slots = Memory(self.global_memory)
         if user_act.slot is not None:
@@ -135,6 +156,10 @@ class RegexFile:
                                                        obligatory_arguments))
 
 
+def _hash(source: str) -> str:
+    return hashlib.sha256(str(source).encode()).hexdigest()
+
+
 class _RuleFileReader:
     def __init__(self, filename: str):
         self._filename = filename
@@ -213,9 +238,12 @@ class _RuleFileReader:
 
     def _add_new_command(self):
         if self._current_block_level == 0:
+            self._current_command.source = self._current_line
             self._add_top_level_command()
         else:
             self._command_stack[-1].add_inner_command(self._current_command)
+            # the lines of a block are part of the source of its top level command
+            self._command_stack[0].source += '\n' + self._current_line
         self._command_stack.append(self._current_command)
 
     def _add_top_level_command(self):
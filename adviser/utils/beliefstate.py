@@ -19,11 +19,86 @@
 
 """ This module provides the BeliefState class. """
 
-import copy
+from typing import List
 
 from utils.domain.jsonlookupdomain import JSONLookupDomain
 
 
+def _copy_turn(turn: dict) -> dict:
+    """ Copies the containers of a turn's belief state (sets, lists and dicts up to two levels deep),
+        all other values (numbers, strings, booleans) are shared with the original turn """
+    turn_copy = {}
+    for key, value in turn.items():
+        if isinstance(value, dict):
+            value = {inner_key: inner_value.copy() if isinstance(inner_value, (dict, set, list)) else inner_value
+                     for inner_key, inner_value in value.items()}
+        elif isinstance(value, (set, list)):
+            value = value.copy()
+        turn_copy[key] = value
+    return turn_copy
+
+
+def _diff_turns(previous: dict, current: dict) -> dict:
+    """ Returns the changes from the `previous` to the `current` turn's belief state:
+        replaced entries (`'set'`), removed entries (`'del'`) and for dictionaries present in both turns
+        the replaced / removed items (`'patch'`) """
+    changes = {'set': {}, 'del': [key for key in previous if key not in current], 'patch': {}}
+    for key, value in current.items():
+        if key not in previous:
+            changes['set'][key] = value
+            continue
+        previous_value = previous[key]
+        if value is previous_value:
+            continue
+        if isinstance(value, dict) and isinstance(previous_value, dict):
+            updated = {inner_key: inner_value for inner_key, inner_value in value.items()
+                       if inner_key not in previous_value or previous_value[inner_key] != inner_value}
+            removed = [inner_key for inner_key in previous_value if inner_key not in value]
+            if updated or removed:
+                changes['patch'][key] = {'set': updated, 'del': removed}
+        elif value != previous_value:
+            changes['set'][key] = value
+    return changes
+
+
+def _apply_turn_diff(previous: dict, changes: dict) -> dict:
+    """ Creates the turn described by `changes` (see `_diff_turns`) relative to the `previous` turn.
+        Unchanged entries are shared with the previous turn. """
+    turn = dict(previous)
+    for key in changes['del']:
+        del turn[key]
+    turn.update(changes['set'])
+    for key, patch in changes['patch'].items():
+        value = dict(turn[key])
+        for inner_key in patch['del']:
+            del value[inner_key]
+        value.update(patch['set'])
+        turn[key] = value
+    return turn
+
+
+class BeliefStateDelta:
+    """
+    The changes of a belief state's turn history since the turns a subscriber already knows.
+
+    Published instead of full belief states (see `services.service.PublishSubscribe`), subscribers
+    apply it to their local replica of the belief state (see `BeliefState.apply_delta`).
+    """
+    def __init__(self, domain: JSONLookupDomain, base: int, turns: List[dict]):
+        """
+        Args:
+            domain (JSONLookupDomain): domain of the belief state
+            base (int): number of turns the replica has to keep (0: replace the whole history)
+            turns (List[dict]): changes of each following turn relative to its predecessor
+        """
+        self.domain = domain
+        self.base = base
+        self.turns = turns
+
+    def __repr__(self):
+        return f"BeliefStateDelta(base={self.base}, turns={self.turns})"
+
+
 class BeliefState:
     """
     A representation of the belief state, can be accessed like a dictionary.
@@ -96,8 +171,43 @@ class BeliefState:
         to ensure the correct history can be accessed correctly by other modules
         """
 
-        # copy last turn's dict
-        self._history.append(copy.deepcopy(self._history[-1]))
+        # copy last turn's dict (the history of previous turns is never copied)
+        self._history.append(_copy_turn(self._history[-1]))
+
+    def get_delta(self, base: int = 0) -> BeliefStateDelta:
+        """ Returns the changes of all turns after the first `base` turns.
+
+        The current turn is always part of the delta, even if `base` already includes it
+        (it might have been modified since).
+
+        Args:
+            base (int): number of turns a subscriber already knows (0: send the whole history)
+        """
+        base = min(base, len(self._history) - 1)
+        turns = [_diff_turns(self._history[idx - 1] if idx > 0 else {}, self._history[idx])
+                 for idx in range(base, len(self._history))]
+        return BeliefStateDelta(self.domain, base, turns)
+
+    def apply_delta(self, delta: BeliefStateDelta):
+        """ Updates this belief state (a replica of the published one) with the changes of a delta.
+
+        Args:
+            delta (BeliefStateDelta): changes created by `get_delta` of the published belief state
+        """
+        if delta.base > len(self._history):
+            raise ValueError(f"belief state delta starts at turn {delta.base}, but only "
+                             f"{len(self._history)} turns are known")
+        self.domain = delta.domain
+        del self._history[delta.base:]
+        for changes in delta.turns:
+            self._history.append(_apply_turn_diff(self._history[-1] if self._history else {}, changes))
+
+    def fork(self) -> 'BeliefState':
+        """ Returns a belief state sharing the history of this one, with a private copy of the current turn """
+        beliefstate = BeliefState.__new__(BeliefState)
+        beliefstate.domain = self.domain
+        beliefstate._history = self._history[:-1] + [_copy_turn(self._history[-1])]
+        return beliefstate
 
     def _init_beliefstate(self):
         """Initializes the belief state based on the currently active domain
@@ -224,24 +334,22 @@ class BeliefState:
         candidates = self.get_most_probable_inf_beliefs(consider_NONE=True, threshold=0.7,
                                                         max_results=1)
         constraints = self._remove_dontcare_slots(candidates)
-        db_matches = self.domain.find_entities(constraints)
-        num_matches = len(db_matches)
+        num_matches = self.domain.count_entities(constraints)
 
         # check if matching db entities could be discriminated by more
         # information from user
         discriminable = False
-        if len(db_matches) > 1:
+        if num_matches > 1:
             dontcare_slots = set(candidates.keys()) - set(constraints.keys())
-            informable_slots = set(self.domain.get_informable_slots()) - set(self.domain.get_primary_key())
-            for informable_slot in informable_slots:
-                if informable_slot not in dontcare_slots:
-                    # this slot could be used to gather more information
-                    db_values_for_slot = set()
-                    for db_match in db_matches:
-                        db_values_for_slot.add(db_match[informable_slot])
-                    if len(db_values_for_slot) > 1:
-                        # at least 2 different values for slot
-                        # ->can use this slot to differentiate between entities
-                        discriminable = True
-                        break
+            # a slot could be used to gather more information if the matching entities have
+            # at least 2 different values for it
+            slots = [slot for slot in self.domain.get_informable_slots() if slot not in dontcare_slots]
+            primary_key = self.domain.get_primary_key()
+            value_counts = self.domain.distinct_value_counts(
+                constraints, [slot for slot in slots if slot != primary_key])
+            discriminable = any(len(counts) > 1 for counts in value_counts.values())
+            if not discriminable and primary_key in slots:
+                # only count the (many) values of the primary key if needed
+                value_counts = self.domain.distinct_value_counts(constraints, [primary_key])
+                discriminable = len(value_counts[primary_key]) > 1
         return num_matches, discriminable
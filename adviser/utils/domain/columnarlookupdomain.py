@@ -0,0 +1,206 @@
+############################################################################################
+#
+# Copyright 2020, University of Stuttgart: Institute for Natural Language Processing (IMS)
+#
+# This file is part of Adviser.
+# Adviser is free software: you can redistribute it and/or modify'
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3.
+#
+# Adviser is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Adviser.  If not, see <https://www.gnu.org/licenses/>.
+#
+############################################################################################
+
+
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+from utils.domain.jsonlookupdomain import JSONLookupDomain, NOCASE
+
+# number of set bits of every byte value (np.bitwise_count requires NumPy 2)
+_POPCOUNT = np.array([bin(byte).count('1') for byte in range(256)], dtype=np.uint8)
+
+
+class _Column(object):
+    """ Dictionary encoded column of a table """
+
+    def __init__(self, values: list):
+        """
+        Args:
+            values (list): value of each row
+        """
+        # exact value -> code
+        self.codes_by_value = {value: code for code, value in enumerate(dict.fromkeys(values))}
+        self.values = np.empty(len(self.codes_by_value), dtype=object)
+        self.values[:] = list(self.codes_by_value)
+        self.codes = np.fromiter(map(self.codes_by_value.__getitem__, values), dtype=np.int32, count=len(values))
+        # case folded value -> codes of all values matching case insensitively, created by the first constraint
+        self._codes_by_folded_value = None
+
+    def get_matching_codes(self, folded_value: str) -> List[int]:
+        """ Returns the codes of all values matching the case folded value (NULL never matches) """
+        if self._codes_by_folded_value is None:
+            codes_by_folded_value = {}
+            for value, code in self.codes_by_value.items():
+                if value is not None:
+                    codes_by_folded_value.setdefault(str(value).translate(NOCASE), []).append(code)
+            self._codes_by_folded_value = codes_by_folded_value
+        return self._codes_by_folded_value.get(folded_value, [])
+
+
+class ColumnarLookupDomain(JSONLookupDomain):
+    """ Domain based on a JSON-ontology and a sqllite database, which loads the domain's table once into
+        dictionary encoded NumPy columns.
+
+        Constraints are answered by intersecting bitmaps of the rows matching each constrained value
+        (case insensitive, like `JSONLookupDomain`). Counting the matches (`count_entities`) or their
+        values (`distinct_value_counts`) doesn't create any row dictionaries. `find_entities` and
+        `find_info_about_entity` return the same rows as `JSONLookupDomain`.
+    """
+
+    def __init__(self, name: str, json_ontology_file: str = None, sqllite_db_file: str = None,
+                 display_name: str = None, in_memory: bool = True):
+        """ Loads the ontology from a json file and the table of the domain from a sqllite database.
+
+        Arguments:
+            name (str): the domain's name used as an identifier
+            json_ontology_file (str): relative path to the ontology file
+                                (from the top-level adviser directory, e.g. resources/ontologies)
+            sqllite_db_file (str): relative path to the database file
+                                (from the top-level adviser directory, e.g. resources/databases)
+            display_name (str): the domain's name as it appears on the screen
+                                (e.g. containing whitespaces)
+            in_memory (bool): see `JSONLookupDomain`, only used for loading the table
+        """
+        # all queries of the domain are answered by the columns: no result cache and indexes needed
+        super(ColumnarLookupDomain, self).__init__(name, json_ontology_file, sqllite_db_file, display_name,
+                                                   in_memory=in_memory, cache_size=0, indexes='none')
+        cursor = self.db.cursor()
+        cursor.row_factory = None
+        cursor.execute(f'SELECT * FROM "{self.get_domain_name()}"')
+        rows = cursor.fetchall()
+        self.column_names = [description[0] for description in cursor.description]
+        self.num_entities = len(rows)
+        self._columns = {column: _Column([row[idx] for row in rows]) for idx, column in enumerate(self.column_names)}
+        # (slot, case folded value) -> bitmap of the matching rows
+        self._bitmaps = {}
+
+    def _get_bitmap(self, slot: str, value) -> np.ndarray:
+        """ Returns the bitmap (packed bits, one per row) of the rows where the slot has the given value
+            (case insensitive)
+
+        Args:
+            slot (str): column of the table
+            value: value of the column
+        """
+        key = (slot, str(value).translate(NOCASE))
+        bitmap = self._bitmaps.get(key)
+        if bitmap is None:
+            column = self._columns[slot]
+            bitmap = np.packbits(np.isin(column.codes, column.get_matching_codes(key[1])))
+            self._bitmaps[key] = bitmap
+        return bitmap
+
+    def get_match_bitmap(self, constraints: dict):
+        """ Returns the bitmap (packed bits, one per row) of the entities meeting the constraints or None if
+            there are no constraints (all entities match)
+
+        Args:
+            constraints (dict): Slot-value mapping of constraints, 'dontcare' and None values are ignored
+        """
+        bitmap = None
+        for slot, value in constraints.items():
+            if value is None or str(value).lower() == 'dontcare':
+                continue
+            slot_bitmap = self._get_bitmap(slot, value)
+            bitmap = slot_bitmap if bitmap is None else np.bitwise_and(bitmap, slot_bitmap)
+        return bitmap
+
+    def get_match_indices(self, constraints: dict) -> np.ndarray:
+        """ Returns the (ascending) row indices of the entities meeting the constraints
+
+        Args:
+            constraints (dict): Slot-value mapping of constraints, 'dontcare' and None values are ignored
+        """
+        bitmap = self.get_match_bitmap(constraints)
+        if bitmap is None:
+            return np.arange(self.num_entities)
+        return np.flatnonzero(np.unpackbits(bitmap, count=self.num_entities))
+
+    def count_entities(self, constraints: dict) -> int:
+        """ Returns the number of entities meeting the constraints
+
+        Args:
+            constraints (dict): Slot-value mapping of constraints.
+                                If empty, all entities in the database are counted.
+        """
+        bitmap = self.get_match_bitmap(constraints)
+        if bitmap is None:
+            return self.num_entities
+        return int(_POPCOUNT[bitmap].sum(dtype=np.int64))
+
+    def distinct_value_counts(self, constraints: dict, slots: Iterable) -> Dict[str, Dict[object, int]]:
+        """ Returns how many entities meeting the constraints have each value of the given slots
+
+        Args:
+            constraints (dict): Slot-value mapping of constraints.
+                                If empty, all entities in the database are counted.
+            slots (Iterable): slots (columns) to count the values of
+
+        Returns:
+            (dict): slot -> value -> number of matching entities with this value (only values of matching entities)
+        """
+        indices = self.get_match_indices(constraints)
+        value_counts = {}
+        for slot in slots:
+            column = self._columns[slot]
+            counts = np.bincount(column.codes[indices], minlength=len(column.values))
+            codes = np.flatnonzero(counts)
+            value_counts[slot] = dict(zip(column.values[codes].tolist(), counts[codes].tolist()))
+        return value_counts
+
+    def _get_rows(self, indices: np.ndarray, columns: List[str]) -> List[dict]:
+        """ Returns the row dictionaries (column -> value) of the given row indices """
+        column_values = [self._columns[column].values[self._columns[column].codes[indices]].tolist()
+                         for column in columns]
+        return [dict(zip(columns, row)) for row in zip(*column_values)]
+
+    def find_entities(self, constraints: dict, requested_slots: Iterable = iter(())):
+        """ Returns all entities from the data backend that meet the constraints, with values for
+            the primary key and the system requestable slots (and optional slots, specifyable
+            via requested_slots).
+
+        Args:
+            constraints (dict): Slot-value mapping of constraints.
+                                If empty, all entities in the database will be returned.
+            requested_slots (Iterable): list of slots that should be returned in addition to the
+                                        system requestable slots and the primary key
+
+        """
+        columns = sorted(set([self.get_primary_key()]) | set(self.get_system_requestable_slots()) |
+                         set(requested_slots))
+        return self._get_rows(self.get_match_indices(constraints), columns)
+
+    def find_info_about_entity(self, entity_id, requested_slots: Iterable):
+        """ Returns the values (stored in the data backend) of the specified slots for the
+            specified entity.
+
+        Args:
+            entity_id (str): primary key value of the entity
+            requested_slots (dict): slot-value mapping of constraints
+
+        """
+        # If the user hasn't specified any slots we don't know what they want so we give everything
+        columns = sorted(requested_slots) if requested_slots else self.column_names
+        key_column = self._columns[self.get_primary_key()]
+        if entity_id not in key_column.codes_by_value:
+            return []
+        indices = np.flatnonzero(key_column.codes == key_column.codes_by_value[entity_id])
+        return self._get_rows(indices, columns)
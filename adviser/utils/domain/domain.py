@@ -17,6 +17,8 @@
 #
 ###############################################################################
 
+from collections import defaultdict
+from typing import Dict, Iterable
 
 class Domain(object):
     """ Abstract class for linking a domain with a data access method.
@@ -27,6 +29,11 @@ class Domain(object):
     def __init__(self, name: str):
         self.name = name
 
+    def __deepcopy__(self, memo):
+        # domains are shared, read-only resources: copies of objects referencing a domain
+        # (e.g. messages delivered by a `services.transport.LocalTransport`) keep the same instance
+        return self
+
     def get_domain_name(self) -> str:
         """ Return the domain name of the current ontology.
 
@@ -44,3 +51,36 @@ class Domain(object):
         IMPORTANT: This function must be overridden!
         """
         raise NotImplementedError
+
+    def count_entities(self, constraints: dict) -> int:
+        """ Returns the number of entities from the data backend that meet the constraints.
+
+            Counts the results of `find_entities`, override this if the data backend can count
+            without returning the entities.
+
+        Args:
+            constraints (dict): slot-value mapping of constraints
+        """
+        return len(self.find_entities(constraints))
+
+    def distinct_value_counts(self, constraints: dict, slots: Iterable) -> Dict[str, Dict[object, int]]:
+        """ Returns how many entities meeting the constraints have each value of the given slots.
+
+            Counts the values of the results of `find_entities`, override this if the data backend can
+            count without returning the entities.
+
+        Args:
+            constraints (dict): slot-value mapping of constraints
+            slots (Iterable): slots to count the values of
+
+        Returns:
+            (dict): slot -> value -> number of matching entities with this value (only values of
+                    matching entities)
+        """
+        slots = list(slots)
+        value_counts = {slot: defaultdict(int) for slot in slots}
+        for entity in self.find_entities(constraints):
+            for slot in slots:
+                if slot in entity:
+                    value_counts[slot][entity[slot]] += 1
+        return {slot: dict(counts) for slot, counts in value_counts.items()}
@@ -0,0 +1,237 @@
+############################################################################################
+#
+# Copyright 2020, University of Stuttgart: Institute for Natural Language Processing (IMS)
+#
+# This file is part of Adviser.
+# Adviser is free software: you can redistribute it and/or modify'
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3.
+#
+# Adviser is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Adviser.  If not, see <https://www.gnu.org/licenses/>.
+#
+############################################################################################
+
+
+""" This module provides the HTTP client shared by the domains querying web APIs.
+
+    Compared to a blocking request per query, the client
+        * keeps connections to the API servers alive (one connection pool per host),
+        * runs independent sub-queries of a turn concurrently (`HTTPClient.submit`),
+        * sends identical requests issued at the same time (e.g. by several sessions) only once,
+        * caches the JSON responses for a time to live and answers with an expired (stale) response for
+          a while longer, while it's fetched again in the background (stale-while-revalidate).
+    Every request returns objects of its own (parsed from the cached response), callers may modify them.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, NamedTuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# clients shared by all domains of this process: process id -> client
+_SHARED_CLIENTS = {}
+_SHARED_CLIENTS_LOCK = threading.Lock()
+
+
+class HTTPCacheInfo(NamedTuple):
+    """ Statistics of the response cache of an `HTTPClient` """
+    hits: int  # fresh cached responses
+    stale_hits: int  # expired cached responses returned while they were fetched again
+    misses: int  # requests sent to the server
+    coalesced: int  # requests answered by an identical request in flight
+    size: int  # number of cached responses
+
+
+class _CacheEntry(NamedTuple):
+    content: bytes  # body of the response, parsed for every request
+    fresh_until: float
+    stale_until: float
+
+
+class HTTPClient(object):
+    """ Thread-safe HTTP client for JSON web APIs with connection keep-alive, concurrent requests,
+        request coalescing and a response cache.
+
+        Only successful responses are cached, errors (e.g. `requests.HTTPError`) are raised by every request
+        waiting for the response.
+    """
+
+    def __init__(self, max_connections: int = 10, max_workers: int = 8, ttl: float = 300.0,
+                 stale_ttl: float = 3600.0, cache_size: int = 1024, timeout: float = 10.0):
+        """
+        Args:
+            max_connections (int): maximum number of connections kept alive per host
+            max_workers (int): maximum number of requests sent concurrently by `submit`
+            ttl (float): default number of seconds responses are fresh, 0 disables the cache
+            stale_ttl (float): number of seconds an expired response is still returned while it is fetched again
+            cache_size (int): maximum number of cached responses (least recently used responses are removed)
+            timeout (float): seconds to wait for the server to respond
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.cache_size = cache_size
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._cache = OrderedDict()
+        self._inflight = {}  # key -> future of the response being fetched
+        self._lock = threading.Lock()
+        self._workers = None
+        self._hits = self._stale_hits = self._misses = self._coalesced = 0
+
+    def get(self, url: str, params: dict = None, headers: dict = None, ttl: float = None) -> Any:
+        """ Sends a GET request (unless the response is cached) and returns the parsed JSON response
+            (a new object for every call).
+
+        Args:
+            url (str): URL of the request
+            params (dict): query parameters
+            headers (dict): additional HTTP headers
+            ttl (float): seconds the response is fresh (instead of the default of the client)
+        """
+        return self.request('GET', url, params=params, headers=headers, ttl=ttl)
+
+    def post(self, url: str, params: dict = None, data: dict = None, headers: dict = None,
+             ttl: float = None) -> Any:
+        """ Sends a POST request with form data (unless the response is cached, so only use this for queries)
+            and returns the parsed JSON response.
+
+        Args:
+            url (str): URL of the request
+            params (dict): query parameters
+            data (dict): form data
+            headers (dict): additional HTTP headers
+            ttl (float): seconds the response is fresh (instead of the default of the client)
+        """
+        return self.request('POST', url, params=params, data=data, headers=headers, ttl=ttl)
+
+    def request(self, method: str, url: str, params: dict = None, data: dict = None, headers: dict = None,
+                ttl: float = None) -> Any:
+        """ Returns the parsed JSON response of the request, from the cache if possible. Every call parses
+            the response again, so callers can't change the responses of others.
+
+            If an identical request is in flight, waits for its response instead of sending the request again.
+            See `get` and `post` for the arguments.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        key = self._get_key(method, url, params, data, headers)
+        now = time.monotonic()
+        first = revalidate = False
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and now < entry.stale_until:
+                self._cache.move_to_end(key)
+                if now < entry.fresh_until:
+                    self._hits += 1
+                    return json.loads(entry.content)
+                self._stale_hits += 1
+                if key not in self._inflight:
+                    self._inflight[key] = Future()
+                    self._misses += 1
+                    revalidate = True
+            else:
+                future = self._inflight.get(key)
+                if future is None:
+                    future = self._inflight[key] = Future()
+                    self._misses += 1
+                    first = True
+                else:
+                    self._coalesced += 1
+        if entry is not None and now < entry.stale_until:
+            if revalidate:
+                self._get_workers().submit(self._fetch, key, method, url, params, data, headers, ttl)
+            return json.loads(entry.content)
+        if first:
+            self._fetch(key, method, url, params, data, headers, ttl)
+        return json.loads(future.result())
+
+    def submit(self, method: str, url: str, params: dict = None, data: dict = None, headers: dict = None,
+               ttl: float = None) -> Future:
+        """ Sends the request in a worker thread, returns a future of the parsed JSON response.
+
+            Used to send the independent requests of a query at the same time, see `request` for the arguments.
+        """
+        return self._get_workers().submit(self.request, method, url, params=params, data=data, headers=headers,
+                                          ttl=ttl)
+
+    def get_cache_info(self) -> HTTPCacheInfo:
+        """ Returns the statistics of the response cache """
+        with self._lock:
+            return HTTPCacheInfo(self._hits, self._stale_hits, self._misses, self._coalesced, len(self._cache))
+
+    def clear_cache(self):
+        """ Removes all cached responses """
+        with self._lock:
+            self._cache.clear()
+
+    def close(self):
+        """ Closes all connections and stops the worker threads """
+        with self._lock:
+            workers, self._workers = self._workers, None
+        if workers is not None:
+            workers.shutdown(wait=True)
+        self.session.close()
+
+    def _get_workers(self) -> ThreadPoolExecutor:
+        # started on first use, most turns only send single requests
+        with self._lock:
+            if self._workers is None:
+                self._workers = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                   thread_name_prefix='HTTPClient')
+            return self._workers
+
+    @staticmethod
+    def _get_key(method: str, url: str, params: dict, data: dict, headers: dict) -> str:
+        return json.dumps([method, url, params, data, headers], sort_keys=True, default=str)
+
+    def _fetch(self, key: str, method: str, url: str, params: dict, data: dict, headers: dict, ttl: float):
+        """ Sends the request and passes the body of the response (or the error) to the future of the key """
+        with self._lock:
+            future = self._inflight[key]
+        try:
+            response = self.session.request(method, url, params=params, data=data, headers=headers,
+                                            timeout=self.timeout)
+            response.raise_for_status()
+            content = response.content
+            # only valid JSON responses are cached
+            json.loads(content)
+        except Exception as error:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(error)
+            return
+        now = time.monotonic()
+        with self._lock:
+            if ttl > 0 and self.cache_size > 0:
+                self._cache[key] = _CacheEntry(content, now + ttl, now + ttl + self.stale_ttl)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            del self._inflight[key]
+        future.set_result(content)
+
+
+def get_shared_client() -> HTTPClient:
+    """ Returns the client shared by all web API domains of this process (created on first use) """
+    with _SHARED_CLIENTS_LOCK:
+        # connections and worker threads aren't inherited by forked processes
+        client = _SHARED_CLIENTS.get(os.getpid())
+        if client is None:
+            client = _SHARED_CLIENTS[os.getpid()] = HTTPClient()
+        return client
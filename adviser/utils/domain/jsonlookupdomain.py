@@ -21,19 +21,118 @@
 import json
 import os
 import sqlite3
-from io import StringIO
-from typing import List, Iterable
+import string
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Iterable, NamedTuple, Tuple
+from urllib.request import pathname2url
 
 from utils.domain import Domain
 
 
+# case folding of sqlite's NOCASE collation (ASCII characters only)
+NOCASE = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+# in-memory copies of database files shared by all domains of this process:
+# (process id, absolute file path, modification time, indexes) -> (uri of the in-memory database,
+#                                                                   connection keeping it alive)
+_MEMORY_DBS = {}
+_MEMORY_DBS_LOCK = threading.Lock()
+
+# the memdb VFS (sqlite >= 3.36) shares an in-memory database between connections without a shared cache,
+# whose connections would take turns for every query
+_MEMDB_VFS = sqlite3.sqlite_version_info >= (3, 36, 0)
+
+
+def _get_memory_db_uri(db_file_path: str, indexes: str) -> str:
+    """ Returns the uri of an in-memory copy of the given database file which can be opened by any number of
+        connections of this process. The file is copied with the sqlite backup API once per process,
+        file version and kind of indexes.
+
+    Args:
+        db_file_path (str): absolute path to database file
+        indexes (str): kind of indexes created on the copy (see `JSONLookupDomain`), copies with different indexes
+                       are kept apart as indexes may change the order of query results
+    """
+    key = (os.getpid(), db_file_path, os.path.getmtime(db_file_path), indexes)
+    with _MEMORY_DBS_LOCK:
+        if key not in _MEMORY_DBS:
+            if _MEMDB_VFS:
+                uri = f"file:/adviser-db-{os.getpid()}-{len(_MEMORY_DBS)}?vfs=memdb"
+            else:
+                uri = f"file:adviser-db-{os.getpid()}-{len(_MEMORY_DBS)}?mode=memory&cache=shared"
+            memory_db = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            file_db = sqlite3.connect(f"file:{pathname2url(db_file_path)}?mode=ro", uri=True)
+            file_db.backup(memory_db)
+            file_db.close()
+            _MEMORY_DBS[key] = (uri, memory_db)
+        return _MEMORY_DBS[key][0]
+
+
+class QueryCacheInfo(NamedTuple):
+    """ Statistics of the query result cache of a `JSONLookupDomain` """
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        """ Fraction of lookups answered from the cache (0 if there were no lookups) """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class _QueryCache(object):
+    """ Thread-safe LRU cache of query results """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """ Returns the cached rows for the key or None """
+        with self.lock:
+            rows = self.results.get(key)
+            if rows is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.results.move_to_end(key)
+            return rows
+
+    def put(self, key, rows: tuple):
+        with self.lock:
+            self.results[key] = rows
+            self.results.move_to_end(key)
+            while len(self.results) > self.maxsize:
+                self.results.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.results.clear()
+
+    def info(self) -> QueryCacheInfo:
+        with self.lock:
+            return QueryCacheInfo(self.hits, self.misses, self.maxsize, len(self.results))
+
+
 class JSONLookupDomain(Domain):
     """ Abstract class for linking a domain based on a JSON-ontology with a database
        access method (sqllite).
     """
 
+    # number of prepared statements kept per connection (queries only differ in their parameters and the
+    # combination of constrained slots)
+    _STATEMENT_CACHE_SIZE = 512
+    INDEX_MODES = ('none', 'nocase', 'covering')
+
     def __init__(self, name: str, json_ontology_file: str = None, sqllite_db_file: str = None, \
-                 display_name: str = None):
+                 display_name: str = None, in_memory: bool = True, cache_size: int = 256,
+                 indexes: str = 'nocase'):
         """ Loads the ontology from a json file and the data from a sqllite
             database.
 
@@ -49,11 +148,32 @@ class JSONLookupDomain(Domain):
                                 (from the top-level adviser directory, e.g. resources/databases)
             display_name (str): the domain's name as it appears on the screen
                                 (e.g. containing whitespaces)
+            in_memory (bool): If True, queries run on an in-memory copy of the database shared by all domains
+                              of this process (loaded once per database file).
+                              Each thread querying the domain opens its own read-only connection, so
+                              services and sessions running in different threads query in parallel.
+                              If False, the database file is memory mapped read-only (shared with other processes
+                              through the OS page cache). Only use this if the file isn't modified while in use.
+            cache_size (int): maximum number of query results (of `find_entities` and `find_info_about_entity`)
+                              kept in a least recently used cache, 0 disables the cache
+            indexes (str): indexes created on the in-memory copy of the database (the database file isn't changed):
+                           'nocase' indexes every informable slot (case insensitive) and the primary key,
+                           'covering' additionally adds the primary key and the system requestable slots to the
+                           informable slot indexes so that `find_entities` doesn't need to read the table,
+                           'none' creates no indexes. Without `in_memory`, only indexes of the file are used.
         """
         super(JSONLookupDomain, self).__init__(name)
 
         root_dir = self._get_root_dir()
         self.sqllite_db_file = sqllite_db_file
+        self.in_memory = in_memory
+        self.cache_size = cache_size
+        self._cache = _QueryCache(cache_size)
+        if indexes not in self.INDEX_MODES:
+            raise ValueError(f"indexes must be one of {self.INDEX_MODES}, not '{indexes}'")
+        self.indexes = indexes
+        # parameterized statements issued by `find_entities` and `find_info_about_entity`: query -> number of parameters
+        self._statements = {}
         # make sure to set default values in case of None
         json_ontology_file = json_ontology_file or os.path.join('resources', 'ontologies',
                                                                 name + '.json')
@@ -61,18 +181,59 @@ class JSONLookupDomain(Domain):
                                                           name + '.db')
 
         self.ontology_json = json.load(open(root_dir + '/' + json_ontology_file))
-        # load database
-        self.db = self._load_db_to_memory(root_dir + '/' + sqllite_db_file)
+        self._compile_ontology()
+        # load database, connections are opened per thread
+        self._connections = threading.local()
+        self.db = self._connect_db(root_dir + '/' + sqllite_db_file)
 
         self.display_name = display_name if display_name is not None else name
 
     def __getstate__(self):
-        # remove sql connection from state dict so that pickling works
+        # remove sql connections from state dict so that pickling works
         state = self.__dict__.copy()
-        if 'db' in state:
-            del state['db']
+        state.pop('_connections', None)
+        # cached results aren't shared with the unpickled copy
+        state.pop('_cache', None)
         return state
 
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._connections = threading.local()
+        self._cache = _QueryCache(self.cache_size)
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        """ The read-only connection to the database of the current thread (opened on first use) """
+        db = getattr(self._connections, 'db', None)
+        if db is None:
+            root_dir = self._get_root_dir()
+            sqllite_db_file = self.sqllite_db_file or os.path.join(
+                'resources', 'databases', self.name + '.db')
+            db = self._connect_db(root_dir + '/' + sqllite_db_file)
+            self._connections.db = db
+        return db
+
+    @db.setter
+    def db(self, db: sqlite3.Connection):
+        self._connections.db = db
+
+    def _compile_ontology(self):
+        """ Converts the slot and value lists of the ontology once into tuples and lookup tables, so that
+            the accessors called in every turn return them without rebuilding them. """
+        informable = self.ontology_json['informable']
+        self._primary_key = self.ontology_json['key']
+        self._requestable_slots = tuple(self.ontology_json['requestable'])
+        self._system_requestable_slots = tuple(self.ontology_json['system_requestable'])
+        self._informable_slots = tuple(informable)
+        self._possible_values = {slot: tuple(values) for slot, values in informable.items()}
+        # all positions of every value (the ontology may list a value twice)
+        self._value_indices = {}
+        for slot, values in self._possible_values.items():
+            value_indices = self._value_indices[slot] = {}
+            for idx, value in enumerate(values):
+                value_indices[value] = value_indices.get(value, ()) + (idx,)
+        self._binary_slots = tuple(slot for slot in self._informable_slots if len(self._possible_values[slot]) == 2)
+
     def _get_root_dir(self):
         """ Returns the path to the root directory """
         return os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -85,9 +246,9 @@ class JSONLookupDomain(Domain):
             row_dict[col[0]] = row[col_idx]
         return row_dict
 
-    def _load_db_to_memory(self, db_file_path : str):
-        """ Loads a sqllite3 database from file to memory in order to save
-            I/O operations
+    def _connect_db(self, db_file_path: str):
+        """ Opens a read-only connection to the database (see `in_memory`), no data is copied
+            if the database file was loaded before. Connections must only be used by one thread at a time.
 
         Args:
             db_file_path (str): absolute path to database file
@@ -95,28 +256,55 @@ class JSONLookupDomain(Domain):
         Returns:
             A sqllite3 connection
         """
-
-        # open and read db file to temporary file
-        file_db = sqlite3.connect(db_file_path, check_same_thread=False)
-        tempfile = StringIO()
-        for line in file_db.iterdump():
-            tempfile.write('%s\n' % line)
-        file_db.close()
-        tempfile.seek(0)
-        # Create a database in memory and import from temporary file
-        db = sqlite3.connect(':memory:', check_same_thread=False)
+        db_file_path = os.path.abspath(db_file_path)
+        if self.in_memory:
+            db = sqlite3.connect(_get_memory_db_uri(db_file_path, self.indexes), uri=True, check_same_thread=False,
+                                 cached_statements=self._STATEMENT_CACHE_SIZE)
+            with _MEMORY_DBS_LOCK:
+                for statement in self._get_index_statements(db):
+                    db.execute(statement)
+        else:
+            db = sqlite3.connect(f"file:{pathname2url(db_file_path)}?mode=ro&immutable=1", uri=True,
+                                 check_same_thread=False, cached_statements=self._STATEMENT_CACHE_SIZE)
+            db.execute(f"PRAGMA mmap_size={os.path.getsize(db_file_path)}")
+        db.execute("PRAGMA query_only=1")
         db.row_factory = self._sqllite_dict_factory
-        db.cursor().executescript(tempfile.read())
-        db.commit()
-        # file_db.backup(databases[domain]) # works only in python >= 3.7
-
         return db
 
+    def _get_index_statements(self, db) -> List[str]:
+        """ Returns the statements creating the missing indexes (see `indexes`) of the domain's table
+
+        Args:
+            db: connection to the database
+        """
+        if self.indexes == 'none':
+            return []
+        table = self.get_domain_name()
+        # name -> 1 if the column is (part of) the primary key of the table, else 0
+        columns = {row[1]: row[5] for row in db.execute(f'PRAGMA table_info("{table}")')}
+        existing = {row[0] for row in db.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+        indexes = {}
+        key = self.get_primary_key()
+        if key in columns and not columns[key]:
+            indexes[f"adviser_{table}_{key}"] = f'"{key}"'
+        covered = []
+        if self.indexes == 'covering':
+            covered = [f'"{slot}"' for slot in sorted(set([key]) | set(self.get_system_requestable_slots()))
+                       if slot in columns]
+        for slot in self.get_informable_slots():
+            if slot in columns:
+                indexes[f"adviser_{table}_{slot}_{self.indexes}"] = ", ".join(
+                    [f'"{slot}" COLLATE NOCASE'] + [column for column in covered if column != f'"{slot}"'])
+        return [f'CREATE INDEX "{name}" ON "{table}" ({index_columns})'
+                for name, index_columns in indexes.items() if name not in existing]
+
     def find_entities(self, constraints: dict, requested_slots: Iterable = iter(())):
         """ Returns all entities from the data backend that meet the constraints, with values for
             the primary key and the system requestable slots (and optional slots, specifyable
             via requested_slots).
 
+            Results are cached (see `get_cache_info`), every call returns new row dictionaries.
+
         Args:
             constraints (dict): Slot-value mapping of constraints.
                                 If empty, all entities in the database will be returned.
@@ -125,86 +313,216 @@ class JSONLookupDomain(Domain):
 
         """
         # values for name and all system requestable slots
-        select_clause = ", ".join(set([self.get_primary_key()]) |
-                                  set(self.get_system_requestable_slots()) |
-                                  set(requested_slots))
-        query = "SELECT {} FROM {}".format(select_clause, self.get_domain_name())
-        constraints = {slot: value.replace("'", "''") for slot, value in constraints.items()
-                       if value is not None and str(value).lower() != 'dontcare'}
-        if constraints:
-            query += ' WHERE ' + ' AND '.join("{}='{}' COLLATE NOCASE".format(key, str(val))
-                                              for key, val in constraints.items())
-        return self.query_db(query)
+        columns = tuple(sorted(set([self.get_primary_key()]) |
+                               set(self.get_system_requestable_slots()) |
+                               set(requested_slots)))
+        constraints, where_clause = self._get_where_clause(constraints)
+        key = ('entities', constraints, columns)
+        rows = self._cache.get(key)
+        if rows is None:
+            query = "SELECT {} FROM {}{}".format(", ".join(columns), self.get_domain_name(), where_clause)
+            rows = self._cached_query(key, query, tuple(value for _, value in constraints))
+        return [dict(row) for row in rows]
+
+    def filter_entities(self, entities: List[dict], constraints: dict) -> List[dict]:
+        """ Returns the entities (e.g. returned by `find_entities`) which meet the constraints, compared like
+            the constraints of `find_entities`
+
+        Args:
+            entities (List[dict]): Slot-value mappings of entities, containing all constrained slots
+            constraints (dict): Slot-value mapping of constraints, 'dontcare' and None values are ignored
+        """
+        for slot, value in constraints.items():
+            if value is None or str(value).lower() == 'dontcare':
+                continue
+            value = str(value).translate(NOCASE)
+            entities = [entity for entity in entities
+                        if entity[slot] is not None and str(entity[slot]).translate(NOCASE) == value]
+        return list(entities)
+
+    def count_entities(self, constraints: dict) -> int:
+        """ Returns the number of entities from the data backend that meet the constraints
+            (without fetching them).
+
+        Args:
+            constraints (dict): Slot-value mapping of constraints.
+                                If empty, all entities in the database are counted.
+        """
+        constraints, where_clause = self._get_where_clause(constraints)
+        key = ('count', constraints)
+        rows = self._cache.get(key)
+        if rows is None:
+            query = "SELECT count(*) AS count FROM {}{}".format(self.get_domain_name(), where_clause)
+            rows = self._cached_query(key, query, tuple(value for _, value in constraints))
+        return rows[0]['count']
+
+    def distinct_value_counts(self, constraints: dict, slots: Iterable) -> Dict[str, Dict[object, int]]:
+        """ Returns how many entities meeting the constraints have each value of the given slots
+            (one `GROUP BY` query per slot, without fetching the entities).
+
+        Args:
+            constraints (dict): Slot-value mapping of constraints.
+                                If empty, all entities in the database are counted.
+            slots (Iterable): slots (columns) to count the values of
+
+        Returns:
+            (dict): slot -> value -> number of matching entities with this value (only values of matching entities)
+        """
+        constraints, where_clause = self._get_where_clause(constraints)
+        value_counts = {}
+        for slot in slots:
+            key = ('values', constraints, slot)
+            rows = self._cache.get(key)
+            if rows is None:
+                query = "SELECT {0} AS value, count(*) AS count FROM {1}{2} GROUP BY {0}".format(
+                    slot, self.get_domain_name(), where_clause)
+                rows = self._cached_query(key, query, tuple(value for _, value in constraints))
+            value_counts[slot] = {row['value']: row['count'] for row in rows}
+        return value_counts
+
+    def _get_where_clause(self, constraints: dict):
+        """ Returns the normalized constraints (sorted slot-value pairs without 'dontcare' and None values)
+            and the matching (parameterized) WHERE clause
+
+        Args:
+            constraints (dict): Slot-value mapping of constraints
+        """
+        constraints = tuple(sorted((slot, str(value)) for slot, value in constraints.items()
+                                   if value is not None and str(value).lower() != 'dontcare'))
+        if not constraints:
+            return constraints, ''
+        return constraints, ' WHERE ' + ' AND '.join("{}=? COLLATE NOCASE".format(slot) for slot, _ in constraints)
 
     def find_info_about_entity(self, entity_id, requested_slots: Iterable):
         """ Returns the values (stored in the data backend) of the specified slots for the
             specified entity.
 
+            Results are cached (see `get_cache_info`), every call returns new row dictionaries.
+
         Args:
             entity_id (str): primary key value of the entity
             requested_slots (dict): slot-value mapping of constraints
 
         """
-        if requested_slots:
-            select_clause = ", ".join(sorted(requested_slots))
         # If the user hasn't specified any slots we don't know what they want so we give everything
-        else:
-            select_clause = "*"
-        query = 'SELECT {} FROM {} WHERE {}="{}";'.format(
-            select_clause, self.get_domain_name(), self.get_primary_key(), entity_id)
-        return self.query_db(query)
+        columns = tuple(sorted(requested_slots)) if requested_slots else ('*',)
+        key = ('info', entity_id, columns)
+        rows = self._cache.get(key)
+        if rows is None:
+            query = 'SELECT {} FROM {} WHERE {}=?;'.format(
+                ", ".join(columns), self.get_domain_name(), self.get_primary_key())
+            rows = self._cached_query(key, query, (entity_id,))
+        return [dict(row) for row in rows]
+
+    def _cached_query(self, key, query_str: str, parameters: tuple) -> tuple:
+        """ Runs the query and stores its rows in the result cache
+
+        Args:
+            key: key of the result in the cache
+            query_str (str): parameterized sqlite3 query string
+            parameters (tuple): values of the query parameters
+
+        Returns:
+            (tuple): rows of the query response set
+        """
+        self._statements[query_str] = len(parameters)
+        rows = tuple(self.query_db(query_str, parameters))
+        if self.cache_size > 0:
+            self._cache.put(key, rows)
+        return rows
 
-    def query_db(self, query_str):
+    def get_query_plans(self, full_scans_only: bool = False) -> Dict[str, List[str]]:
+        """ Returns the plans (`EXPLAIN QUERY PLAN`) of all statements issued by `find_entities` and
+            `find_info_about_entity` so far
+
+        Args:
+            full_scans_only (bool): if True, only returns the plans of statements scanning the whole table
+                                    instead of searching an index
+
+        Returns:
+            (dict): statement -> list of plan steps (e.g. "SEARCH superhero USING INDEX ...")
+        """
+        plans = {}
+        for query_str, num_parameters in list(self._statements.items()):
+            plan = [row['detail'] for row in self.query_db('EXPLAIN QUERY PLAN ' + query_str,
+                                                           (None,) * num_parameters)]
+            if not full_scans_only or any(step.startswith('SCAN') for step in plan):
+                plans[query_str] = plan
+        return plans
+
+    def get_cache_info(self) -> QueryCacheInfo:
+        """ Returns the hits, misses, maximum and current size of the query result cache """
+        return self._cache.info()
+
+    def invalidate_cache(self):
+        """ Removes all cached query results, e.g. after the database was modified or replaced.
+            The hit and miss counters are kept. """
+        self._cache.clear()
+
+    def query_db(self, query_str, parameters: tuple = ()):
         """ Function for querying the sqlite3 db
 
         Args:
-            query_str (string): sqlite3 query style string
+            query_str (string): sqlite3 query style string, may contain `?` placeholders
+            parameters (tuple): values of the placeholders
 
         Return:
             (iterable): rows of the query response set
         """
-        if "db" not in self.__dict__:
-            root_dir = self._get_root_dir()
-            sqllite_db_file = self.sqllite_db_file or os.path.join(
-                'resources', 'databases', self.name + '.db')
-            self.db = self._load_db_to_memory(root_dir + '/' + sqllite_db_file)
         cursor = self.db.cursor()
-        cursor.execute(query_str)
+        cursor.execute(query_str, parameters)
         res = cursor.fetchall()
         return res
 
     def get_display_name(self):
         return self.display_name
 
-    def get_requestable_slots(self) -> List[str]:
-        """ Returns a list of all slots requestable by the user. """
-        return self.ontology_json['requestable']
+    def get_requestable_slots(self) -> Tuple[str, ...]:
+        """ Returns all slots requestable by the user. """
+        return self._requestable_slots
 
-    def get_system_requestable_slots(self) -> List[str]:
-        """ Returns a list of all slots requestable by the system. """
-        return self.ontology_json['system_requestable']
+    def get_system_requestable_slots(self) -> Tuple[str, ...]:
+        """ Returns all slots requestable by the system. """
+        return self._system_requestable_slots
 
-    def get_informable_slots(self) -> List[str]:
-        """ Returns a list of all informable slots. """
-        return self.ontology_json['informable'].keys()
+    def get_informable_slots(self) -> Tuple[str, ...]:
+        """ Returns all informable slots (in the order of the ontology). """
+        return self._informable_slots
 
-    def get_possible_values(self, slot: str) -> List[str]:
+    def get_possible_values(self, slot: str) -> Tuple[str, ...]:
         """ Returns all possible values for an informable slot
 
         Args:
             slot (str): name of the slot
 
         Returns:
-            a list of strings, each string representing one possible value for
+            a tuple of strings, each string representing one possible value for
             the specified slot.
          """
-        return self.ontology_json['informable'][slot]
+        return self._possible_values[slot]
+
+    def get_value_indices(self, slot: str) -> Dict[str, Tuple[int, ...]]:
+        """ Returns the positions of every possible value of an informable slot in `get_possible_values`
+            (do not modify).
+
+        Args:
+            slot (str): name of the slot
+
+        Returns:
+            a dict mapping each value to its positions, in ascending order (more than one if the
+            ontology lists the value more than once)
+        """
+        return self._value_indices[slot]
+
+    def get_binary_slots(self) -> Tuple[str, ...]:
+        """ Returns all informable slots with exactly two possible values (e.g. yes/no slots). """
+        return self._binary_slots
 
     def get_primary_key(self):
         """ Returns the name of a column in the associated database which can be used to uniquely
             distinguish between database entities.
             Could be e.g. the name of a restaurant, an ID, ... """
-        return self.ontology_json['key']
+        return self._primary_key
 
     def get_pronouns(self, slot):
         if slot in self.ontology_json['pronoun_map']:
@@ -79,6 +79,7 @@ class DiasysLogger(logging.Logger):
                  file_log_lvl: LogLevel = LogLevel.NONE, logfile_folder: str = 'logs',
                  logfile_basename: str = 'log'):  # pylint: disable=too-many-arguments
         super(DiasysLogger, self).__init__(name)
+        self._console_log_lvl = console_log_lvl
 
         if file_log_lvl is not LogLevel.NONE:
             # configure output to log file
@@ -105,6 +106,11 @@ class DiasysLogger(logging.Logger):
         # log exceptions
         sys.excepthook = exception_logging_hook
 
+    def __reduce__(self):
+        """ Copies of the logger (e.g. pickled for worker processes) log to the console on the same
+            level, but not to the log file (which would be truncated). """
+        return DiasysLogger, (self.name, self._console_log_lvl)
+
     def result(self, msg: str):
         """ Logs the result of a dialog """
 
@@ -18,7 +18,61 @@
 ############################################################################################
 
 
+from typing import Any, Dict, Optional, Tuple
+
+
 class Topic(object):
     DIALOG_START = 'dialog_start'  # Called at the beginning of a new dialog. Subscribe here to set stateful variables for one dialog.
     DIALOG_END = 'dialog_end'      # Called at the end of a dialog (after a bye-action).
     DIALOG_EXIT = 'dialog_exit'    # Called when the dialog system shuts down. Subscribe here if you e.g. have to close resource handles / free locks.
+
+
+class TopicRouter(object):
+    """ Precompiled prefix matching of topics (as used for subscriptions).
+
+        Prefixes are stored in a trie, so matching a topic takes time linear in the length of the topic
+        instead of the number of prefixes. Results are cached per topic.
+    """
+
+    _VALUE = None  # trie key of the (prefix, value) entry of a node (all other keys are characters)
+
+    def __init__(self, prefixes: Dict[str, Any] = None):
+        """
+        Args:
+            prefixes (Dict[str, Any]): mapping of prefixes to route to the values they route to
+        """
+        self._trie = {}
+        self._cache = {}
+        for prefix, value in (prefixes or {}).items():
+            self.add(prefix, value)
+
+    def add(self, prefix: str, value: Any = None):
+        """ Adds a prefix (replacing the value of an existing one) """
+        node = self._trie
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node[self._VALUE] = (prefix, value)
+        self._cache = {}
+
+    def match(self, topic: str) -> Tuple[Tuple[str, Any], ...]:
+        """ Returns the (prefix, value) pairs of all prefixes of the given topic, shortest prefix first """
+        matches = self._cache.get(topic)
+        if matches is None:
+            matches = []
+            node = self._trie
+            if self._VALUE in node:
+                matches.append(node[self._VALUE])
+            for char in topic:
+                node = node.get(char)
+                if node is None:
+                    break
+                if self._VALUE in node:
+                    matches.append(node[self._VALUE])
+            matches = tuple(matches)
+            self._cache[topic] = matches
+        return matches
+
+    def longest_match(self, topic: str) -> Optional[Tuple[str, Any]]:
+        """ Returns the (prefix, value) pair of the longest prefix of the given topic (or None if there is none) """
+        matches = self.match(topic)
+        return matches[-1] if matches else None